@@ -0,0 +1,43 @@
+"""Per-frame cost of the Bloom pass at each quality level.
+
+Run from the repository root:
+    python benchmarks/bench_bloom.py [frames]
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from games.utils.effects import BLOOM_LEVELS, Background, Bloom
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+    random.seed(1)
+    background = Background(800, 600)
+    for _ in range(600):
+        background.update()
+
+    print(f"{'quality':<8} {'ms/frame':>9}")
+    for quality in BLOOM_LEVELS:
+        bloom = Bloom(800, 600, quality, threshold=100)
+        total = 0.0
+        for _ in range(frames):
+            screen.fill((0, 0, 0))
+            background.draw(screen)
+            start = time.perf_counter()
+            bloom.apply(screen)
+            total += time.perf_counter() - start
+        print(f"{quality:<8} {total / frames * 1000:>9.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
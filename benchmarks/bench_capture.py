@@ -0,0 +1,82 @@
+"""What recording video costs the game loop, per output format.
+
+Plays every game from its scripted benchmark scenario (see bench_games.py)
+uncapped, without capture and then capturing 30 fps video of it to each
+format that works here, into a temporary directory. Reports the frame rate,
+the milliseconds ``VideoCapture.add()`` takes on the game loop per copied
+frame, and the encoder's milliseconds per frame with the frame rate it can
+keep up with. Uncapped, the game makes video frames far faster than real
+time and runs in simulated time, so it waits for the encoder whenever the
+ring is full (the frame rate then shows what encoding allows) and no
+frame is dropped. In real time play at 60 fps frames are dropped instead,
+only if the encoder can't keep up with the capture rate.
+
+Run from the repository root:
+    python benchmarks/bench_capture.py [frames]
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("AIO_GAMES_SCORES", "off")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import time
+
+from bench_games import SCENARIOS, finish, start
+
+from games.utils.capture import CAPTURE_FPS, VideoCapture, numpy
+
+GAMES = ("snake", "pong", "tetris", "hangman")
+
+
+def targets(directory):
+    # Only the formats this machine can write
+    paths = {"png": os.path.join(directory, "frames"), "raw": os.path.join(directory, "video.rgb")}
+    if numpy is not None:
+        paths["y4m"] = os.path.join(directory, "video.y4m")
+    if shutil.which("ffmpeg"):
+        paths["ffmpeg"] = os.path.join(directory, "video.mp4")
+    return paths
+
+
+def measure(factory, keys, frames, path=None):
+    manager, script = start(factory, keys, frames)
+    video = manager.video = VideoCapture(path) if path else None
+    begin = time.perf_counter()
+    manager.run(max_frames=frames, script=script)
+    elapsed = time.perf_counter() - begin
+    finish()
+    if video is None:
+        return manager.frame / elapsed, None
+    video.close()
+    return manager.frame / elapsed, video.stats()
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    print(f"{frames} frames uncapped, video at {CAPTURE_FPS} fps")
+    print(f"\n{'scenario':<10} {'format':<7} {'fps':>7} {'copy ms':>8} {'encode ms':>10} "
+          f"{'encoder fps':>12} {'copied':>7} {'waited':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, factory, keys in SCENARIOS:
+            if name not in GAMES:
+                continue
+            fps, _ = measure(factory, keys, frames)
+            print(f"{name:<10} {'-':<7} {fps:7.0f}")
+            for kind, path in targets(directory).items():
+                fps, stats = measure(factory, keys, frames, path)
+                encode_ms = stats["avg_encode_ms"]
+                print(f"{'':<10} {kind:<7} {fps:7.0f} {stats['avg_copy_ms']:8.3f} {encode_ms:10.2f} "
+                      f"{1000 / encode_ms if encode_ms else 0:12.0f} {stats['copied']:7} {stats['waited']:7}")
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
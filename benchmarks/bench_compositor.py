@@ -0,0 +1,60 @@
+"""Full redraws against dirty rectangles, per game.
+
+Plays each game's scripted benchmark scenario (see bench_games.py) headless
+and uncapped, once redrawing and flipping the whole frame and once with the
+dirty-rectangle compositor, and reports the frame rate, the time spent
+drawing and presenting, and how much of the screen was drawn (background
+restores and blits) and presented per frame. Headless, presenting costs
+next to nothing whatever its size; on a real display the presented share
+is what saves the copy to the window.
+
+Run from the repository root:
+    python benchmarks/bench_compositor.py [frames]
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from bench_games import SCENARIOS, average, finish, start
+
+from games.utils import compositor
+
+GAMES = ("snake", "pong", "tetris", "hangman")
+
+
+def measure(factory, keys, frames, dirty_rects):
+    compositor.DIRTY_RECTS = dirty_rects
+    manager, script = start(factory, keys, frames)
+    begin = time.perf_counter()
+    manager.run(max_frames=frames, script=script)
+    elapsed = time.perf_counter() - begin
+    profiler = manager.profiler
+    draw = average(profiler.ordered(profiler.phases[2]))
+    flip = average(profiler.ordered(profiler.phases[3]))
+    stats = manager.top.compositor.stats()
+    finish()
+    return manager.frame / elapsed, draw, flip, stats
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    print(f"{'scenario':<10} {'mode':<6} {'fps':>7} {'draw ms':>8} {'flip ms':>8} "
+          f"{'drawn':>7} {'shown':>7} {'full':>6}")
+    for name, factory, keys in SCENARIOS:
+        if name not in GAMES:
+            continue
+        for dirty_rects in (False, True):
+            fps, draw, flip, stats = measure(factory, keys, frames, dirty_rects)
+            mode = "dirty" if dirty_rects else "full"
+            print(f"{name:<10} {mode:<6} {fps:7.0f} {draw:8.3f} {flip:8.3f} "
+                  f"{stats['drawn_per_frame']:7.1%} {stats['presented_per_frame']:7.1%} "
+                  f"{stats['full_frames']:6d}")
+
+
+if __name__ == "__main__":
+    main()
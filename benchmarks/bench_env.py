@@ -0,0 +1,78 @@
+"""Environment steps per second, in process and across worker processes.
+
+Steps Snake, Pong and Tetris with random actions, with grid and with
+pixel observations (scaled to PIXELS), first as one ``GameEnv`` in this
+process and then as a ``VecEnv`` of 1, 2, 4 and 8 workers. Steps per
+second count every environment's steps; episodes finish and are reset
+along the way. Workers only add throughput up to the number of CPUs, past
+that they share them.
+
+Run from the repository root:
+    python benchmarks/bench_env.py [steps] [max workers]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+
+from games.utils.env import GameEnv, VecEnv
+
+GAMES = ("snake", "pong", "tetris")
+PIXELS = (160, 120)
+WORKERS = (1, 2, 4, 8)
+
+
+def options(obs):
+    return {"obs": obs, "seed": 1, "size": PIXELS if obs == "pixels" else None}
+
+
+def single(game, obs, steps):
+    env = GameEnv(game, **options(obs))
+    env.reset()
+    rng = random.Random(1)
+    episodes = 0
+    begin = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = env.step(rng.randrange(env.num_actions))
+        if done:
+            episodes += 1
+            env.reset()
+    return steps / (time.perf_counter() - begin), episodes
+
+
+def vectorized(game, obs, n, steps):
+    with VecEnv(game, n, **options(obs)) as env:
+        env.reset()
+        rng = random.Random(1)
+        episodes = 0
+        begin = time.perf_counter()
+        for _ in range(steps):
+            _, _, dones, _ = env.step([rng.randrange(env.num_actions) for _ in range(n)])
+            episodes += sum(dones)
+        elapsed = time.perf_counter() - begin
+        del dones  # A view of the shared memory
+    return n * steps / elapsed, episodes
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS[-1]
+    workers = [n for n in WORKERS if n <= max_workers]
+    print(f"{steps} steps per environment, {os.cpu_count()} CPUs, pixels at {PIXELS[0]}x{PIXELS[1]}")
+    print(f"\n{'game':<8} {'obs':<7} {'in process':>11}" + "".join(f"{f'{n} workers':>11}" for n in workers))
+    for game in GAMES:
+        for obs in ("grid", "pixels"):
+            rate, _ = single(game, obs, steps)
+            row = f"{game:<8} {obs:<7} {rate:11.0f}"
+            for n in workers:
+                rate, _ = vectorized(game, obs, n, steps)
+                row += f"{rate:11.0f}"
+            print(row, flush=True)
+    print("\nsteps per second, all environments together")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Headless benchmark suite for every game and the launcher menu.
+
+Each scenario drives a scene through scripted key presses for a fixed
+number of frames, uncapped but with every frame a 60 fps frame of game
+time, and measures:
+- frames per second and the average time per phase (events, update, draw,
+  flip) from the frame profiler;
+- ``font.render`` calls per frame, i.e. text cache misses (games/utils/text.py);
+- the share of the screen the compositor redrew and presented per frame
+  (games/utils/compositor.py), for scenes that draw through one;
+- memory allocated per frame with tracemalloc, in a second run of the same
+  script: the peak above the frame's starting point (working memory) and
+  what was still held at the end of the frame (growth).
+
+Results are compared with the baselines in benchmarks/baselines.json. The
+run fails (exit status 1) when text renders, redrawn or presented area or
+allocations grow by more than the threshold. The scripts play the same
+game on any machine, so these numbers only change with the code. Frame
+rates do depend on the machine, they are shown as a ratio to a fixed
+reference loop measured in the same run (``rel``), and only gated with
+--gate-fps. Record new baselines after an intended change:
+    python benchmarks/bench_games.py --save
+
+Run from the repository root:
+    python benchmarks/bench_games.py [--frames 600] [--threshold 0.25] [--only tetris] [--gate-fps]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("AIO_GAMES_SCORES", "off")  # Benchmark rounds are not the player's
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import main as launcher_main
+from games.registry import get_game
+from games.utils.audio import get_audio
+from games.utils.profiler import PHASES
+from games.utils.scenes import SceneManager
+from games.utils.text import get_text_cache
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+THRESHOLD = 0.25
+# Allocations this small are noise, compared only above it
+MIN_ALLOC_KB = 4.0
+# Slack on top of the threshold for numbers that are near zero
+MIN_TEXT_RENDERS = 0.02
+MIN_AREA = 0.005
+REFERENCE_FRAMES = 300
+
+
+def every(period, names, start=1, frames=10000):
+    # Key presses cycling through names, one every period frames
+    return {frame: names[i % len(names)]
+            for i, frame in enumerate(range(start, frames, period))}
+
+
+def game(name):
+    return lambda: get_game(name).load()()
+
+
+# name, scene factory, key names by frame
+SCENARIOS = [
+    ("launcher", launcher_main.GameLauncher, every(30, ["down"])),
+    ("snake", game("Snake Game"), {**every(12, ["up", "left", "down", "right"]), **every(150, ["space"], 149)}),
+    ("pong", game("Pong"), {1: "return"}),
+    ("tetris", game("Tetris"), {**every(5, ["left", "up", "right", "down", "down"]), **every(100, ["space"], 99)}),
+    ("hangman", game("Hangman"), {1: "return", **every(10, list("etaoinshrdlucmfwypvbgkqjxz") + ["space"], 2)}),
+]
+
+
+def key_event(name):
+    unicode = name if len(name) == 1 else ""
+    return pygame.event.Event(pygame.KEYDOWN, key=pygame.key.key_code(name), mod=0, unicode=unicode)
+
+
+def start(factory, keys, frames, **options):
+    # options go to the SceneManager, e.g. a scale mode (bench_scaling.py)
+    random.seed(1)
+    scene = factory()
+    # Every frame is a 60 fps frame of game time, however fast it runs
+    manager = SceneManager(scene.WIDTH, scene.HEIGHT, uncapped=True, frame_ms=1000 / 60, **options)
+    manager.push(scene)
+    script = {frame: [key_event(name)] for frame, name in keys.items() if frame <= frames}
+    return manager, script
+
+
+def finish():
+    # The music thread must not outlive the mixer
+    get_audio().stop_music()
+    pygame.quit()
+
+
+def measure_reference(frames=REFERENCE_FRAMES):
+    # Frames per second of a fixed fill and blit loop, what this machine
+    # manages right now; scenario frame rates are compared relative to it
+    screen = pygame.Surface((800, 600))
+    sprite = pygame.Surface((100, 100))
+    sprite.fill((200, 120, 40))
+    begin = time.perf_counter()
+    for frame in range(frames):
+        screen.fill((0, 0, 0))
+        for i in range(40):
+            screen.blit(sprite, ((frame + i * 37) % 700, (i * 53) % 500))
+    return frames / (time.perf_counter() - begin)
+
+
+def measure_time(factory, keys, frames):
+    manager, script = start(factory, keys, frames)
+    scene = manager.top
+    text = get_text_cache()
+    text.clear()  # Starts cold, like a fresh run
+    misses = text.misses
+    begin = time.perf_counter()
+    manager.run(max_frames=frames, script=script)
+    elapsed = time.perf_counter() - begin
+    profiler = manager.profiler
+    phases = {name: average(profiler.ordered(profiler.phases[i])) for i, name in enumerate(PHASES)}
+    renders = (text.misses - misses) / manager.frame
+    areas = None
+    if scene.compositor:
+        stats = scene.compositor.stats()
+        areas = (stats["drawn_per_frame"], stats["presented_per_frame"])
+    finish()
+    return manager.frame / elapsed, phases, renders, areas
+
+
+def measure_allocations(factory, keys, frames):
+    # One frame at a time, so each frame's peak can be read on its own
+    manager, script = start(factory, keys, frames)
+    tracemalloc.start()
+    peak_total = held_total = 0
+    for frame in range(1, frames + 1):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        manager.run(max_frames=1, script={1: script.get(frame, [])})
+        current, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+        held_total += current - before
+    tracemalloc.stop()
+    finish()
+    return peak_total / frames / 1024, held_total / frames / 1024
+
+
+def average(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def grew(result, baseline, field, threshold, slack):
+    # Missing from an older baseline, or not measured (no compositor)
+    if result.get(field) is None or baseline.get(field) is None:
+        return False
+    return result[field] > baseline[field] * (1 + threshold) + slack
+
+
+def regressions(name, result, baseline, threshold, gate_fps=False):
+    problems = []
+    if gate_fps and "relative_fps" in baseline and \
+            result["relative_fps"] < baseline["relative_fps"] * (1 - threshold):
+        problems.append(f"{name}: {result['relative_fps']:.2f}x the reference loop, "
+                        f"baseline {baseline['relative_fps']:.2f}x")
+    limit = max(baseline["alloc_kb"], MIN_ALLOC_KB) * (1 + threshold)
+    if result["alloc_kb"] > limit:
+        problems.append(f"{name}: {result['alloc_kb']:.1f} KB allocated per frame, "
+                        f"baseline {baseline['alloc_kb']:.1f}")
+    if grew(result, baseline, "text_renders", threshold, MIN_TEXT_RENDERS):
+        problems.append(f"{name}: {result['text_renders']:.2f} text renders per frame, "
+                        f"baseline {baseline['text_renders']:.2f}")
+    for field, label in (("drawn", "redrawn"), ("presented", "presented")):
+        if grew(result, baseline, field, threshold, MIN_AREA):
+            problems.append(f"{name}: {result[field]:.1%} of the screen {label} per frame, "
+                            f"baseline {baseline[field]:.1%}")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless game benchmarks")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed regression as a fraction, default 0.25")
+    parser.add_argument("--only", action="append", help="run just this scenario (repeatable)")
+    parser.add_argument("--gate-fps", action="store_true",
+                        help="also fail when the frame rate relative to the reference loop drops")
+    parser.add_argument("--baseline", default=BASELINES, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [s for s in SCENARIOS if not args.only or s[0] in args.only]
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    results = {}
+    problems = []
+    reference = measure_reference()
+    print(f"Reference loop: {reference:.0f} fps\n")
+    print(f"{'scenario':<10} {'fps':>8} {'rel':>6} " + " ".join(f"{p + ' ms':>10}" for p in PHASES)
+          + f" {'text/f':>7} {'drawn':>6} {'shown':>6} {'alloc KB':>9} {'held KB':>8} {'rel vs base':>12}")
+    for name, factory, keys in scenarios:
+        fps, phases, renders, areas = measure_time(factory, keys, args.frames)
+        alloc_kb, held_kb = measure_allocations(factory, keys, args.frames)
+        drawn, presented = areas or (None, None)
+        result = {"frames": args.frames, "fps": round(fps, 1),
+                  "relative_fps": round(fps / reference, 3),
+                  "phases_ms": {p: round(ms, 4) for p, ms in phases.items()},
+                  "text_renders": round(renders, 3),
+                  "drawn": None if drawn is None else round(drawn, 4),
+                  "presented": None if presented is None else round(presented, 4),
+                  "alloc_kb": round(alloc_kb, 2), "held_kb": round(held_kb, 3)}
+        results[name] = result
+        baseline = baselines.get(name)
+        if baseline and "relative_fps" in baseline:
+            change = f"{result['relative_fps'] / baseline['relative_fps'] - 1:+12.0%}"
+        else:
+            change = f"{'-':>12}"
+        area = (f"{drawn:6.1%} {presented:6.1%}" if areas else f"{'-':>6} {'-':>6}")
+        print(f"{name:<10} {fps:8.0f} {fps / reference:6.2f} " + " ".join(f"{phases[p]:10.3f}" for p in PHASES)
+              + f" {renders:7.2f} {area} {alloc_kb:9.1f} {held_kb:8.2f} {change}")
+        if baseline:
+            problems += regressions(name, result, baseline, args.threshold, args.gate_fps)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        baselines.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baselines written to {args.baseline}")
+        return 0
+    if problems:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""CPU use and wakeups per second of idle scenes, with pacing on and off.
+
+Each scenario runs a real game loop headless for a few seconds and is then
+stopped with a timed QUIT event.
+
+Run from the repository root:
+    python benchmarks/bench_pacing.py [seconds]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("AIO_GAMES_SCORES", "off")  # Benchmark rounds are not the player's
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import main as launcher_main
+from games.registry import get_game
+from games.utils.scenes import SceneManager
+
+
+def pong_menu():
+    return get_game("Pong").load()()
+
+
+def hangman_menu():
+    return get_game("Hangman").load()()
+
+
+def tetris_game_over():
+    game = get_game("Tetris").load()()
+    game.game_over = True
+    return game
+
+
+def snake_game_over():
+    game = get_game("Snake Game").load()()
+    game.game_over = True
+    return game
+
+
+def launcher():
+    return launcher_main.GameLauncher()
+
+
+# name, scene factory, events posted once the window exists
+SCENARIOS = [
+    ("pong difficulty menu", pong_menu, []),
+    ("hangman menu", hangman_menu, []),
+    ("tetris game over", tetris_game_over, []),
+    ("snake game over", snake_game_over, []),
+    ("launcher unfocused", launcher, [pygame.WINDOWFOCUSLOST]),
+]
+
+
+def measure(factory, events, pacing, seconds):
+    scene = factory()
+    manager = SceneManager(scene.WIDTH, scene.HEIGHT)
+    manager.push(scene)
+    for event_type in events:
+        pygame.event.post(pygame.event.Event(event_type))
+    manager.pacer.enabled = pacing
+    # Let the input grace period pass so idle behaviour kicks in at once
+    manager.pacer.last_input = -manager.pacer.wake_ms
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    wall, cpu = time.perf_counter(), time.process_time()
+    manager.run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    frames = manager.profiler.frames + 1
+    pygame.quit()
+    return cpu / wall * 100, frames / wall
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'scenario':<22} {'pacing':>6} {'cpu %':>7} {'wakeups/s':>10}")
+    for name, factory, events in SCENARIOS:
+        for pacing in (False, True):
+            cpu, wakeups = measure(factory, events, pacing, seconds)
+            print(f"{name:<22} {'on' if pacing else 'off':>6} {cpu:7.1f} {wakeups:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
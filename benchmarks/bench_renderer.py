@@ -0,0 +1,70 @@
+"""Frame times of the Surface and SDL2 Renderer backends.
+
+Runs the launcher menu and a few games headless and uncapped for a fixed
+number of frames on each backend and reports the average time spent
+drawing and presenting a frame. Every scene here draws through the canvas
+(textures on the Renderer); on the Surface backend the games only redraw
+and present what changed, see games/utils/compositor.py.
+
+Run from the repository root:
+    python benchmarks/bench_renderer.py [frames]
+"""
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("AIO_GAMES_SCORES", "off")  # Benchmark rounds are not the player's
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import main as launcher_main
+from games.registry import get_game
+from games.utils.audio import get_audio
+from games.utils.scenes import SceneManager
+
+BACKENDS = ("surface", "sdl2")
+
+# name, scene factory, key presses by frame
+SCENARIOS = [
+    ("launcher menu", launcher_main.GameLauncher, {}),
+    ("tetris", lambda: get_game("Tetris").load()(), {10: pygame.K_LEFT, 40: pygame.K_UP}),
+    ("snake", lambda: get_game("Snake Game").load()(), {}),
+    ("pong", lambda: get_game("Pong").load()(), {1: pygame.K_RETURN}),
+]
+
+
+def average(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def measure(factory, keys, renderer, frames):
+    random.seed(1)
+    scene = factory()
+    manager = SceneManager(scene.WIDTH, scene.HEIGHT, uncapped=True, renderer=renderer)
+    manager.push(scene)
+    script = {frame: [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="")]
+              for frame, key in keys.items()}
+    manager.run(max_frames=frames, script=script)
+    profiler = manager.profiler
+    draw = average(profiler.ordered(profiler.phases[2]))
+    flip = average(profiler.ordered(profiler.phases[3]))
+    name = manager.backend.name
+    get_audio().stop_music()  # The music thread must not outlive the mixer
+    pygame.quit()
+    return name, draw, flip
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    print(f"{'scenario':<14} {'backend':<14} {'draw ms':>8} {'present ms':>11} {'total ms':>9}")
+    for name, factory, keys in SCENARIOS:
+        for renderer in BACKENDS:
+            backend, draw, flip = measure(factory, keys, renderer, frames)
+            print(f"{name:<14} {backend:<14} {draw:8.3f} {flip:11.3f} {draw + flip:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Native high resolution against logical resolution plus upscaling.
+
+First a Snake-like frame (a static background, 60 cells, a score) drawn
+at 2x and 3x the logical 800x600, once natively at that size and once at
+800x600 then scaled up into a persistent buffer, with ``transform.scale``
+and with ``smoothscale``. Then every game played from its scripted
+benchmark scenario (see bench_games.py) with each scale mode into a
+1600x1200 window, where flip ms includes the scaling. Headless, SDL's
+``SCALED`` mode has only the software renderer to scale with.
+
+Run from the repository root:
+    python benchmarks/bench_scaling.py [frames]
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import pygame
+from bench_games import SCENARIOS, average, finish, start
+
+from games.utils.text import render_text
+
+LOGICAL = (800, 600)
+FACTORS = (2, 3)
+WINDOW = (1600, 1200)
+GAMES = ("snake", "pong", "tetris", "hangman")
+
+
+def build(factor):
+    # Static layer and font for a frame at factor times the logical size
+    size = (LOGICAL[0] * factor, LOGICAL[1] * factor)
+    background = pygame.Surface(size)
+    cell = 20 * factor
+    for x in range(0, size[0] + 1, cell):
+        pygame.draw.line(background, (50, 50, 50), (x, 0), (x, size[1]), factor)
+    for y in range(0, size[1] + 1, cell):
+        pygame.draw.line(background, (50, 50, 50), (0, y), (size[0], y), factor)
+    return size, background, pygame.font.Font(None, 48 * factor)
+
+
+def draw(surface, background, font, factor, frame):
+    surface.blit(background, (0, 0))
+    cell = 20 * factor
+    for i in range(60):
+        rect = ((frame + i) % 40 * cell + factor, (i * 7) % 30 * cell + factor,
+                cell - 2 * factor, cell - 2 * factor)
+        pygame.draw.rect(surface, (0, 255, 0), rect)
+    label = render_text(font, f"Score: {frame // 10}", (255, 255, 255))
+    surface.blit(label, (surface.get_width() // 2 - label.get_width() // 2, 20 * factor))
+
+
+def timed(frames, frame):
+    begin = time.perf_counter()
+    for i in range(frames):
+        frame(i)
+    return (time.perf_counter() - begin) * 1000 / frames
+
+
+def measure_frame(factor, frames):
+    size, native_background, native_font = build(factor)
+    _, background, font = build(1)
+    native = pygame.Surface(size)
+    logical = pygame.Surface(LOGICAL)
+    buffer = pygame.Surface(size)  # Scaled into, never reallocated
+
+    def upscaled(scale):
+        def frame(i):
+            draw(logical, background, font, 1, i)
+            scale(logical, size, buffer)
+        return frame
+
+    return {
+        "native": timed(frames, lambda i: draw(native, native_background, native_font, factor, i)),
+        "logical": timed(frames, lambda i: draw(logical, background, font, 1, i)),
+        "scale": timed(frames, upscaled(pygame.transform.scale)),
+        "smoothscale": timed(frames, upscaled(pygame.transform.smoothscale)),
+    }
+
+
+def measure_game(factory, keys, frames, scale):
+    manager, script = start(factory, keys, frames, scale=scale, window=WINDOW)
+    begin = time.perf_counter()
+    manager.run(max_frames=frames, script=script)
+    elapsed = time.perf_counter() - begin
+    profiler = manager.profiler
+    draw_ms = average(profiler.ordered(profiler.phases[2]))
+    flip_ms = average(profiler.ordered(profiler.phases[3]))
+    finish()
+    return manager.frame / elapsed, draw_ms, flip_ms
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    print(f"{'frame':<10} {'native ms':>10} {'logical ms':>11} {'+scale ms':>10} {'+smooth ms':>11}")
+    for factor in FACTORS:
+        result = measure_frame(factor, frames)
+        size = f"{LOGICAL[0] * factor}x{LOGICAL[1] * factor}"
+        print(f"{size:<10} {result['native']:10.3f} {result['logical']:11.3f} "
+              f"{result['scale']:10.3f} {result['smoothscale']:11.3f}")
+    finish()
+
+    print(f"\n{'scenario':<10} {'scale':<9} {'fps':>7} {'draw ms':>8} {'flip ms':>8}")
+    for name, factory, keys in SCENARIOS:
+        if name not in GAMES:
+            continue
+        for scale in ("none", "sdl", "software"):
+            fps, draw_ms, flip_ms = measure_game(factory, keys, frames, scale)
+            print(f"{name:<10} {scale:<9} {fps:7.0f} {draw_ms:8.3f} {flip_ms:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
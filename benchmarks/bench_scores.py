@@ -0,0 +1,96 @@
+"""Load test for the score store with a million rows.
+
+Adds ROUNDS rounds (default a million) spread over the games and their
+modes through ``ScoreStore.add()``, as the games do, into a fresh database
+in a temporary directory. Reports how long ``add()`` takes on the calling
+thread, which is all a game pays at game over, and how fast the writer
+thread gets the rows to disk in batches. Then it times the queries at that
+size: top 10, a percentile and the median from the count table (next to
+the same percentile counted from the scores table), the bests a game
+reads when it is built, and session stats.
+
+Run from the repository root:
+    python benchmarks/bench_scores.py [rounds]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import tempfile
+import time
+
+from games.utils.scores import ScoreStore
+
+MODES = {
+    "snake": [""],
+    "pong": ["easy", "medium", "hard"],
+    "tetris": [""],
+    "hangman": ["Animals", "Countries", "Food", "Sports"],
+}
+SCORES = {"snake": 60, "pong": 10, "tetris": 20000, "hangman": 6}
+QUERY_REPEATS = 20
+
+
+def timed(call, repeats=QUERY_REPEATS):
+    begin = time.perf_counter()
+    for _ in range(repeats):
+        result = call()
+    return (time.perf_counter() - begin) * 1000 / repeats, result
+
+
+def timed_prefetch(store, connection, game):
+    store.bests.clear()
+    store._load_bests(connection, game)
+    return len(store.bests)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(1)
+    games = list(MODES)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scores.db")
+        store = ScoreStore(path, player="bench")
+
+        worst = 0.0
+        begin = time.perf_counter()
+        for i in range(rounds):
+            game = games[i % len(games)]
+            mode = rng.choice(MODES[game])
+            score = int(rng.triangular(0, SCORES[game], SCORES[game] / 4))
+            start = time.perf_counter()
+            store.add(game, mode, score, duration=rng.uniform(10, 300), outcome="")
+            worst = max(worst, time.perf_counter() - start)
+        queued = time.perf_counter() - begin
+        store.flush()
+        written = time.perf_counter() - begin
+        stats = store.stats()
+        print(f"{rounds} rounds: add() {queued / rounds * 1e6:.2f} us average, {worst * 1e6:.0f} us max "
+              f"on the calling thread")
+        print(f"written in {written:.1f} s ({rounds / written:.0f} rows/s), {stats['batches']} batches "
+              f"of {stats['avg_batch']:.0f}, {stats['write_ms'] / 1000:.1f} s in the writer, "
+              f"{os.path.getsize(path) / 1024 / 1024:.0f} MB")
+
+        reader = store._reader()
+        print(f"\n{'query':<34} {'ms':>8}  result")
+        queries = [
+            ("top 10 tetris", lambda: store.top("tetris", "", 10)[0]),
+            ("top 10 pong hard", lambda: store.top("pong", "hard", 10)[0]),
+            ("percentile tetris 10000", lambda: round(store.percentile("tetris", "", 10000), 4)),
+            ("median tetris (score_at 0.5)", lambda: store.score_at("tetris", "", 0.5)),
+            ("percentile from scores (COUNT)", lambda: reader.execute(
+                "SELECT COUNT(*) FROM scores WHERE game = 'tetris' AND mode = '' AND score < 10000"
+            ).fetchone()[0]),
+            ("bests for hangman (prefetch)", lambda: timed_prefetch(store, reader, "hangman")),
+            ("session stats pong hard", lambda: store.session_stats("pong", "hard")["rounds"]),
+        ]
+        for name, query in queries:
+            ms, result = timed(query)
+            print(f"{name:<34} {ms:8.3f}  {result}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time from process start to the first menu frame.
+
+Starts the launcher in a fresh interpreter with ``-X importtime``, draws one
+menu frame and reports the wall time plus the slowest imports.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [runs] [top]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+import main
+from games.utils.scenes import SceneManager
+launcher = main.GameLauncher()
+manager = SceneManager(launcher.WIDTH, launcher.HEIGHT)
+manager.push(launcher)
+manager.run(max_frames=1)
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_once():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1", AIO_GAMES_SCORES="off")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", FIRST_FRAME],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    return wall, float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    walls, frames = [], []
+    for _ in range(runs):
+        wall, first_frame, modules = run_once()
+        walls.append(wall)
+        frames.append(first_frame)
+
+    print(f"process start to exit:   {statistics.median(walls) * 1000:8.1f} ms (median of {runs})")
+    print(f"main import to 1st frame: {statistics.median(frames) * 1000:7.1f} ms")
+
+    games = [m for m in modules if m[0].split(".")[0] == "games"]
+    names = list(dict.fromkeys(m[0] for m in games))
+    print(f"games.* modules imported: {len(names)} "
+          f"({sum(m[1] for m in games) / 1000:.1f} ms self time)")
+    for name in names:
+        print(f"    {name}")
+
+    print("\nslowest imports (last run, cumulative):")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.2f} ms  {self_us / 1000:8.2f} ms self  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time to get the Tetris sound effects ready, old WAV script vs synth.
+
+"legacy" is the previous sound_generator.py: per-sample math.sin into
+lists, struct.pack, WAV files on disk, then pygame.mixer.Sound(file) for
+each. "synth" generates the same set with games.utils.synth straight into
+mixer buffers; "cached" is a later session asking for them again.
+
+Run from the repository root:
+    python benchmarks/bench_synth.py [repeats]
+"""
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from games.tetris.sound_generator import load_sounds
+from games.utils import synth
+
+
+def legacy_sine(frequency, duration, amplitude=0.5, sample_rate=44100):
+    wave_data = []
+    for i in range(int(sample_rate * duration)):
+        t = float(i) / sample_rate
+        wave_data.append(amplitude * math.sin(2 * math.pi * frequency * t))
+    return wave_data
+
+
+def legacy_rotate():
+    wave_data = []
+    for i in range(int(44100 * 0.1)):
+        t = float(i) / 44100
+        wave_data.append(0.5 * math.sin(2 * math.pi * (440 + 220 * t) * t))
+    return wave_data
+
+
+def legacy_sequence(frequencies, duration, amplitude=0.5):
+    wave_data = []
+    for freq in frequencies:
+        wave_data.extend(legacy_sine(freq, duration, amplitude))
+    return wave_data
+
+
+def legacy_save(filename, wave_data):
+    with wave.open(filename, 'w') as wave_file:
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(44100)
+        scaled = [int(sample * 32767) for sample in wave_data]
+        wave_file.writeframes(struct.pack('h' * len(scaled), *scaled))
+
+
+def legacy(directory):
+    sounds = {
+        'move.wav': legacy_sine(880, 0.05),
+        'rotate.wav': legacy_rotate(),
+        'drop.wav': legacy_sine(220, 0.15, amplitude=0.7),
+        'clear.wav': legacy_sequence([440, 554, 659, 880], 0.1),
+        'gameover.wav': legacy_sequence([440, 392, 349, 330], 0.15, amplitude=0.6),
+    }
+    for filename, wave_data in sounds.items():
+        legacy_save(os.path.join(directory, filename), wave_data)
+    return [pygame.mixer.Sound(os.path.join(directory, filename)) for filename in sounds]
+
+
+def fresh_synth():
+    synth.clear_cache()
+    return load_sounds()
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pygame.mixer.init()
+    print(f"mixer {pygame.mixer.get_init()}, numpy {'yes' if synth.numpy is not None else 'no'}")
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            ("legacy", timed(lambda: legacy(directory), repeats)),
+            ("synth", timed(fresh_synth, repeats)),
+            ("cached", timed(load_sounds, repeats)),
+        ]
+    print(f"{'path':<8} {'ms':>8}")
+    for name, ms in results:
+        print(f"{name:<8} {ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
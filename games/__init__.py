@@ -1,6 +1,11 @@
-from games.snake.snake_game import SnakeGame
-from games.hangman.hangman_game import HangmanGame
-from games.pong.pong_game import PongGame
-from games.tetris.tetris_game import TetrisGame
+from games.registry import GAMES, GameInfo, get_game
 
-__all__ = ['SnakeGame', 'HangmanGame', 'PongGame', 'TetrisGame'] 
\ No newline at end of file
+__all__ = ['SnakeGame', 'HangmanGame', 'PongGame', 'TetrisGame', 'GAMES', 'GameInfo', 'get_game']
+
+
+def __getattr__(name):
+    # Game classes are imported on first access, see games.registry
+    game = get_game(name)
+    if game is None:
+        raise AttributeError(f"module 'games' has no attribute '{name}'")
+    return game.load()
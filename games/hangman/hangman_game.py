@@ -1,25 +1,31 @@
 import pygame
-import random
 import math
 
-class HangmanGame:
+from games.utils.compositor import Compositor
+from games.utils.dialog import Dialog
+from games.utils.scenes import Scene
+from games.utils.text import render_text
+
+class HangmanGame(Scene):
+    UPDATE_RATE = 60
+    CAPTION = "Hangman"
+    USES_CANVAS = True
+    SNAPSHOT_FIELDS = ("state", "selected_category", "used_words", "word", "hint",
+                       "guessed_letters", "wrong_guesses", "game_over", "won",
+                       "letter_animations", "hint_showing", "hint_alpha", "menu_alpha", "previous_best")
+    GAME_ID = "hangman"  # Scores are the lives left, per category
+    # Area of the gallows and figure
+    HANGMAN_RECT = pygame.Rect(90, 90, 270, 320)
+
     def __init__(self):
-        pygame.init()
+        super().__init__()
         self.WIDTH = 800
         self.HEIGHT = 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Hangman")
-        self.clock = pygame.time.Clock()
         
-        # Load fonts
-        try:
-            self.font = pygame.font.Font("games/fonts/Roboto-Bold.ttf", 48)
-            self.small_font = pygame.font.Font("games/fonts/Roboto-Regular.ttf", 36)
-            self.tiny_font = pygame.font.Font("games/fonts/Roboto-Light.ttf", 24)
-        except:
-            self.font = pygame.font.Font(None, 48)
-            self.small_font = pygame.font.Font(None, 36)
-            self.tiny_font = pygame.font.Font(None, 24)
+        # Load fonts, the default font stands in when Roboto isn't bundled
+        self.font = self.load_font("fonts/Roboto-Bold.ttf", 48)
+        self.small_font = self.load_font("fonts/Roboto-Regular.ttf", 36)
+        self.tiny_font = self.load_font("fonts/Roboto-Light.ttf", 24)
         
         # Colors
         self.WHITE = (255, 255, 255)
@@ -36,6 +42,7 @@ class HangmanGame:
         self.letter_animations = {}  # {letter: (scale, alpha)}
         self.hint_alpha = 0
         self.hint_showing = False
+        self.faded = {}  # Copies of cached labels that fade, see faded_text()
         
         # Game states
         self.MENU = 0
@@ -482,6 +489,7 @@ class HangmanGame:
         self.category_list = list(self.categories.keys())
         self.used_words = {category: set() for category in self.categories}
         self.reset_game()
+        self.build_layers()
         
     def get_random_word(self, category):
         # Get list of unused words
@@ -493,7 +501,7 @@ class HangmanGame:
             self.used_words[category].clear()
             available_words = self.categories[category]
             
-        word, hint = random.choice(available_words)
+        word, hint = self.random.choice(available_words)
         self.used_words[category].add(word)
         return word, hint
         
@@ -506,19 +514,40 @@ class HangmanGame:
         self.max_wrong_guesses = 6
         self.game_over = False
         self.won = False
+        self.start_round()
         self.letter_animations.clear()
         self.hint_alpha = 0
         self.hint_showing = False
         
+    def lives_left(self):
+        return self.max_wrong_guesses - self.wrong_guesses
+
     def is_word_guessed(self):
         return all(letter in self.guessed_letters for letter in self.word)
         
-    def draw_hangman(self):
+    def build_layers(self):
+        # Static parts drawn once: the game screen's hints and every stage of the gallows
+        self.game_layer = pygame.Surface((self.WIDTH, self.HEIGHT))
+        self.game_layer.fill(self.BLACK)
+        menu_text = render_text(self.small_font, "ESC - Main Menu", self.GRAY)
+        hint_text = render_text(self.small_font, "Ctrl+H - Show Hint", self.GRAY)
+        self.game_layer.blit(menu_text, (20, 20))
+        self.game_layer.blit(hint_text, (20, 60))
+        self.hangman_stages = [self.build_hangman(wrong) for wrong in range(self.max_wrong_guesses + 1)]
+        self.compositor = Compositor((self.WIDTH, self.HEIGHT))
+        self.game_over_box = Dialog((self.WIDTH, self.HEIGHT), self.font, self.small_font)
+
+    def build_hangman(self, wrong_guesses):
+        surface = pygame.Surface(self.HANGMAN_RECT.size)
+        ox, oy = self.HANGMAN_RECT.topleft
+
         # Draw gallows with smooth lines
         def draw_smooth_line(start, end, width=3):
-            pygame.draw.line(self.screen, self.WHITE, start, end, width)
-            pygame.draw.circle(self.screen, self.WHITE, start, width//2)
-            pygame.draw.circle(self.screen, self.WHITE, end, width//2)
+            start = (start[0] - ox, start[1] - oy)
+            end = (end[0] - ox, end[1] - oy)
+            pygame.draw.line(surface, self.WHITE, start, end, width)
+            pygame.draw.circle(surface, self.WHITE, start, width//2)
+            pygame.draw.circle(surface, self.WHITE, end, width//2)
             
         # Base structure
         draw_smooth_line((100, 400), (300, 400))  # Base
@@ -526,58 +555,74 @@ class HangmanGame:
         draw_smooth_line((200, 100), (300, 100))  # Top
         draw_smooth_line((300, 100), (300, 150))  # Rope
         
-        if self.wrong_guesses >= 1:
+        if wrong_guesses >= 1:
             # Head with smooth circle
-            pygame.draw.circle(self.screen, self.WHITE, (300, 175), 25, 3)
-        if self.wrong_guesses >= 2:
+            pygame.draw.circle(surface, self.WHITE, (300 - ox, 175 - oy), 25, 3)
+        if wrong_guesses >= 2:
             # Body
             draw_smooth_line((300, 200), (300, 300))
-        if self.wrong_guesses >= 3:
+        if wrong_guesses >= 3:
             # Left arm
             draw_smooth_line((300, 225), (250, 275))
-        if self.wrong_guesses >= 4:
+        if wrong_guesses >= 4:
             # Right arm
             draw_smooth_line((300, 225), (350, 275))
-        if self.wrong_guesses >= 5:
+        if wrong_guesses >= 5:
             # Left leg
             draw_smooth_line((300, 300), (250, 375))
-        if self.wrong_guesses >= 6:
+        if wrong_guesses >= 6:
             # Right leg
             draw_smooth_line((300, 300), (350, 375))
+        return surface
+
+    def draw_text(self, font, string, color, dest, alpha=255, anchor="topleft"):
+        # Fully shown text is only drawn when its area is redrawn, fading text every frame
+        if alpha >= 255:
+            return self.compositor.text(font, string, color, dest, anchor)
+        label = self.faded_text(font, string, color, alpha)
+        rect = label.get_rect(**{anchor: dest})
+        return self.compositor.blit(label, rect.topleft, key=("hangman-text", font, string, color, alpha))
+
+    def faded_text(self, font, string, color, alpha):
+        # The opaque label comes from the text cache once, each fade step
+        # only changes the alpha of a copy kept for it
+        key = (font, string, color)
+        label = self.faded.get(key)
+        if label is None:
+            label = self.faded[key] = render_text(font, string, color).copy()
+        label.set_alpha(alpha)
+        return label
+
+    def draw_hangman(self):
+        stage = min(self.wrong_guesses, self.max_wrong_guesses)
+        self.compositor.blit(self.hangman_stages[stage], self.HANGMAN_RECT.topleft,
+                             key=("hangman-stage", stage))
             
     def draw_word(self):
-        word_display = ""
         spacing = 30  # Space between letters
         start_x = 400
         
         for i, letter in enumerate(self.word):
             if letter in self.guessed_letters:
-                # Animate letter appearance
-                if letter not in self.letter_animations:
-                    self.letter_animations[letter] = (0, 0)  # (scale, alpha)
-                
-                scale, alpha = self.letter_animations[letter]
-                if scale < 1.0:
-                    scale = min(1.0, scale + 0.1)
-                if alpha < 255:
-                    alpha = min(255, alpha + 25)
-                self.letter_animations[letter] = (scale, alpha)
-                
-                # Draw letter with animation
-                letter_surf = self.font.render(letter, True, self.WHITE)
-                letter_surf.set_alpha(alpha)
+                # Draw letter with animation, advanced in update()
+                scale, alpha = self.letter_animations.get(letter, (0, 0))
+                center = (start_x + i * spacing, 300)
+                if scale >= 1.0:
+                    self.draw_text(self.font, letter, self.WHITE, center, alpha, "center")
+                    continue
+                letter_surf = render_text(self.font, letter, self.WHITE)
                 scaled_size = (int(letter_surf.get_width() * scale), 
                              int(letter_surf.get_height() * scale))
                 if scaled_size[0] > 0 and scaled_size[1] > 0:
                     letter_surf = pygame.transform.scale(letter_surf, scaled_size)
-                pos_x = start_x + i * spacing - letter_surf.get_width()//2
-                pos_y = 300 - letter_surf.get_height()//2
-                self.screen.blit(letter_surf, (pos_x, pos_y))
+                    letter_surf.set_alpha(alpha)  # A new surface, ours to change
+                else:
+                    letter_surf = self.faded_text(self.font, letter, self.WHITE, alpha)
+                self.compositor.blit(letter_surf, letter_surf.get_rect(center=center).topleft,
+                                     key=("hangman-letter", letter, scale, alpha))
             else:
                 # Draw underscore
-                pygame.draw.line(self.screen, self.GRAY,
-                               (start_x + i * spacing - 10, 320),
-                               (start_x + i * spacing + 10, 320), 2)
+                self.compositor.rect(self.GRAY, (start_x + i * spacing - 10, 320, 21, 2))
         
     def draw_guessed_letters(self):
         guessed = sorted(self.guessed_letters)
@@ -586,44 +631,30 @@ class HangmanGame:
         
         for i, letter in enumerate(guessed):
             color = self.RED if letter not in self.word else self.GREEN
-            text = self.small_font.render(letter, True, color)
-            self.screen.blit(text, (x + i * spacing, y))
+            self.compositor.text(self.small_font, letter, color, (x + i * spacing, y))
             
     def draw_hint(self):
         if self.hint_showing:
-            if self.hint_alpha < 255:
-                self.hint_alpha = min(255, self.hint_alpha + 10)
-                
-            hint_text = self.small_font.render(f"Hint: {self.hint}", True, self.BLUE)
-            hint_text.set_alpha(self.hint_alpha)
-            self.screen.blit(hint_text, (50, 450))
+            self.draw_text(self.small_font, f"Hint: {self.hint}", self.BLUE, (50, 450), self.hint_alpha)
         
     def draw_category(self):
         category = f"Category: {self.category_list[self.selected_category]}"
-        text = self.small_font.render(category, True, self.BLUE)
-        self.screen.blit(text, (400, 200))
+        self.compositor.text(self.small_font, category, self.BLUE, (400, 200))
         
     def draw_menu(self):
-        self.screen.fill(self.BLACK)
-        
-        # Fade in animation
-        if self.menu_alpha < 255:
-            self.menu_alpha = min(255, self.menu_alpha + self.fade_speed)
+        self.compositor.set_background(None)
         
         # Title with shadow
         shadow_offset = 2
-        title = self.font.render("Select Category", True, self.GRAY)
-        title_main = self.font.render("Select Category", True, self.WHITE)
-        title_pos = (self.WIDTH//2 - title.get_width()//2, 100)
-        title.set_alpha(self.menu_alpha)
-        title_main.set_alpha(self.menu_alpha)
-        self.screen.blit(title, (title_pos[0] + shadow_offset, title_pos[1] + shadow_offset))
-        self.screen.blit(title_main, title_pos)
+        self.draw_text(self.font, "Select Category", self.GRAY,
+                       (self.WIDTH//2 + shadow_offset, 100 + shadow_offset), self.menu_alpha, "midtop")
+        self.draw_text(self.font, "Select Category", self.WHITE,
+                       (self.WIDTH//2, 100), self.menu_alpha, "midtop")
         
         # Category options with hover effect
         start_y = 250
         spacing = 60
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.manager.mouse_pos()
         
         for i, category in enumerate(self.category_list):
             text_pos = (self.WIDTH//2, start_y + i * spacing)
@@ -631,24 +662,19 @@ class HangmanGame:
             
             color = self.WHITE if i == self.selected_category else \
                    self.LIGHT_GRAY if hover else self.GRAY
-            text = self.small_font.render(category, True, color)
-            text.set_alpha(self.menu_alpha)
-            self.screen.blit(text, (text_pos[0] - text.get_width()//2, text_pos[1]))
+            self.draw_text(self.small_font, category, color, text_pos, self.menu_alpha, "midtop")
         
         # Instructions
-        instructions = self.small_font.render("Press ENTER to start", True, self.GRAY)
-        instructions.set_alpha(self.menu_alpha)
-        self.screen.blit(instructions, (self.WIDTH//2 - instructions.get_width()//2, self.HEIGHT - 100))
+        self.draw_text(self.small_font, "Press ENTER to start", self.GRAY,
+                       (self.WIDTH//2, self.HEIGHT - 100), self.menu_alpha, "midtop")
         
         # Quit instruction
-        quit_text = self.small_font.render("Press ESC to quit", True, self.GRAY)
-        quit_text.set_alpha(self.menu_alpha)
-        self.screen.blit(quit_text, (self.WIDTH - quit_text.get_width() - 20, 20))
-        
-        pygame.display.flip()
+        self.draw_text(self.small_font, "Press ESC to quit", self.GRAY,
+                       (self.WIDTH - 20, 20), self.menu_alpha, "topright")
         
     def draw_game(self):
-        self.screen.fill(self.BLACK)
+        draw = self.compositor
+        draw.set_background(self.game_layer, key=("hangman-background",))
         
         self.draw_hangman()
         self.draw_word()
@@ -656,104 +682,83 @@ class HangmanGame:
         self.draw_category()
         self.draw_hint()
         
-        # Draw menu and hint options
-        menu_text = self.small_font.render("ESC - Back to Menu", True, self.GRAY)
-        hint_text = self.small_font.render("Ctrl+H - Show Hint", True, self.GRAY)
-        self.screen.blit(menu_text, (20, 20))
-        self.screen.blit(hint_text, (20, 60))
-        
         if self.game_over:
-            # Create semi-transparent overlay
-            overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
-            overlay.fill(self.BLACK)
-            overlay.set_alpha(180)
-            self.screen.blit(overlay, (0, 0))
-            
-            # Create message box
-            box_width = 500
-            box_height = 200
-            box_x = self.WIDTH//2 - box_width//2
-            box_y = self.HEIGHT//2 - box_height//2
-            
-            # Draw box background and border
-            pygame.draw.rect(self.screen, self.GRAY, 
-                           (box_x, box_y, box_width, box_height))
-            pygame.draw.rect(self.screen, self.WHITE, 
-                           (box_x, box_y, box_width, box_height), 3)
-            
-            # Draw message
-            if self.won:
-                text = self.font.render("You Won!", True, self.GREEN)
-                word_text = self.small_font.render(f"Word: {self.word}", True, self.WHITE)
-                self.screen.blit(text, (self.WIDTH//2 - text.get_width()//2, box_y + 40))
-                self.screen.blit(word_text, (self.WIDTH//2 - word_text.get_width()//2, box_y + 90))
-            else:
-                text = self.font.render("Game Over!", True, self.RED)
-                word_text = self.small_font.render(f"Word: {self.word}", True, self.WHITE)
-                self.screen.blit(text, (self.WIDTH//2 - text.get_width()//2, box_y + 40))
-                self.screen.blit(word_text, (self.WIDTH//2 - word_text.get_width()//2, box_y + 90))
-            
-            # Draw instructions
-            restart = self.small_font.render("SPACE - Play again    ESC - Menu", True, self.WHITE)
-            self.screen.blit(restart, (self.WIDTH//2 - restart.get_width()//2, box_y + 140))
+            # Dimmed screen and message box, rendered once per word
+            best = self.best_label(self.lives_left() if self.won else 0, "{} lives left")
+            self.game_over_box.draw(draw, "You Won!" if self.won else "Game Over!",
+                                    self.GREEN if self.won else self.RED, [
+                (f"Word: {self.word}", self.WHITE),
+                best and (best[0], self.GREEN if best[1] else self.WHITE),
+            ], "SPACE - Play again    ESC - Categories")
         
-        pygame.display.flip()
-        
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.state == self.MENU:
-                        if event.key == pygame.K_UP:
-                            self.selected_category = (self.selected_category - 1) % len(self.category_list)
-                        elif event.key == pygame.K_DOWN:
-                            self.selected_category = (self.selected_category + 1) % len(self.category_list)
-                        elif event.key == pygame.K_RETURN:
-                            self.state = self.PLAYING
-                            self.menu_alpha = 0  # Reset fade for next menu entry
-                            self.reset_game()
-                        elif event.key == pygame.K_ESCAPE:
-                            running = False
-                    else:  # In game
-                        if not self.game_over:
-                            if event.key == pygame.K_ESCAPE:
-                                self.state = self.MENU
-                            # Handle Ctrl+H for hint
-                            elif event.key == pygame.K_h and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                                self.hint_showing = True
-                            elif event.unicode.isalpha():
-                                letter = event.unicode.upper()
-                                if letter not in self.guessed_letters:
-                                    self.guessed_letters.add(letter)
-                                    if letter not in self.word:
-                                        self.wrong_guesses += 1
-                                        if self.wrong_guesses >= self.max_wrong_guesses:
-                                            self.game_over = True
-                                    elif self.is_word_guessed():
-                                        self.game_over = True
-                                        self.won = True
-                        else:  # Game over
-                            if event.key == pygame.K_SPACE:
-                                self.reset_game()
-                            elif event.key == pygame.K_ESCAPE:
-                                self.state = self.MENU
-                                
+    def is_static(self):
+        # Static once the menu has faded in or every letter and hint animation is done
+        if self.state == self.MENU:
+            return self.menu_alpha >= 255
+        if self.hint_showing and self.hint_alpha < 255:
+            return False
+        return all(self.letter_animations.get(letter, (0, 0))[1] >= 255
+                   for letter in self.guessed_letters if letter in self.word)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
             if self.state == self.MENU:
-                self.draw_menu()
-            else:
-                self.draw_game()
-            
-            self.clock.tick(60)
-            
-        # Clean up before returning to main menu
-        try:
-            pygame.display.quit()
-            pygame.display.init()
-        except pygame.error:
-            pass
+                if event.key == pygame.K_UP:
+                    self.selected_category = (self.selected_category - 1) % len(self.category_list)
+                elif event.key == pygame.K_DOWN:
+                    self.selected_category = (self.selected_category + 1) % len(self.category_list)
+                elif event.key == pygame.K_RETURN:
+                    self.state = self.PLAYING
+                    self.menu_alpha = 0  # Reset fade for next menu entry
+                    self.reset_game()
+                elif event.key == pygame.K_ESCAPE:
+                    self.manager.pop()  # Return to main menu
+            elif self.game_over:
+                if event.key == pygame.K_SPACE:
+                    self.reset_game()
+                elif event.key == pygame.K_ESCAPE:
+                    self.state = self.MENU  # Pick another category
+            else:  # In game
+                if event.key == pygame.K_ESCAPE:
+                    # Back to the launcher mid-game, the session keeps the round
+                    self.manager.pop()
+                # Handle Ctrl+H for hint
+                elif event.key == pygame.K_h and event.mod & pygame.KMOD_CTRL:
+                    self.hint_showing = True
+                elif event.unicode.isalpha():
+                    letter = event.unicode.upper()
+                    if letter not in self.guessed_letters:
+                        self.guessed_letters.add(letter)
+                        if letter not in self.word:
+                            self.wrong_guesses += 1
+                            if self.wrong_guesses >= self.max_wrong_guesses:
+                                self.game_over = True
+                                self.finish_round(0, self.category_list[self.selected_category], "lost")
+                        elif self.is_word_guessed():
+                            self.game_over = True
+                            self.won = True
+                            self.finish_round(self.lives_left(), self.category_list[self.selected_category],
+                                              "won")
+                        
+    def update(self):
+        # Fades and letter animations, a fixed amount per update
+        if self.state == self.MENU:
+            if self.menu_alpha < 255:
+                self.menu_alpha = min(255, self.menu_alpha + self.fade_speed)
+            return
+        for letter in self.guessed_letters:
+            if letter in self.word:
+                scale, alpha = self.letter_animations.get(letter, (0, 0))
+                if scale < 1.0 or alpha < 255:
+                    self.letter_animations[letter] = (min(1.0, scale + 0.1), min(255, alpha + 25))
+        if self.hint_showing and self.hint_alpha < 255:
+            self.hint_alpha = min(255, self.hint_alpha + 10)
+
+    def draw(self):
+        if self.state == self.MENU:
+            self.draw_menu()
+        else:
+            self.draw_game()
 
 def main():
     game = HangmanGame()
@@ -0,0 +1,27 @@
+import pygame
+
+from games.utils.previews import register_preview
+
+
+@register_preview("Hangman", frames=7, hold=10)
+def draw_preview(surface, frame):
+    # Each frame adds one more part of the drawing
+    progress = frame
+    white = (255, 255, 255)
+
+    pygame.draw.line(surface, white, (30, 100), (90, 100), 2)  # Base
+    if progress >= 1:
+        pygame.draw.line(surface, white, (60, 100), (60, 20), 2)  # Pole
+    if progress >= 2:
+        pygame.draw.line(surface, white, (60, 20), (80, 20), 2)  # Top
+        pygame.draw.line(surface, white, (80, 20), (80, 30), 2)  # Rope
+    if progress >= 3:
+        pygame.draw.circle(surface, white, (80, 40), 10, 2)  # Head
+    if progress >= 4:
+        pygame.draw.line(surface, white, (80, 50), (80, 70), 2)  # Body
+    if progress >= 5:
+        pygame.draw.line(surface, white, (80, 55), (70, 65), 2)  # Left arm
+        pygame.draw.line(surface, white, (80, 55), (90, 65), 2)  # Right arm
+    if progress >= 6:
+        pygame.draw.line(surface, white, (80, 70), (70, 85), 2)  # Left leg
+        pygame.draw.line(surface, white, (80, 70), (90, 85), 2)  # Right leg
@@ -1,17 +1,28 @@
 import pygame
-import random
 import math
 
-class PongGame:
+from games.utils.compositor import Compositor
+from games.utils.dialog import Dialog
+from games.utils.effects import Bloom
+from games.utils.scenes import Scene
+from games.utils.text import render_text
+from games.utils.timestep import lerp
+
+class PongGame(Scene):
+    UPDATE_RATE = 60
+    CAPTION = "Pong"
+    USES_CANVAS = True
+    SNAPSHOT_FIELDS = ("state", "selected_difficulty", "player_y", "ai_y", "ai_target_y",
+                       "ai_reaction_counter", "ball_x", "ball_y", "ball_speed", "ball_dx", "ball_dy",
+                       "player_score", "ai_score", "previous_best")
+    GAME_ID = "pong"  # Scores are the point margin, per difficulty
+
     def __init__(self):
-        pygame.init()
+        super().__init__()
         self.WIDTH = 800
         self.HEIGHT = 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Pong")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 36)
+        self.font = self.load_font(None, 48)
+        self.small_font = self.load_font(None, 36)
         
         # Game states
         self.MENU = 0
@@ -30,8 +41,12 @@ class PongGame:
             "Medium": {"speed": 7, "reaction_time": 20, "mistake_chance": 0.1},
             "Hard": {"speed": 10, "reaction_time": 10, "mistake_chance": 0.05}
         }
+
+        # Glow around the ball
+        self.ball_glow = Bloom(64, 64, threshold=128)
         
         self.reset_game()
+        self.build_layers()
         
     def reset_game(self):
         # Paddle settings
@@ -48,11 +63,12 @@ class PongGame:
         self.ball_x = self.WIDTH // 2
         self.ball_y = self.HEIGHT // 2
         self.ball_speed = 7
-        angle = random.uniform(-math.pi/4, math.pi/4)
-        if random.random() < 0.5:
+        angle = self.random.uniform(-math.pi/4, math.pi/4)
+        if self.random.random() < 0.5:
             angle += math.pi
         self.ball_dx = math.cos(angle) * self.ball_speed
         self.ball_dy = math.sin(angle) * self.ball_speed
+        self.previous = self.positions()
         
         # Score
         self.player_score = 0
@@ -86,8 +102,8 @@ class PongGame:
             self.ai_reaction_counter = 0
             
             # Occasionally make mistakes
-            if random.random() < difficulty["mistake_chance"]:
-                self.ai_target_y = random.randint(0, self.HEIGHT - self.PADDLE_HEIGHT)
+            if self.random.random() < difficulty["mistake_chance"]:
+                self.ai_target_y = self.random.randint(0, self.HEIGHT - self.PADDLE_HEIGHT)
             else:
                 self.ai_target_y = self.ball_y - self.PADDLE_HEIGHT/2
         
@@ -129,158 +145,174 @@ class PongGame:
             self.player_score += 1
             self.reset_ball()
             
+    def positions(self):
+        return (self.ball_x, self.ball_y, self.player_y, self.ai_y)
+
+    def restore(self, state):
+        super().restore(state)
+        self.previous = self.positions()  # Nothing to interpolate from yet
+
+    def interpolated(self):
+        # Ball and paddles between their last two updates
+        alpha = self.alpha
+        ball_x, ball_y, player_y, ai_y = (lerp(a, b, alpha) for a, b in zip(self.previous, self.positions()))
+        if abs(self.ball_x - self.previous[0]) > self.WIDTH // 4:
+            ball_x, ball_y = self.ball_x, self.ball_y  # Served again from the middle
+        return ball_x, ball_y, player_y, ai_y
+
     def reset_ball(self):
         self.ball_x = self.WIDTH // 2
         self.ball_y = self.HEIGHT // 2
-        angle = random.uniform(-math.pi/4, math.pi/4)
-        if random.random() < 0.5:
+        angle = self.random.uniform(-math.pi/4, math.pi/4)
+        if self.random.random() < 0.5:
             angle += math.pi
         self.ball_speed = 7
         self.ball_dx = math.cos(angle) * self.ball_speed
         self.ball_dy = math.sin(angle) * self.ball_speed
         
+    def build_layers(self):
+        # The labels and hint of the game screen never change, drawn once
+        self.game_layer = pygame.Surface((self.WIDTH, self.HEIGHT))
+        player_label = render_text(self.small_font, "PLAYER", (128, 128, 128))
+        ai_label = render_text(self.small_font, "AI", (128, 128, 128))
+        self.game_layer.blit(player_label, (self.WIDTH//4 - player_label.get_width()//2, 20))
+        self.game_layer.blit(ai_label, (3*self.WIDTH//4 - ai_label.get_width()//2, 20))
+        controls = render_text(self.small_font, "W/S - Move    ESC - Main Menu", (128, 128, 128))
+        self.game_layer.blit(controls, (self.WIDTH//2 - controls.get_width()//2, self.HEIGHT - 40))
+        self.compositor = Compositor((self.WIDTH, self.HEIGHT))
+
+        # The ball always glows the same, so the glow is rendered once
+        ball = pygame.Surface(self.ball_glow.size)
+        ball_rect = pygame.Rect(0, 0, self.BALL_SIZE, self.BALL_SIZE)
+        ball_rect.center = ball.get_rect().center
+        ball.fill((255, 255, 255), ball_rect)
+        glow = self.ball_glow.render(ball)
+        self.ball_sprite = glow.copy() if glow is not None else None
+
+        self.winner_box = Dialog((self.WIDTH, self.HEIGHT), self.font, self.small_font)
+        
     def draw_menu(self):
-        self.screen.fill((0, 0, 0))
+        draw = self.compositor
+        draw.set_background(None)
         
         # Title
-        title = self.font.render("Select Difficulty", True, (255, 255, 255))
-        self.screen.blit(title, (self.WIDTH//2 - title.get_width()//2, 100))
+        draw.text(self.font, "Select Difficulty", (255, 255, 255), (self.WIDTH//2, 100), "midtop")
         
         # Difficulty options
         start_y = 250
         spacing = 60
         for i, diff in enumerate(self.difficulties):
             color = (255, 255, 255) if i == self.selected_difficulty else (128, 128, 128)
-            text = self.small_font.render(diff, True, color)
-            self.screen.blit(text, (self.WIDTH//2 - text.get_width()//2, start_y + i * spacing))
+            draw.text(self.small_font, diff, color, (self.WIDTH//2, start_y + i * spacing), "midtop")
         
         # Instructions
-        instructions = self.small_font.render("Press ENTER to start", True, (128, 128, 128))
-        self.screen.blit(instructions, (self.WIDTH//2 - instructions.get_width()//2, self.HEIGHT - 100))
+        draw.text(self.small_font, "Press ENTER to start", (128, 128, 128),
+                  (self.WIDTH//2, self.HEIGHT - 100), "midtop")
         
         # Thêm nút thoát
-        quit_text = self.small_font.render("ESC - Back to Menu", True, (128, 128, 128))
-        self.screen.blit(quit_text, (20, 20))
-        
-        pygame.display.flip()
+        draw.text(self.small_font, "ESC - Main Menu", (128, 128, 128), (20, 20))
         
     def draw_game(self):
-        self.screen.fill((0, 0, 0))
+        draw = self.compositor
+        draw.set_background(self.game_layer, key=("pong-background",))
+        ball_x, ball_y, player_y, ai_y = self.interpolated()
         
         # Draw paddles
-        pygame.draw.rect(self.screen, (255, 255, 255),
-                        (0, self.player_y, self.PADDLE_WIDTH, self.PADDLE_HEIGHT))
-        pygame.draw.rect(self.screen, (255, 255, 255),
-                        (self.WIDTH - self.PADDLE_WIDTH, self.ai_y,
-                         self.PADDLE_WIDTH, self.PADDLE_HEIGHT))
+        draw.rect((255, 255, 255), (0, player_y, self.PADDLE_WIDTH, self.PADDLE_HEIGHT))
+        draw.rect((255, 255, 255), (self.WIDTH - self.PADDLE_WIDTH, ai_y,
+                                    self.PADDLE_WIDTH, self.PADDLE_HEIGHT))
         
         # Draw ball
-        pygame.draw.rect(self.screen, (255, 255, 255),
-                        (self.ball_x, self.ball_y, self.BALL_SIZE, self.BALL_SIZE))
-        
-        # Draw scores and player indicators
-        player_text = self.font.render(str(self.player_score), True, (255, 255, 255))
-        ai_text = self.font.render(str(self.ai_score), True, (255, 255, 255))
+        draw.rect((255, 255, 255), (ball_x, ball_y, self.BALL_SIZE, self.BALL_SIZE))
+        if self.ball_sprite is not None:
+            size = self.ball_glow.size
+            draw.blit(self.ball_sprite, (ball_x + self.BALL_SIZE // 2 - size[0] // 2,
+                                         ball_y + self.BALL_SIZE // 2 - size[1] // 2),
+                      key=("pong-ball-glow",), additive=True)
         
-        # Draw player labels
-        player_label = self.small_font.render("PLAYER", True, (128, 128, 128))
-        ai_label = self.small_font.render("AI", True, (128, 128, 128))
-        
-        # Position scores and labels
-        self.screen.blit(player_text, (self.WIDTH//4, 50))
-        self.screen.blit(ai_text, (3*self.WIDTH//4, 50))
-        self.screen.blit(player_label, (self.WIDTH//4 - player_label.get_width()//2, 20))
-        self.screen.blit(ai_label, (3*self.WIDTH//4 - ai_label.get_width()//2, 20))
+        # Draw scores
+        draw.text(self.font, str(self.player_score), (255, 255, 255), (self.WIDTH//4, 50))
+        draw.text(self.font, str(self.ai_score), (255, 255, 255), (3*self.WIDTH//4, 50))
         
         # Draw difficulty level
-        diff_text = self.small_font.render(f"Difficulty: {self.difficulties[self.selected_difficulty]}", 
-                                         True, (128, 128, 128))
-        self.screen.blit(diff_text, (self.WIDTH//2 - diff_text.get_width()//2, 20))
-        
-        # Draw controls hint
-        controls = self.small_font.render("W/S - Move    ESC - Menu", True, (128, 128, 128))
-        self.screen.blit(controls, (self.WIDTH//2 - controls.get_width()//2, self.HEIGHT - 40))
+        draw.text(self.small_font, f"Difficulty: {self.difficulties[self.selected_difficulty]}",
+                  (128, 128, 128), (self.WIDTH//2, 20), "midtop")
         
         # Draw game over screen if someone won
         if self.state == self.GAME_OVER:
-            # Create semi-transparent overlay
-            overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
-            overlay.fill((0, 0, 0))
-            overlay.set_alpha(180)
-            self.screen.blit(overlay, (0, 0))
-            
-            # Create message box
-            box_width = 400
-            box_height = 160
-            box_x = self.WIDTH//2 - box_width//2
-            box_y = self.HEIGHT//2 - box_height//2
-            
-            # Draw box background and border
-            pygame.draw.rect(self.screen, (128, 128, 128), 
-                           (box_x, box_y, box_width, box_height))
-            pygame.draw.rect(self.screen, (255, 255, 255), 
-                           (box_x, box_y, box_width, box_height), 3)
-            
-            # Draw winner message
-            winner = "You Won!" if self.player_score >= self.SCORE_LIMIT else "AI Won!"
-            color = (0, 255, 0) if self.player_score >= self.SCORE_LIMIT else (255, 0, 0)
-            text = self.font.render(winner, True, color)
-            score_text = self.small_font.render(f"Final Score: {self.player_score} - {self.ai_score}", 
-                                              True, (255, 255, 255))
-            restart = self.small_font.render("SPACE - Play again    ESC - Menu", 
-                                           True, (255, 255, 255))
-            
-            self.screen.blit(text, (self.WIDTH//2 - text.get_width()//2, box_y + 30))
-            self.screen.blit(score_text, (self.WIDTH//2 - score_text.get_width()//2, box_y + 80))
-            self.screen.blit(restart, (self.WIDTH//2 - restart.get_width()//2, box_y + 120))
-        
-        pygame.display.flip()
-        
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.state == self.MENU:
-                        if event.key == pygame.K_UP:
-                            self.selected_difficulty = (self.selected_difficulty - 1) % len(self.difficulties)
-                        elif event.key == pygame.K_DOWN:
-                            self.selected_difficulty = (self.selected_difficulty + 1) % len(self.difficulties)
-                        elif event.key == pygame.K_RETURN:
-                            self.state = self.PLAYING
-                        elif event.key == pygame.K_ESCAPE:
-                            return  # Return to main menu
-                    elif event.key == pygame.K_ESCAPE:
-                        self.state = self.MENU
-                        self.reset_game()
-            
+            # Dimmed table and winner box, rendered once per result
+            won = self.player_score >= self.SCORE_LIMIT
+            best = self.best_label(self.margin(), "{:+d} points")
+            self.winner_box.draw(draw, "You Won!" if won else "AI Won!", (0, 255, 0) if won else (255, 0, 0), [
+                (f"Final Score: {self.player_score} - {self.ai_score}", (255, 255, 255)),
+                best and (best[0], (0, 255, 0) if best[1] else (255, 255, 255)),
+            ], "SPACE - Play again    ESC - Difficulty")
+        
+    def is_static(self):
+        # The difficulty menu and the winner screen only change on input
+        return self.state != self.PLAYING
+
+    def enter(self, manager):
+        super().enter(manager)
+        self.held_keys = set()
+
+    def handle_event(self, event):
+        # Held paddle keys come from the events, so a replay moves them too
+        if event.type == pygame.KEYUP:
+            self.held_keys.discard(event.key)
+        if event.type == pygame.KEYDOWN:
+            self.held_keys.add(event.key)
             if self.state == self.MENU:
-                self.draw_menu()
-            elif self.state == self.PLAYING:
-                # Handle player input
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_w] and self.player_y > 0:
-                    self.player_y -= self.PADDLE_SPEED
-                if keys[pygame.K_s] and self.player_y < self.HEIGHT - self.PADDLE_HEIGHT:
-                    self.player_y += self.PADDLE_SPEED
-                
-                # Update game state
-                self.update_ai()
-                self.update_ball()
+                if event.key == pygame.K_UP:
+                    self.selected_difficulty = (self.selected_difficulty - 1) % len(self.difficulties)
+                elif event.key == pygame.K_DOWN:
+                    self.selected_difficulty = (self.selected_difficulty + 1) % len(self.difficulties)
+                elif event.key == pygame.K_RETURN:
+                    self.state = self.PLAYING
+                    self.start_round()
+                elif event.key == pygame.K_ESCAPE:
+                    self.manager.pop()  # Return to main menu
+            elif self.state == self.GAME_OVER:
+                if event.key == pygame.K_SPACE:
+                    # Another game at the same difficulty, as the winner box says
+                    self.reset_game()
+                    self.state = self.PLAYING
+                    self.start_round()
+                elif event.key == pygame.K_ESCAPE:
+                    # Pick another difficulty
+                    self.reset_game()
+                    self.state = self.MENU
+            elif event.key == pygame.K_ESCAPE:
+                # Back to the launcher mid-game, the session keeps the match
+                self.manager.pop()
                 
-                # Check for winner
-                if self.player_score >= self.SCORE_LIMIT or self.ai_score >= self.SCORE_LIMIT:
-                    self.state = self.GAME_OVER
-                
-                self.draw_game()
-            else:  # GAME_OVER state
-                self.draw_game()
+    def update(self):
+        self.previous = self.positions()
+        if self.state == self.PLAYING:
+            # Handle player input
+            if pygame.K_w in self.held_keys and self.player_y > 0:
+                self.player_y -= self.PADDLE_SPEED
+            if pygame.K_s in self.held_keys and self.player_y < self.HEIGHT - self.PADDLE_HEIGHT:
+                self.player_y += self.PADDLE_SPEED
             
-            self.clock.tick(60)
-        
-        return
+            # Update game state
+            self.update_ai()
+            self.update_ball()
+            
+            # Check for winner
+            if self.player_score >= self.SCORE_LIMIT or self.ai_score >= self.SCORE_LIMIT:
+                self.state = self.GAME_OVER
+                outcome = "won" if self.player_score >= self.SCORE_LIMIT else "lost"
+                self.finish_round(self.margin(), self.difficulties[self.selected_difficulty].lower(), outcome)
+
+    def margin(self):
+        return self.player_score - self.ai_score
+                
+    def draw(self):
+        if self.state == self.MENU:
+            self.draw_menu()
+        else:  # PLAYING or GAME_OVER
+            self.draw_game()
 
 def main():
     # Only initialize the game without running
@@ -0,0 +1,39 @@
+import math
+
+import pygame
+
+from games.utils.previews import register_preview
+
+FRAMES = 63  # One full orbit of the ball
+
+
+def ball_position(frame):
+    angle = 2 * math.pi * frame / FRAMES
+    return 60 + int(30 * math.sin(angle)), 60 + int(20 * math.cos(angle))
+
+
+@register_preview("Pong", frames=FRAMES, hold=2)
+def draw_preview(surface, frame):
+    ball_x, ball_y = ball_position(frame)
+
+    # AI paddle trails the ball a little, player paddle sways on its own
+    ai_y = max(0, min(ball_position(frame - 4)[1] - 15, 90))
+    player_y = max(0, min(45 + int(25 * math.sin(2 * math.pi * frame / FRAMES * 2)), 90))
+
+    # Draw center line
+    for y in range(0, 120, 10):
+        pygame.draw.rect(surface, (128, 128, 128), (58, y, 4, 4))
+
+    # Draw paddles
+    pygame.draw.rect(surface, (255, 255, 255), (10, player_y, 5, 30))  # Left paddle
+    pygame.draw.rect(surface, (255, 255, 255), (105, ai_y, 5, 30))  # Right paddle
+
+    # Draw ball with trail effect
+    trail = pygame.Surface((6, 6))
+    trail.fill((255, 255, 255))
+    for i in range(1, 4):
+        trail_x, trail_y = ball_position(frame - i)
+        trail.set_alpha(100 - (i - 1) * 30)
+        surface.blit(trail, (trail_x - 3, trail_y - 3))
+
+    pygame.draw.rect(surface, (255, 255, 255), (ball_x - 3, ball_y - 3, 6, 6))  # Ball
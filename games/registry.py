@@ -0,0 +1,40 @@
+import importlib
+import threading
+
+
+class GameInfo:
+    # Metadata only, the game module is imported on launch or prewarm
+    def __init__(self, name, module, class_name, preview):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.preview = preview
+        self.game_class = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.game_class is None:
+                module = importlib.import_module(self.module)
+                self.game_class = getattr(module, self.class_name)
+        return self.game_class
+
+    def load_preview(self):
+        importlib.import_module(self.preview)
+
+
+GAMES = [
+    GameInfo("Snake Game", "games.snake.snake_game", "SnakeGame", "games.snake.preview"),
+    GameInfo("Hangman", "games.hangman.hangman_game", "HangmanGame", "games.hangman.preview"),
+    GameInfo("Pong", "games.pong.pong_game", "PongGame", "games.pong.preview"),
+    GameInfo("Tetris", "games.tetris.tetris_game", "TetrisGame", "games.tetris.preview"),
+]
+
+
+def get_game(name):
+    # Display name, class name or package name ("tetris"), in any case
+    name = name.lower()
+    for game in GAMES:
+        if name in (game.name.lower(), game.class_name.lower(), game.module.split(".")[1]):
+            return game
+    return None
@@ -0,0 +1,23 @@
+import pygame
+
+from games.utils.previews import register_preview
+
+# Closed loop of cells the preview snake follows (a 6x6 square)
+PATH = ([(x, 2) for x in range(2, 7)] + [(7, y) for y in range(2, 7)] +
+        [(x, 7) for x in range(7, 2, -1)] + [(2, y) for y in range(7, 2, -1)])
+LENGTH = 4
+
+
+@register_preview("Snake Game", frames=len(PATH), hold=6)
+def draw_preview(surface, frame):
+    head = frame + LENGTH - 1
+    # Food sits a few cells ahead and jumps on once the head reaches it
+    food = PATH[((frame // 5) * 5 + LENGTH + 4) % len(PATH)]
+
+    # Draw snake
+    for i in range(frame, head + 1):
+        x, y = PATH[i % len(PATH)]
+        pygame.draw.rect(surface, (0, 255, 0), (x * 12, y * 12, 10, 10))
+
+    # Draw food
+    pygame.draw.rect(surface, (255, 0, 0), (food[0] * 12, food[1] * 12, 10, 10))
@@ -1,10 +1,21 @@
 import pygame
 import sys
-import random
 
-class SnakeGame:
+from games.utils.compositor import Compositor
+from games.utils.dialog import Dialog
+from games.utils.scenes import Scene
+from games.utils.text import render_text
+from games.utils.timestep import lerp
+
+class SnakeGame(Scene):
+    UPDATE_RATE = 10  # Control game speed, moves per second
+    CAPTION = "Snake Game"
+    USES_CANVAS = True
+    SNAPSHOT_FIELDS = ("snake", "direction", "food", "score", "game_over", "previous_best")
+    GAME_ID = "snake"
+
     def __init__(self):
-        pygame.init()
+        super().__init__()
         self.WIDTH = 800
         self.HEIGHT = 600
         self.GRID_SIZE = 20
@@ -14,11 +25,8 @@ class SnakeGame:
         self.PLAY_AREA_WIDTH = self.WIDTH
         self.PLAY_AREA_HEIGHT = self.HEIGHT - self.SCORE_HEIGHT
         
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Snake Game")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 36)
+        self.font = self.load_font(None, 48)
+        self.small_font = self.load_font(None, 36)
         
         # Colors
         self.BLACK = (0, 0, 0)
@@ -28,151 +36,124 @@ class SnakeGame:
         self.GRAY = (128, 128, 128)
         self.DARK_GRAY = (50, 50, 50)
         
+        self.build_layers()
         self.reset_game()
         
     def reset_game(self):
         self.snake = [(self.GRID_WIDTH//2, self.GRID_HEIGHT//2)]
+        self.previous_snake = self.snake
         self.direction = (1, 0)
         self.food = self.spawn_food()
         self.score = 0
         self.game_over = False
+        self.start_round()
         
     def spawn_food(self):
         while True:
-            x = random.randint(0, self.GRID_WIDTH - 1)
-            y = random.randint(0, self.GRID_HEIGHT - 1)
+            x = self.random.randint(0, self.GRID_WIDTH - 1)
+            y = self.random.randint(0, self.GRID_HEIGHT - 1)
             if (x, y) not in self.snake:
                 return (x, y)
                 
-    def draw_grid(self):
+    def build_layers(self):
+        # Everything that never moves, drawn once: grid, score area and hint
+        background = pygame.Surface((self.WIDTH, self.HEIGHT))
+        background.fill(self.BLACK)
         # Draw vertical lines
         for x in range(self.GRID_WIDTH + 1):
-            pygame.draw.line(self.screen, self.DARK_GRAY,
+            pygame.draw.line(background, self.DARK_GRAY,
                            (x * self.GRID_SIZE, 0),
                            (x * self.GRID_SIZE, self.PLAY_AREA_HEIGHT))
         # Draw horizontal lines
         for y in range(self.GRID_HEIGHT + 1):
-            pygame.draw.line(self.screen, self.DARK_GRAY,
+            pygame.draw.line(background, self.DARK_GRAY,
                            (0, y * self.GRID_SIZE),
                            (self.PLAY_AREA_WIDTH, y * self.GRID_SIZE))
+        pygame.draw.line(background, self.WHITE,
+                        (0, self.PLAY_AREA_HEIGHT),
+                        (self.WIDTH, self.PLAY_AREA_HEIGHT), 2)
+        controls = render_text(self.small_font, "Arrow Keys - Move    ESC - Menu", self.GRAY)
+        background.blit(controls, 
+                        (self.WIDTH//2 - controls.get_width()//2,
+                         self.HEIGHT - 40))
+        self.compositor = Compositor((self.WIDTH, self.HEIGHT), background, key=("snake-background",))
+        self.game_over_box = Dialog((self.WIDTH, self.HEIGHT), self.font, self.small_font)
                 
     def draw(self):
-        self.screen.fill(self.BLACK)
+        draw = self.compositor
         
-        # Draw grid
-        self.draw_grid()
-        
-        # Draw snake
-        for segment in self.snake:
-            x, y = segment
-            pygame.draw.rect(self.screen, self.GREEN,
-                           (x * self.GRID_SIZE + 1, y * self.GRID_SIZE + 1,
-                            self.GRID_SIZE - 2, self.GRID_SIZE - 2))
+        # Draw snake, each segment sliding from its previous cell
+        alpha = self.alpha
+        for i, (x, y) in enumerate(self.snake):
+            if i < len(self.previous_snake):
+                px, py = self.previous_snake[i]
+                if abs(x - px) + abs(y - py) == 1:  # Not when wrapping around the edge
+                    x, y = lerp(px, x, alpha), lerp(py, y, alpha)
+            draw.rect(self.GREEN,
+                      (x * self.GRID_SIZE + 1, y * self.GRID_SIZE + 1,
+                       self.GRID_SIZE - 2, self.GRID_SIZE - 2))
             
         # Draw food
-        pygame.draw.rect(self.screen, self.RED,
-                        (self.food[0] * self.GRID_SIZE + 1,
-                         self.food[1] * self.GRID_SIZE + 1,
-                         self.GRID_SIZE - 2, self.GRID_SIZE - 2))
-        
-        # Draw score area background
-        pygame.draw.rect(self.screen, self.BLACK,
-                        (0, self.PLAY_AREA_HEIGHT, self.WIDTH, self.SCORE_HEIGHT))
-        pygame.draw.line(self.screen, self.WHITE,
-                        (0, self.PLAY_AREA_HEIGHT),
-                        (self.WIDTH, self.PLAY_AREA_HEIGHT), 2)
+        draw.rect(self.RED,
+                  (self.food[0] * self.GRID_SIZE + 1,
+                   self.food[1] * self.GRID_SIZE + 1,
+                   self.GRID_SIZE - 2, self.GRID_SIZE - 2))
         
         # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
-        self.screen.blit(score_text, 
-                        (self.WIDTH//2 - score_text.get_width()//2,
-                         self.PLAY_AREA_HEIGHT + 20))
-        
-        # Draw controls hint
-        controls = self.small_font.render("Arrow Keys - Move    ESC - Menu", 
-                                        True, self.GRAY)
-        self.screen.blit(controls, 
-                        (self.WIDTH//2 - controls.get_width()//2,
-                         self.HEIGHT - 40))
+        draw.text(self.font, f"Score: {self.score}", self.WHITE,
+                  (self.WIDTH//2, self.PLAY_AREA_HEIGHT + 20), "midtop")
         
         if self.game_over:
-            # Create semi-transparent overlay
-            overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
-            overlay.fill(self.BLACK)
-            overlay.set_alpha(180)
-            self.screen.blit(overlay, (0, 0))
-            
-            # Create message box
-            box_width = 400
-            box_height = 160
-            box_x = self.WIDTH//2 - box_width//2
-            box_y = self.HEIGHT//2 - box_height//2
-            
-            # Draw box background and border
-            pygame.draw.rect(self.screen, self.GRAY, 
-                           (box_x, box_y, box_width, box_height))
-            pygame.draw.rect(self.screen, self.WHITE, 
-                           (box_x, box_y, box_width, box_height), 3)
-            
-            # Draw game over message
-            text = self.font.render("Game Over!", True, self.RED)
-            score_text = self.small_font.render(f"Final Score: {self.score}", 
-                                              True, self.WHITE)
-            restart = self.small_font.render("SPACE - Play again    ESC - Menu", 
-                                           True, self.WHITE)
-            
-            self.screen.blit(text, 
-                            (self.WIDTH//2 - text.get_width()//2, box_y + 30))
-            self.screen.blit(score_text, 
-                            (self.WIDTH//2 - score_text.get_width()//2, box_y + 80))
-            self.screen.blit(restart, 
-                            (self.WIDTH//2 - restart.get_width()//2, box_y + 120))
-        
-        pygame.display.flip()
+            # Dimmed screen and message box, rendered once per result
+            best = self.best_label(self.score)
+            self.game_over_box.draw(draw, "Game Over!", self.RED, [
+                (f"Final Score: {self.score}", self.WHITE),
+                best and (best[0], self.GREEN if best[1] else self.WHITE),
+            ], "SPACE - Play again    ESC - Menu")
         
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        return  # Return to main menu
-                    elif not self.game_over:
-                        if event.key == pygame.K_UP and self.direction != (0, 1):
-                            self.direction = (0, -1)
-                        elif event.key == pygame.K_DOWN and self.direction != (0, -1):
-                            self.direction = (0, 1)
-                        elif event.key == pygame.K_LEFT and self.direction != (1, 0):
-                            self.direction = (-1, 0)
-                        elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
-                            self.direction = (1, 0)
-                    elif event.key == pygame.K_SPACE:
-                        self.reset_game()
-            
-            if not self.game_over:
-                # Move snake
-                head = self.snake[0]
-                new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
-                
-                # Handle wall crossing
-                new_head = ((new_head[0] + self.GRID_WIDTH) % self.GRID_WIDTH,
-                           (new_head[1] + self.GRID_HEIGHT) % self.GRID_HEIGHT)
+    def is_static(self):
+        # Nothing moves on the game over screen until a key is pressed
+        return self.game_over
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.manager.pop()  # Return to main menu
+            elif not self.game_over:
+                if event.key == pygame.K_UP and self.direction != (0, 1):
+                    self.direction = (0, -1)
+                elif event.key == pygame.K_DOWN and self.direction != (0, -1):
+                    self.direction = (0, 1)
+                elif event.key == pygame.K_LEFT and self.direction != (1, 0):
+                    self.direction = (-1, 0)
+                elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
+                    self.direction = (1, 0)
+            elif event.key == pygame.K_SPACE:
+                self.reset_game()
                 
-                # Check for collisions with self
-                if new_head in self.snake:
-                    self.game_over = True
-                else:
-                    self.snake.insert(0, new_head)
-                    if new_head == self.food:
-                        self.score += 1
-                        self.food = self.spawn_food()
-                    else:
-                        self.snake.pop()
+    def update(self):
+        if not self.game_over:
+            # Move snake
+            self.previous_snake = list(self.snake)
+            head = self.snake[0]
+            new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
+            
+            # Handle wall crossing
+            new_head = ((new_head[0] + self.GRID_WIDTH) % self.GRID_WIDTH,
+                       (new_head[1] + self.GRID_HEIGHT) % self.GRID_HEIGHT)
             
-            self.draw()
-            self.clock.tick(10)  # Control game speed
+            # Check for collisions with self
+            if new_head in self.snake:
+                self.game_over = True
+                self.previous_snake = self.snake
+                self.finish_round(self.score, outcome="crashed")
+            else:
+                self.snake.insert(0, new_head)
+                if new_head == self.food:
+                    self.score += 1
+                    self.food = self.spawn_food()
+                else:
+                    self.snake.pop()
 
 def main():
     # Only initialize the game without running
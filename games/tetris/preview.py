@@ -0,0 +1,41 @@
+import pygame
+
+from games.utils.previews import register_preview
+
+# Tetris pieces with their colors
+PIECES = [
+    ([(0, 0), (0, 1), (0, 2), (0, 3)], (0, 255, 255)),  # I
+    ([(0, 0), (1, 0), (0, 1), (1, 1)], (255, 255, 0)),  # O
+    ([(0, 0), (1, 0), (1, 1), (2, 1)], (255, 0, 0)),    # Z
+    ([(0, 0), (0, 1), (0, 2), (1, 2)], (255, 165, 0))   # L
+]
+
+# Each piece falls from row -2 to row 8
+DROP_ROWS = 11
+
+# Some fixed pieces at the bottom
+FIXED_BLOCKS = [
+    (40, 90, (255, 0, 0)),
+    (50, 90, (255, 0, 0)),
+    (60, 90, (0, 255, 0)),
+    (70, 90, (0, 255, 0)),
+    (40, 80, (0, 255, 255)),
+    (50, 80, (0, 255, 255)),
+    (60, 80, (255, 165, 0))
+]
+
+
+@register_preview("Tetris", frames=len(PIECES) * DROP_ROWS, hold=20)
+def draw_preview(surface, frame):
+    piece, color = PIECES[frame // DROP_ROWS]
+    piece_y = frame % DROP_ROWS - 2
+
+    # Draw game border
+    pygame.draw.rect(surface, (128, 128, 128), (30, 10, 60, 100), 2)
+
+    # Draw current falling piece
+    for x, y in piece:
+        pygame.draw.rect(surface, color, (40 + x * 10, 20 + (y + piece_y) * 10, 8, 8))
+
+    for x, y, block_color in FIXED_BLOCKS:
+        pygame.draw.rect(surface, block_color, (x, y, 8, 8))
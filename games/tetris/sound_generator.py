@@ -1,79 +1,71 @@
-import wave
-import struct
-import math
 import os
 
-def generate_sine_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
-    n_samples = int(sample_rate * duration)
-    wave_data = []
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        wave_data.append(amplitude * math.sin(2 * math.pi * frequency * t))
-    return wave_data
+from games.utils.music import Track, Voice
+from games.utils.synth import SAMPLE_RATE, Envelope, get_sound, save_wav, sequence, tone
 
-def save_wave_file(filename, wave_data, sample_rate=44100):
-    with wave.open(filename, 'w') as wave_file:
-        n_channels = 1
-        sample_width = 2
-        wave_file.setnchannels(n_channels)
-        wave_file.setsampwidth(sample_width)
-        wave_file.setframerate(sample_rate)
-        
-        # Convert to 16-bit integers
-        scaled = [int(sample * 32767) for sample in wave_data]
-        wave_file.writeframes(struct.pack('h' * len(scaled), *scaled))
+# Short fades so notes start and stop without clicks
+CLICK_FREE = Envelope(attack=0.002, release=0.01)
 
-def create_move_sound():
+def create_move_sound(rate=SAMPLE_RATE):
     # Short high-pitched beep
-    return generate_sine_wave(880, 0.05)  # A5 note, 50ms
+    return tone(880, 0.05, envelope=CLICK_FREE, rate=rate)  # A5 note, 50ms
 
-def create_rotate_sound():
-    # Medium-pitched sweep
-    wave_data = []
-    for i in range(int(44100 * 0.1)):  # 100ms
-        t = float(i) / 44100
-        freq = 440 + 220 * t  # Sweep from 440Hz to 660Hz
-        wave_data.append(0.5 * math.sin(2 * math.pi * freq * t))
-    return wave_data
+def create_rotate_sound(rate=SAMPLE_RATE):
+    # Medium-pitched sweep from 440Hz to 660Hz, 100ms
+    return tone(440, 0.1, end_frequency=660, envelope=CLICK_FREE, rate=rate)
 
-def create_drop_sound():
+def create_drop_sound(rate=SAMPLE_RATE):
     # Low thud
-    return generate_sine_wave(220, 0.15, amplitude=0.7)  # A3 note, 150ms
+    return tone(220, 0.15, amplitude=0.7, envelope=Envelope(attack=0.002, decay=0.1, sustain=0.4, release=0.03),
+                rate=rate)  # A3 note, 150ms
 
-def create_clear_sound():
+def create_clear_sound(rate=SAMPLE_RATE):
     # Success sound (ascending notes)
-    wave_data = []
     frequencies = [440, 554, 659, 880]  # A4, C#5, E5, A5
-    for freq in frequencies:
-        wave_data.extend(generate_sine_wave(freq, 0.1))
-    return wave_data
+    return sequence([(freq, 0.1) for freq in frequencies], rate=rate, envelope=CLICK_FREE)
 
-def create_gameover_sound():
+def create_gameover_sound(rate=SAMPLE_RATE):
     # Descending notes
-    wave_data = []
     frequencies = [440, 392, 349, 330]  # A4, G4, F4, E4
-    for freq in frequencies:
-        wave_data.extend(generate_sine_wave(freq, 0.15, amplitude=0.6))
-    return wave_data
+    return sequence([(freq, 0.15) for freq in frequencies], rate=rate, amplitude=0.6, envelope=CLICK_FREE)
+
+SOUNDS = {
+    'move': create_move_sound,
+    'rotate': create_rotate_sound,
+    'drop': create_drop_sound,
+    'clear': create_clear_sound,
+    'gameover': create_gameover_sound,
+}
+
+# Korobeiniki, the traditional Tetris tune: melody and an octave-jumping bass
+MELODY = (
+    "E5:1 B4:.5 C5:.5 D5:1 C5:.5 B4:.5 A4:1 A4:.5 C5:.5 E5:1 D5:.5 C5:.5 "
+    "B4:1.5 C5:.5 D5:1 E5:1 C5:1 A4:1 A4:2 "
+    "-:.5 D5:1 F5:.5 A5:1 G5:.5 F5:.5 E5:1.5 C5:.5 E5:1 D5:.5 C5:.5 "
+    "B4:1 B4:.5 C5:.5 D5:1 E5:1 C5:1 A4:1 A4:1 -:1"
+)
+BASS = " ".join(
+    f"{low}:.5 {high}:.5 " * 4
+    for low, high in [("E2", "E3"), ("A2", "A3"), ("G#2", "G#3"), ("A2", "A3"),
+                      ("D2", "D3"), ("C2", "C3"), ("G#2", "G#3"), ("A2", "A3")]
+)
+THEME = Track([Voice(MELODY, wave="square", amplitude=0.12),
+               Voice(BASS, wave="triangle", amplitude=0.18)], bpm=140)
+
+def load_sounds():
+    # Generated in memory once per mixer format, shared by every Tetris session
+    return {name: get_sound(f"tetris.{name}", recipe) for name, recipe in SOUNDS.items()}
 
 def main():
-    # Create sounds directory if it doesn't exist
+    # Optional: export the sounds as WAV files, e.g. for editing them elsewhere.
+    # Run from the repository root: python -m games.tetris.sound_generator
     sounds_dir = os.path.join(os.path.dirname(__file__), 'sounds')
     os.makedirs(sounds_dir, exist_ok=True)
-    
-    # Generate and save all sound effects
-    sounds = {
-        'move.wav': create_move_sound(),
-        'rotate.wav': create_rotate_sound(),
-        'drop.wav': create_drop_sound(),
-        'clear.wav': create_clear_sound(),
-        'gameover.wav': create_gameover_sound()
-    }
-    
-    for filename, wave_data in sounds.items():
-        filepath = os.path.join(sounds_dir, filename)
-        save_wave_file(filepath, wave_data)
-        print(f"Generated {filename}")
+
+    for name, recipe in SOUNDS.items():
+        filepath = os.path.join(sounds_dir, f"{name}.wav")
+        save_wav(filepath, recipe())
+        print(f"Generated {name}.wav")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -1,9 +1,15 @@
 import pygame
-import sys
-import random
-import os
 
-class TetrisGame:
+from games.tetris.sound_generator import THEME, load_sounds
+from games.utils.audio import get_audio
+from games.utils.compositor import Compositor
+from games.utils.dialog import Dialog
+from games.utils.effects import Bloom
+from games.utils.music import Sequencer
+from games.utils.scenes import Scene
+from games.utils.text import render_text
+
+class TetrisGame(Scene):
     # Constants
     BLOCK_SIZE = 30
     GRID_WIDTH = 10
@@ -12,6 +18,13 @@ class TetrisGame:
     WIDTH = GRID_WIDTH * BLOCK_SIZE + SIDEBAR_WIDTH
     HEIGHT = GRID_HEIGHT * BLOCK_SIZE
     FPS = 60
+    UPDATE_RATE = 60
+    CAPTION = "Tetris"
+    GAME_ID = "tetris"
+    USES_CANVAS = True
+    SNAPSHOT_FIELDS = ("grid", "current_piece", "next_piece", "score", "lines", "level",
+                       "fall_speed", "game_over", "clearing_lines", "lines_to_clear", "fall_time", "clear_time",
+                       "previous_best")
 
     # Colors
     BLACK = (0, 0, 0)
@@ -46,32 +59,89 @@ class TetrisGame:
          [0, 1, 1]]
     ]
 
+    # Voices at once, minimum gap between repeats and priority, see games/utils/audio.py
+    SOUND_RULES = {
+        'move': dict(voices=2, interval_ms=30),
+        'rotate': dict(voices=2, interval_ms=30),
+        'drop': dict(voices=2, interval_ms=20),
+        'clear': dict(voices=1, interval_ms=0, priority=True),
+        'gameover': dict(voices=1, interval_ms=0, priority=True),
+    }
+
     def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Tetris")
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.clock = pygame.time.Clock()
+        super().__init__()
+        self.audio = get_audio()
+        self.font = self.load_font(None, 36)
+        self.small_font = self.load_font(None, 24)
+        # Glow over the rows being cleared, lit from a strip holding just those rows
+        self.clear_glow = Bloom(self.GRID_WIDTH * self.BLOCK_SIZE, self.BLOCK_SIZE * 3, threshold=180)
+        self.glow_strip = pygame.Surface(self.clear_glow.size)
+        self.build_sprites()
         
-        # Load sounds
-        sound_dir = os.path.join(os.path.dirname(__file__), 'sounds')
-        self.move_sound = pygame.mixer.Sound(os.path.join(sound_dir, 'move.wav'))
-        self.rotate_sound = pygame.mixer.Sound(os.path.join(sound_dir, 'rotate.wav'))
-        self.drop_sound = pygame.mixer.Sound(os.path.join(sound_dir, 'drop.wav'))
-        self.clear_sound = pygame.mixer.Sound(os.path.join(sound_dir, 'clear.wav'))
-        self.gameover_sound = pygame.mixer.Sound(os.path.join(sound_dir, 'gameover.wav'))
+        # Synthesized in memory, cached across sessions
+        if self.audio.init():
+            for name, sound in load_sounds().items():
+                self.audio.register(f"tetris.{name}", sound, **self.SOUND_RULES[name])
+        # Streamed while the game is on screen, faster on higher levels
+        self.music = Sequencer(THEME)
         
         self.reset_game()
-        self.running = True
-        self.fall_time = 0
+        self.fall_time = 0  # Milliseconds of game time since the piece last fell
         self.fall_speed = 500
-        self.last_fall = pygame.time.get_ticks()
         self.clearing_lines = False
-        self.clear_animation_start = 0
+        self.clear_time = 0
         self.lines_to_clear = []
 
+    def enter(self, manager):
+        super().enter(manager)
+        self.start_music()
+
+    def exit(self):
+        self.audio.stop_music()
+
+    def start_music(self):
+        if not self.game_over:
+            self.music.set_tempo(self.music_tempo())
+            self.audio.play_music(self.music)
+
+    def music_tempo(self):
+        return min(THEME.bpm + (self.level - 1) * 8, 220)
+
+    def build_sprites(self):
+        # Static art drawn once, textures on the Renderer backend
+        self.blocks = {}
+        for color in self.COLORS + [self.FLASH_WHITE]:
+            block = pygame.Surface((self.BLOCK_SIZE - 1, self.BLOCK_SIZE - 1))
+            block.fill(color)
+            self.blocks[color] = block
+        self.board = pygame.Surface((self.WIDTH, self.HEIGHT))
+        self.board.fill(self.BLACK)
+        # Vẽ đường kẻ dọc
+        for x in range(self.GRID_WIDTH + 1):
+            pygame.draw.line(self.board, self.GRAY,
+                           (x * self.BLOCK_SIZE, 0),
+                           (x * self.BLOCK_SIZE, self.HEIGHT))
+        # Vẽ đường kẻ ngang
+        for y in range(self.GRID_HEIGHT + 1):
+            pygame.draw.line(self.board, self.GRAY,
+                           (0, y * self.BLOCK_SIZE),
+                           (self.GRID_WIDTH * self.BLOCK_SIZE, y * self.BLOCK_SIZE))
+        # Vẽ khung thông tin bên phải
+        pygame.draw.rect(self.board, self.DARK_GRAY,
+                         (self.GRID_WIDTH * self.BLOCK_SIZE, 0, self.SIDEBAR_WIDTH, self.HEIGHT))
+        # Sidebar labels, only the numbers next to them change
+        x = self.GRID_WIDTH * self.BLOCK_SIZE + 20
+        for label, y in (("Score:", 10), ("Next:", 100), ("Lines:", 250), ("Level:", 350)):
+            self.board.blit(render_text(self.font, label, self.WHITE), (x, y))
+        self.compositor = Compositor((self.WIDTH, self.HEIGHT), self.board, key=("tetris-board",))
+        self.game_over_box = Dialog((self.WIDTH, self.HEIGHT), self.font, self.small_font)
+
+    def play_sound(self, name):
+        self.audio.play(f"tetris.{name}")
+
+    def draw_block(self, color, x, y):
+        self.compositor.blit(self.blocks[color], (x, y), key=("tetris-block", color))
+
     def is_valid_move(self, shape, x, y):
         for i, row in enumerate(shape):
             for j, cell in enumerate(row):
@@ -90,11 +160,12 @@ class TetrisGame:
         self.game_over = False
         self.clearing_lines = False
         self.lines_to_clear = []
+        self.start_round()
         self.new_piece()
         self.generate_next_piece()
 
     def generate_next_piece(self):
-        shape_idx = random.randint(0, len(self.SHAPES) - 1)
+        shape_idx = self.random.randint(0, len(self.SHAPES) - 1)
         self.next_piece = {
             'shape': self.SHAPES[shape_idx],
             'color': self.COLORS[shape_idx]
@@ -109,7 +180,7 @@ class TetrisGame:
                 'y': 0
             }
         else:
-            shape_idx = random.randint(0, len(self.SHAPES) - 1)
+            shape_idx = self.random.randint(0, len(self.SHAPES) - 1)
             self.current_piece = {
                 'shape': self.SHAPES[shape_idx],
                 'color': self.COLORS[shape_idx],
@@ -123,7 +194,9 @@ class TetrisGame:
                                 self.current_piece['x'], 
                                 self.current_piece['y']):
             self.game_over = True
-            pygame.mixer.Sound.play(self.gameover_sound)
+            self.audio.stop_music()
+            self.play_sound('gameover')
+            self.finish_round(self.score, outcome="topped out")
 
     def check_lines(self):
         self.lines_to_clear = []
@@ -133,8 +206,8 @@ class TetrisGame:
         
         if self.lines_to_clear:
             self.clearing_lines = True
-            self.clear_animation_start = pygame.time.get_ticks()
-            pygame.mixer.Sound.play(self.clear_sound)
+            self.clear_time = 0
+            self.play_sound('clear')
 
     def clear_lines(self):
         for line in self.lines_to_clear:
@@ -147,6 +220,7 @@ class TetrisGame:
         self.score += lines_cleared * 100 * self.level
         self.level = self.lines // 10 + 1
         self.fall_speed = max(100, 500 - (self.level - 1) * 50)
+        self.music.set_tempo(self.music_tempo())
         
         self.clearing_lines = False
         self.lines_to_clear = []
@@ -157,183 +231,145 @@ class TetrisGame:
                 if cell:
                     self.grid[self.current_piece['y'] + i][self.current_piece['x'] + j] = self.current_piece['color']
         
-        pygame.mixer.Sound.play(self.drop_sound)
+        self.play_sound('drop')
         self.check_lines()
         if not self.clearing_lines:
             self.new_piece()
 
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                return False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:  # Back to menu
-                    self.running = False
-                    return True
-                if not self.game_over and not self.clearing_lines:
-                    if event.key == pygame.K_LEFT:
-                        if self.is_valid_move(self.current_piece['shape'],
-                                           self.current_piece['x'] - 1,
-                                           self.current_piece['y']):
-                            self.current_piece['x'] -= 1
-                            pygame.mixer.Sound.play(self.move_sound)
-                    elif event.key == pygame.K_RIGHT:
-                        if self.is_valid_move(self.current_piece['shape'],
-                                           self.current_piece['x'] + 1,
-                                           self.current_piece['y']):
-                            self.current_piece['x'] += 1
-                            pygame.mixer.Sound.play(self.move_sound)
-                    elif event.key == pygame.K_DOWN:
-                        if self.is_valid_move(self.current_piece['shape'],
-                                           self.current_piece['x'],
-                                           self.current_piece['y'] + 1):
-                            self.current_piece['y'] += 1
-                            pygame.mixer.Sound.play(self.move_sound)
-                    elif event.key == pygame.K_UP:
-                        rotated = list(zip(*self.current_piece['shape'][::-1]))
-                        if self.is_valid_move(rotated,
-                                           self.current_piece['x'],
-                                           self.current_piece['y']):
-                            self.current_piece['shape'] = rotated
-                            pygame.mixer.Sound.play(self.rotate_sound)
-                elif event.key == pygame.K_SPACE:
-                    self.reset_game()
-        return True
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:  # Back to menu
+                self.manager.pop()
+                return
+            if not self.game_over and not self.clearing_lines:
+                if event.key == pygame.K_LEFT:
+                    if self.is_valid_move(self.current_piece['shape'],
+                                       self.current_piece['x'] - 1,
+                                       self.current_piece['y']):
+                        self.current_piece['x'] -= 1
+                        self.play_sound('move')
+                elif event.key == pygame.K_RIGHT:
+                    if self.is_valid_move(self.current_piece['shape'],
+                                       self.current_piece['x'] + 1,
+                                       self.current_piece['y']):
+                        self.current_piece['x'] += 1
+                        self.play_sound('move')
+                elif event.key == pygame.K_DOWN:
+                    if self.is_valid_move(self.current_piece['shape'],
+                                       self.current_piece['x'],
+                                       self.current_piece['y'] + 1):
+                        self.current_piece['y'] += 1
+                        self.play_sound('move')
+                elif event.key == pygame.K_UP:
+                    rotated = list(zip(*self.current_piece['shape'][::-1]))
+                    if self.is_valid_move(rotated,
+                                       self.current_piece['x'],
+                                       self.current_piece['y']):
+                        self.current_piece['shape'] = rotated
+                        self.play_sound('rotate')
+            elif event.key == pygame.K_SPACE:
+                self.reset_game()
+                self.start_music()
 
     def update(self):
+        # A fixed step of game time, so pieces fall at the same pace at any frame rate
+        step = self.timestep.step_ms
         if self.game_over or self.clearing_lines:
             if self.clearing_lines:
-                current_time = pygame.time.get_ticks()
-                if current_time - self.clear_animation_start > 200:  # Animation duration
+                self.clear_time += step
+                if self.clear_time > 200:  # Animation duration
                     self.clear_lines()
             return
 
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_fall > self.fall_speed:
+        self.fall_time += step
+        if self.fall_time > self.fall_speed:
             if self.is_valid_move(self.current_piece['shape'],
                                self.current_piece['x'],
                                self.current_piece['y'] + 1):
                 self.current_piece['y'] += 1
             else:
                 self.place_piece()
-            self.last_fall = current_time
+            self.fall_time = 0
 
     def draw(self):
-        self.screen.fill(self.BLACK)
-        self.draw_grid_lines()
+        # The board with grid lines, sidebar and labels is the static
+        # background of the compositor, only blocks and numbers are drawn
+        draw = self.compositor
         
         # Draw grid
+        flash = self.clearing_lines and int(self.clear_time // 100) % 2  # Flash every 100ms
         for y, row in enumerate(self.grid):
             for x, color in enumerate(row):
                 if color:
                     # Flash effect for lines being cleared
-                    if self.clearing_lines and y in self.lines_to_clear:
-                        if (pygame.time.get_ticks() // 100) % 2:  # Flash every 100ms
-                            color = self.FLASH_WHITE
-                    pygame.draw.rect(self.screen, color,
-                                   (x * self.BLOCK_SIZE,
-                                    y * self.BLOCK_SIZE,
-                                    self.BLOCK_SIZE - 1,
-                                    self.BLOCK_SIZE - 1))
+                    if flash and y in self.lines_to_clear:
+                        color = self.FLASH_WHITE
+                    self.draw_block(color, x * self.BLOCK_SIZE, y * self.BLOCK_SIZE)
+        if self.clearing_lines:
+            self.draw_clear_glow(flash)
 
         # Draw current piece
         if not self.game_over and not self.clearing_lines:
             for i, row in enumerate(self.current_piece['shape']):
                 for j, cell in enumerate(row):
                     if cell:
-                        pygame.draw.rect(self.screen,
-                                       self.current_piece['color'],
-                                       ((self.current_piece['x'] + j) * self.BLOCK_SIZE,
-                                        (self.current_piece['y'] + i) * self.BLOCK_SIZE,
-                                        self.BLOCK_SIZE - 1,
-                                        self.BLOCK_SIZE - 1))
+                        self.draw_block(self.current_piece['color'],
+                                        (self.current_piece['x'] + j) * self.BLOCK_SIZE,
+                                        (self.current_piece['y'] + i) * self.BLOCK_SIZE)
+
+        # Over the blocks, so a full top row doesn't hide it
+        draw.text(self.small_font, "Press ESC for menu", self.WHITE, (10, 10))
 
         # Draw stats and next piece
         self.draw_stats()
         self.draw_next_piece()
 
-        # Draw game over
+        # Draw game over, the same box as the other games over the whole board
         if self.game_over:
-            game_over_text = self.font.render("Game Over!", True, self.WHITE)
-            replay_text = self.small_font.render("Press SPACE to play again", True, self.WHITE)
-            self.screen.blit(game_over_text, 
-                           (self.GRID_WIDTH * self.BLOCK_SIZE + 10, 
-                            self.HEIGHT // 2 + 100))
-            self.screen.blit(replay_text,
-                           (self.GRID_WIDTH * self.BLOCK_SIZE + 10,
-                            self.HEIGHT // 2 + 150))
-
-        # Draw back button
-        back_text = self.small_font.render("Press ESC for menu", True, self.WHITE)
-        self.screen.blit(back_text, (10, 10))
-
-        pygame.display.flip()
-
-    def draw_grid_lines(self):
-        # Vẽ đường kẻ dọc
-        for x in range(self.GRID_WIDTH + 1):
-            pygame.draw.line(self.screen, self.GRAY,
-                           (x * self.BLOCK_SIZE, 0),
-                           (x * self.BLOCK_SIZE, self.HEIGHT))
-        
-        # Vẽ đường kẻ ngang
-        for y in range(self.GRID_HEIGHT + 1):
-            pygame.draw.line(self.screen, self.GRAY,
-                           (0, y * self.BLOCK_SIZE),
-                           (self.GRID_WIDTH * self.BLOCK_SIZE, y * self.BLOCK_SIZE))
+            best = self.best_label(self.score)
+            self.game_over_box.draw(draw, "Game Over!", self.WHITE, [
+                (f"Score: {self.score}", self.WHITE),
+                best and (best[0], self.WHITE),
+            ], "SPACE - Play again    ESC - Menu")
 
-    def draw_next_piece(self):
-        next_piece_text = self.font.render("Next:", True, self.WHITE)
-        self.screen.blit(next_piece_text, 
-                        (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 100))
+    def draw_clear_glow(self, flash):
+        for y in self.lines_to_clear:
+            # The glow is added on top, so the strip only holds the cleared row
+            self.glow_strip.fill(self.BLACK)
+            for x, color in enumerate(self.grid[y]):
+                self.glow_strip.blit(self.blocks[self.FLASH_WHITE if flash else color],
+                                     (x * self.BLOCK_SIZE, self.BLOCK_SIZE))
+            glow = self.clear_glow.render(self.glow_strip)
+            if glow is not None:
+                # Bloom renders into one buffer and the compositor blits later,
+                # so each row needs its own copy
+                self.compositor.blit(glow.copy(), (0, (y - 1) * self.BLOCK_SIZE), additive=True)
 
+    def draw_next_piece(self):
         start_x = self.GRID_WIDTH * self.BLOCK_SIZE + 50
         start_y = 150
         
         for i, row in enumerate(self.next_piece['shape']):
             for j, cell in enumerate(row):
                 if cell:
-                    pygame.draw.rect(self.screen,
-                                   self.next_piece['color'],
-                                   (start_x + j * self.BLOCK_SIZE,
-                                    start_y + i * self.BLOCK_SIZE,
-                                    self.BLOCK_SIZE - 1,
-                                    self.BLOCK_SIZE - 1))
+                    self.draw_block(self.next_piece['color'],
+                                    start_x + j * self.BLOCK_SIZE,
+                                    start_y + i * self.BLOCK_SIZE)
 
     def draw_stats(self):
-        # Vẽ khung thông tin bên phải
-        sidebar_rect = pygame.Rect(self.GRID_WIDTH * self.BLOCK_SIZE, 0,
-                                 self.SIDEBAR_WIDTH, self.HEIGHT)
-        pygame.draw.rect(self.screen, self.DARK_GRAY, sidebar_rect)
-        
+        x = self.GRID_WIDTH * self.BLOCK_SIZE + 20
         # Vẽ điểm số
-        score_text = self.font.render(f"Score:", True, self.WHITE)
-        score_value = self.font.render(str(self.score), True, self.WHITE)
-        self.screen.blit(score_text, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 10))
-        self.screen.blit(score_value, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 40))
+        self.compositor.text(self.font, str(self.score), self.WHITE, (x, 40))
 
         # Vẽ số dòng đã xóa
-        lines_text = self.font.render(f"Lines:", True, self.WHITE)
-        lines_value = self.font.render(str(self.lines), True, self.WHITE)
-        self.screen.blit(lines_text, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 250))
-        self.screen.blit(lines_value, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 280))
+        self.compositor.text(self.font, str(self.lines), self.WHITE, (x, 280))
 
         # Vẽ level
-        level_text = self.font.render(f"Level:", True, self.WHITE)
-        level_value = self.font.render(str(self.level), True, self.WHITE)
-        self.screen.blit(level_text, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 350))
-        self.screen.blit(level_value, (self.GRID_WIDTH * self.BLOCK_SIZE + 20, 380))
-
-    def run(self):
-        self.running = True
-        while self.running:
-            if not self.handle_events():
-                pygame.quit()
-                sys.exit()
-            self.update()
-            self.draw()
-            self.clock.tick(self.FPS)
+        self.compositor.text(self.font, str(self.level), self.WHITE, (x, 380))
+
+    def is_static(self):
+        # The game over screen only changes on input
+        return self.game_over
 
 def main():
     game = TetrisGame()
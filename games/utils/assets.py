@@ -0,0 +1,172 @@
+"""Fonts, sounds and images, loaded once and shared.
+
+Every scene used to open its own ``pygame.font.Font`` objects, and files
+were looked up relative to whatever directory the collection was started
+from. The asset manager resolves paths relative to the games package,
+loads each asset on first use and hands the same object to every caller:
+
+    self.font = get_assets().font("fonts/Roboto-Bold.ttf", 48, owner=self)
+
+A missing font file falls back to pygame's default font at that size.
+Images are converted to the display format once a window exists.
+
+Passing ``owner`` counts a reference until the owner (usually the scene) is
+garbage collected. Unreferenced assets stay cached, least recently used
+first, and are evicted once the resident total goes over the budget
+(AIO_GAMES_ASSET_BUDGET_MB, 64 MB by default); referenced ones never are.
+Resident bytes are estimated: pixel data for surfaces, sample data for
+sounds and the file size for fonts. ``stats()`` gives the totals, with
+the time spent loading. Fonts are dropped on ``pygame.quit()``, they can't
+be used once the font module is shut down.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+from games.utils.paths import package_path
+
+BUDGET_MB = float(os.environ.get("AIO_GAMES_ASSET_BUDGET_MB", "64"))
+
+
+def size_of(value):
+    # Estimated bytes held in memory
+    if isinstance(value, pygame.Surface):
+        return value.get_pitch() * value.get_height()
+    if isinstance(value, pygame.mixer.Sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(value.get_length() * frequency) * abs(size) // 8 * channels
+    return 0
+
+
+def font_file(path):
+    # The file behind a font, pygame's own for the default one
+    if path is None:
+        return os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    return package_path(path)
+
+
+class Asset:
+    def __init__(self, key, value, size):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.refs = 0
+
+
+class AssetManager:
+    def __init__(self, budget=BUDGET_MB * 1024 * 1024):
+        self.budget = budget
+        self.assets = OrderedDict()  # Least recently used first
+        # Scenes are built on the prewarm thread, and owners are released
+        # whenever the garbage collector runs
+        self.lock = threading.RLock()
+        self.resident = 0
+        self.loads = 0
+        self.load_ms = 0.0
+        self.hits = 0
+        self.evictions = 0
+        self.quit_hook = False
+
+    def get(self, key, loader, owner=None, size=None):
+        # The asset for key, loaded with loader() the first time
+        with self.lock:
+            asset = self.assets.get(key)
+            if asset is None:
+                start = time.perf_counter()
+                value = loader()
+                asset = Asset(key, value, size_of(value) if size is None else size)
+                self.assets[key] = asset
+                self.resident += asset.size
+                self.loads += 1
+                self.load_ms += (time.perf_counter() - start) * 1000
+            else:
+                self.hits += 1
+                self.assets.move_to_end(key)
+            if owner is not None:
+                asset.refs += 1
+                weakref.finalize(owner, self.release, key)
+            self.trim()
+            return asset.value
+
+    def release(self, key):
+        with self.lock:
+            asset = self.assets.get(key)
+            if asset is not None and asset.refs > 0:
+                asset.refs -= 1
+                self.trim()
+
+    def trim(self):
+        # Evict unreferenced assets, oldest first, until under budget
+        with self.lock:
+            if self.resident <= self.budget:
+                return
+            for key in [key for key, asset in self.assets.items() if asset.refs == 0]:
+                self.resident -= self.assets.pop(key).size
+                self.evictions += 1
+                if self.resident <= self.budget:
+                    return
+
+    def font(self, path, size, owner=None):
+        # path relative to the games package, None for the default font
+        if path is not None and not os.path.isfile(font_file(path)):
+            path = None  # Not bundled, looks the same at the same size
+        if not self.quit_hook:
+            pygame.register_quit(self.quit)  # Called once per pygame.quit()
+            self.quit_hook = True
+        # Font(None, size) also scales the default font as pygame always has
+        file = font_file(path)
+        source = None if path is None else file
+        return self.get(("font", path, size), lambda: pygame.font.Font(source, size), owner,
+                        size=os.path.getsize(file) if os.path.isfile(file) else 0)
+
+    def image(self, path, alpha=False, owner=None):
+        def load():
+            surface = pygame.image.load(package_path(path))
+            if pygame.display.get_surface() is None:
+                return surface  # No display format to convert to yet
+            return surface.convert_alpha() if alpha else surface.convert()
+        return self.get(("image", path, alpha), load, owner)
+
+    def sound(self, path, owner=None):
+        return self.get(("sound", path, pygame.mixer.get_init()),
+                        lambda: pygame.mixer.Sound(package_path(path)), owner)
+
+    def discard(self, kind):
+        # Forget every unreferenced asset of a kind ("font", "sound", ...)
+        with self.lock:
+            for key in [key for key, asset in self.assets.items()
+                        if key[0] == kind and asset.refs == 0]:
+                self.resident -= self.assets.pop(key).size
+
+    def quit(self):
+        with self.lock:
+            self.quit_hook = False
+            for key in [key for key in self.assets if key[0] == "font"]:
+                self.resident -= self.assets.pop(key).size
+
+    def stats(self):
+        with self.lock:
+            return {
+                "assets": len(self.assets),
+                "referenced": sum(1 for asset in self.assets.values() if asset.refs),
+                "resident_bytes": self.resident,
+                "budget_bytes": self.budget,
+                "loads": self.loads,
+                "load_ms": self.load_ms,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
+
+
+_assets = None
+
+
+def get_assets():
+    global _assets
+    if _assets is None:
+        _assets = AssetManager()
+    return _assets
@@ -0,0 +1,158 @@
+"""Shared mixer and sound effect voices.
+
+The mixer is set up once, when the launcher (or a game run on its own)
+starts, with a small buffer so effects follow key presses closely. Games
+then play named sounds through the shared ``AudioManager``:
+
+    audio = get_audio()
+    audio.register("tetris.clear", sound, priority=True)
+    audio.play("tetris.clear")
+
+Priority sounds get channels of their own, so a burst of move clicks can
+not cut them off, and music streams on a channel of its own (see music.py).
+Every sound has a cap on voices playing at once (the
+oldest is restarted when it is reached) and repeats within a few
+milliseconds of the last one are dropped. ``stats()`` reports what was
+played, dropped, and how long it took. AIO_GAMES_AUDIO=off keeps the mixer
+closed, e.g. for headless environments (env.py).
+"""
+import os
+import time
+
+import pygame
+
+FREQUENCY = 44100
+SIZE = -16
+CHANNELS = 2
+BUFFER = 512  # Samples, about 12 ms at 44.1 kHz
+NUM_CHANNELS = 16
+RESERVED_CHANNELS = 3  # Music, then priority sounds
+MUSIC_CHANNEL = 0
+
+_audio = None
+
+
+class SoundRule:
+    def __init__(self, sound, voices=2, interval_ms=30, priority=False):
+        self.sound = sound
+        self.voices = voices
+        self.interval = interval_ms / 1000
+        self.priority = priority
+        self.playing = []  # Channels, oldest first
+        self.last_play = -1.0
+
+
+class AudioManager:
+    def __init__(self):
+        self.enabled = False
+        self.rules = {}
+        self.buffer_ms = 0.0
+        self.played = 0
+        self.coalesced = 0  # Repeats too close to the previous one
+        self.stolen = 0  # Restarted the oldest voice at the voice cap
+        self.dropped = 0  # No free channel
+        self.peak_voices = 0
+        self.play_time = 0.0
+        self.max_play_time = 0.0
+        self.music = None  # Sequencer playing, or the last one
+
+    def init(self):
+        # Safe to call from every scene, the mixer is only opened once
+        if os.environ.get("AIO_GAMES_AUDIO") == "off":
+            return False
+        if self.enabled and pygame.mixer.get_init():
+            return True
+        if not pygame.mixer.get_init():
+            pygame.mixer.pre_init(FREQUENCY, SIZE, CHANNELS, BUFFER)
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                self.enabled = False
+                return False  # No audio device, play() does nothing
+        pygame.mixer.set_num_channels(NUM_CHANNELS)
+        pygame.mixer.set_reserved(RESERVED_CHANNELS)
+        self.buffer_ms = BUFFER * 1000 / pygame.mixer.get_init()[0]
+        self.enabled = True
+        return True
+
+    def register(self, name, sound, voices=2, interval_ms=30, priority=False):
+        # Registering again (a new session) keeps the counters
+        rule = self.rules.get(name)
+        if rule is not None and rule.sound is sound:
+            return
+        self.rules[name] = SoundRule(sound, voices, interval_ms, priority)
+
+    def play(self, name):
+        if not self.enabled or not pygame.mixer.get_init():
+            return None
+        rule = self.rules[name]
+        now = time.perf_counter()
+        if now - rule.last_play < rule.interval:
+            self.coalesced += 1
+            return None
+
+        rule.playing = [channel for channel in rule.playing
+                        if channel.get_busy() and channel.get_sound() is rule.sound]
+        if len(rule.playing) >= rule.voices:
+            channel = rule.playing.pop(0)
+            self.stolen += 1
+        elif rule.priority:
+            channel = self._reserved_channel()
+        else:
+            channel = pygame.mixer.find_channel()
+        if channel is None:
+            self.dropped += 1
+            return None
+
+        channel.play(rule.sound)
+        rule.playing.append(channel)
+        rule.last_play = now
+        self.played += 1
+        elapsed = time.perf_counter() - now
+        self.play_time += elapsed
+        self.max_play_time = max(self.max_play_time, elapsed)
+        self.peak_voices = max(self.peak_voices, self.voices())
+        return channel
+
+    def _reserved_channel(self):
+        # A free reserved channel, else the shared pool, else the first reserved one
+        for index in range(MUSIC_CHANNEL + 1, RESERVED_CHANNELS):
+            channel = pygame.mixer.Channel(index)
+            if not channel.get_busy():
+                return channel
+        return pygame.mixer.find_channel() or pygame.mixer.Channel(MUSIC_CHANNEL + 1)
+
+    def play_music(self, sequencer):
+        if self.music is not None and self.music is not sequencer:
+            self.music.stop()
+        self.music = sequencer
+        if self.enabled and pygame.mixer.get_init():
+            sequencer.start(pygame.mixer.Channel(MUSIC_CHANNEL))
+
+    def stop_music(self):
+        if self.music is not None:
+            self.music.stop()
+
+    def voices(self):
+        return sum(pygame.mixer.Channel(index).get_busy() for index in range(NUM_CHANNELS))
+
+    def stats(self):
+        return {
+            "played": self.played,
+            "coalesced": self.coalesced,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+            "voices": self.voices() if self.enabled else 0,
+            "peak_voices": self.peak_voices,
+            "buffer_ms": self.buffer_ms,
+            "avg_play_ms": self.play_time * 1000 / self.played if self.played else 0.0,
+            "max_play_ms": self.max_play_time * 1000,
+            "music": self.music.stats() if self.music is not None else None,
+        }
+
+
+def get_audio():
+    global _audio
+    if _audio is None:
+        _audio = AudioManager()
+    return _audio
@@ -0,0 +1,219 @@
+"""Recording gameplay to video without slowing the game down.
+
+While a ``VideoCapture`` is attached to the scene manager, finished
+frames are copied into a ring of preallocated surfaces just before they
+are presented, one blit, and that is all the game loop pays (the sdl2
+renderer also reads the frame back first). A background thread encodes
+the copies:
+
+- a directory (no extension): a PNG sequence, frame000000.png on;
+- .y4m: an uncompressed YUV 4:4:4 stream (needs numpy for the colors);
+- .rgb or .raw: raw RGB24 frames, e.g. for ``ffmpeg -f rawvideo``;
+- anything else (.mp4, .webm, .gif, ...): piped to ffmpeg, if installed.
+
+    python main.py --game snake --capture clips/snake.mp4
+    python main.py --replay slow.replay --headless --fps-uncapped --capture frames/
+
+The video runs at a fixed rate in game time (``manager.ticks``): frames
+drawn faster than that are skipped before they are copied, and a frame on
+screen for longer (an idle menu, a hitch) is written as often as it lasted.
+When the encoder falls behind and the ring is full, the frame is dropped
+rather than waited for; the next one fills the gap, so the video keeps its
+timing. In simulated time (``--fps-uncapped``, the scene manager's
+``frame_ms``) nobody watches the game in real time, so ``add(wait=True)``
+waits for a free slot instead and every frame makes it into the video.
+``stats()`` reports copied, written, dropped and waited for frames and the
+milliseconds spent on the game loop per frame.
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+RING_SIZE = 16
+CAPTURE_FPS = 30
+RAW_EXTENSIONS = (".rgb", ".raw")
+
+
+def capture_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if not extension:
+        return "png"
+    if extension == ".y4m":
+        return "y4m"
+    if extension in RAW_EXTENSIONS:
+        return "raw"
+    return "ffmpeg"
+
+
+def yuv444(frame):
+    # BT.601 studio range planes, as Y4M players expect by default
+    rgb = pygame.surfarray.array3d(frame).swapaxes(0, 1).astype(numpy.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    planes = (16 + 0.257 * r + 0.504 * g + 0.098 * b,
+              128 - 0.148 * r - 0.291 * g + 0.439 * b,
+              128 + 0.439 * r - 0.368 * g - 0.071 * b)
+    return b"".join(numpy.clip(plane + 0.5, 0, 255).astype(numpy.uint8).tobytes() for plane in planes)
+
+
+class VideoCapture:
+    def __init__(self, path, fps=CAPTURE_FPS, ring=RING_SIZE):
+        self.path = path
+        self.fps = fps
+        self.ring = ring
+        self.format = capture_format(path)
+        if self.format == "y4m" and numpy is None:
+            raise ValueError("Y4M capture needs numpy, capture to .rgb or PNG frames instead")
+        if self.format == "ffmpeg" and shutil.which("ffmpeg") is None:
+            raise ValueError(f"ffmpeg is not installed, can't encode {path}")
+        if self.format == "png":
+            os.makedirs(path, exist_ok=True)
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.slots = []  # Made on the first frame, in its size and format
+        self.free = queue.SimpleQueue()  # Slot numbers the game may copy into
+        self.filled = queue.Queue()  # (slot, repeats) for the encoder, None to stop
+        self.thread = None
+        self.out = None
+        self.process = None
+        self.error = None
+        self.start_ticks = None
+        self.assigned = 0  # Video frames handed to the encoder
+        self.written = 0
+        self.copied = 0
+        self.dropped = 0
+        self.waited = 0
+        self.wait_ms = 0.0
+        self.copy_ms = 0.0
+        self.max_copy_ms = 0.0
+        self.encode_ms = 0.0
+        self.peak_backlog = 0
+        self.setup_ms = 0.0
+
+    def add(self, capture, ticks, wait=False):
+        # The frame presented at ticks, read with capture() only if the video
+        # is due one. wait blocks on a full ring rather than dropping the frame.
+        start = time.perf_counter()
+        if self.start_ticks is None:
+            self.start(capture())
+            self.start_ticks = ticks
+            # Allocating the ring is a one-off, kept out of the per frame cost
+            self.setup_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+        due = int((ticks - self.start_ticks) * self.fps / 1000) + 1 - self.assigned
+        if due <= 0 or self.error is not None:
+            return
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            if not wait:
+                self.dropped += 1  # The encoder is behind, never wait for it
+                return
+            # The encoder frees a slot even after an error, so this returns
+            slot = self.free.get()
+            self.waited += 1
+            self.wait_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+        # A read back from the renderer backend counts as capture time too
+        self.slots[slot].blit(capture(), (0, 0))
+        self.filled.put((slot, due))
+        self.assigned += due
+        self.copied += 1
+        self.peak_backlog = max(self.peak_backlog, self.ring - self.free.qsize())
+        elapsed = (time.perf_counter() - start) * 1000
+        self.copy_ms += elapsed
+        self.max_copy_ms = max(self.max_copy_ms, elapsed)
+
+    def start(self, frame):
+        self.size = frame.get_size()
+        self.slots = [frame.copy() for _ in range(self.ring)]
+        for slot in range(self.ring):
+            self.free.put(slot)
+        width, height = self.size
+        if self.format == "y4m":
+            self.out = open(self.path, "wb")
+            self.out.write(f"YUV4MPEG2 W{width} H{height} F{self.fps}:1 Ip A1:1 C444\n".encode())
+        elif self.format == "raw":
+            self.out = open(self.path, "wb")
+        elif self.format == "ffmpeg":
+            self.process = subprocess.Popen(
+                ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                 "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                 "-pix_fmt", "yuv420p", self.path],
+                stdin=subprocess.PIPE)
+            self.out = self.process.stdin
+        self.thread = threading.Thread(target=self._run, name="video-encoder", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.filled.get()
+            if item is None:
+                break
+            slot, repeats = item
+            start = time.perf_counter()
+            try:
+                if self.error is None:
+                    self._write(self.slots[slot], repeats)
+                    self.written += repeats
+            except (OSError, pygame.error) as e:
+                self.error = e  # E.g. the disk is full, the rest is dropped
+            self.encode_ms += (time.perf_counter() - start) * 1000
+            self.free.put(slot)
+
+    def _write(self, frame, repeats):
+        if self.format == "png":
+            first = os.path.join(self.path, f"frame{self.written:06d}.png")
+            pygame.image.save(frame, first)
+            for index in range(self.written + 1, self.written + repeats):
+                shutil.copyfile(first, os.path.join(self.path, f"frame{index:06d}.png"))
+            return
+        if self.format == "y4m":
+            data = b"FRAME\n" + yuv444(frame)
+        else:
+            data = pygame.image.tobytes(frame, "RGB")
+        for _ in range(repeats):
+            self.out.write(data)
+
+    def close(self):
+        # Waits for the encoder to write out the ring
+        if self.thread is not None:
+            self.filled.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.out is not None:
+            try:
+                self.out.close()
+            except OSError as e:  # ffmpeg quit early
+                self.error = self.error or e
+            self.out = None
+        if self.process is not None:
+            if self.process.wait() != 0:
+                self.error = self.error or OSError(f"ffmpeg exited with status {self.process.returncode}")
+            self.process = None
+        self.slots = []
+
+    def stats(self):
+        copied = self.copied or 1
+        return {
+            "copied": self.copied,
+            "written": self.written,
+            "dropped": self.dropped,
+            "waited": self.waited,
+            "avg_wait_ms": self.wait_ms / copied,
+            "avg_copy_ms": self.copy_ms / copied,
+            "max_copy_ms": self.max_copy_ms,
+            "avg_encode_ms": self.encode_ms / copied,
+            "peak_backlog": self.peak_backlog,
+            "setup_ms": self.setup_ms,
+            "error": self.error,
+        }
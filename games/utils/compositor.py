@@ -0,0 +1,186 @@
+"""Dirty-rectangle compositing.
+
+A scene with a ``Compositor`` draws through it rather than straight onto
+its canvas: the same fill/rect/line/blit/text calls, recorded instead of
+drawn. Whatever never changes (grid lines, the Tetris sidebar, labels) is
+pre-rendered once into a static background layer. At the end of the frame
+``render()`` compares the calls with the previous frame's, and only where
+something appeared, moved or disappeared is the background copied back and
+every call touching that area replayed, clipped to it. The manager then
+presents just those rectangles with ``pygame.display.update(rects)``
+instead of flipping the whole window.
+
+A call counts as unchanged when its arguments are the same as last frame.
+Blits need a ``key`` naming their content for that, as for the Renderer
+backend's texture cache; blits without one are redrawn every frame. When
+the changed area is over FULL_REDRAW_FRACTION of the scene, or the canvas
+does not keep its pixels between frames (the Renderer backend clears every
+frame), the whole scene is redrawn and flipped as before.
+
+Set AIO_GAMES_DIRTY_RECTS=0 to always redraw everything, e.g. to compare
+(benchmarks/bench_compositor.py).
+"""
+import os
+
+import pygame
+
+from games.utils.render import SurfaceCanvas, _anchored
+
+DIRTY_RECTS = os.environ.get("AIO_GAMES_DIRTY_RECTS", "1") != "0"
+# Past this share of the scene a single full redraw is cheaper
+FULL_REDRAW_FRACTION = 0.5
+MAX_RECTS = 32
+
+
+def merge_rects(rects):
+    # Overlapping rects joined, so no area is redrawn twice
+    merged = []
+    for rect in rects:
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Compositor:
+    def __init__(self, size, background=None, key=None):
+        self.size = size
+        self.bounds = pygame.Rect((0, 0), size)
+        self.enabled = DIRTY_RECTS
+        self.canvas = None
+        self.partial = False  # The canvas keeps last frame's pixels
+        self.offset = (0, 0)  # Of the scene in the window
+        self.background = None
+        self.background_key = None
+        self.ops = []  # This frame's calls: (signature, rect, method, args)
+        self.previous = []
+        self.previous_signatures = set()
+        self.damaged = []  # Window areas drawn over by others since the last frame
+        self.full = True  # Redraw everything next frame
+        self.set_background(background, key)
+
+        self.frames = 0
+        self.full_frames = 0
+        self.drawn_area = 0  # Pixels written, background included
+        self.presented_area = 0
+
+    def attach(self, canvas):
+        # The scene's canvas, again every time it comes (back) on screen
+        self.canvas = canvas
+        self.partial = self.enabled and isinstance(canvas, SurfaceCanvas)
+        self.offset = canvas.surface.get_abs_offset() if self.partial else (0, 0)
+        self.invalidate()
+
+    def invalidate(self):
+        self.full = True
+
+    def damage(self, rect):
+        # Something else drew over the scene at rect (window coordinates),
+        # e.g. the profiler overlay: it is repainted next frame
+        self.damaged.append(pygame.Rect(rect).move(-self.offset[0], -self.offset[1]))
+
+    def set_background(self, surface, key=None):
+        # The static layer, None for plain black. Changing it redraws everything.
+        if surface is not self.background or key != self.background_key:
+            self.background = surface
+            self.background_key = key
+            self.invalidate()
+
+    def _add(self, signature, rect, method, *args):
+        self.ops.append((signature, rect, method, args))
+        return rect
+
+    def fill(self, color, rect=None):
+        rect = pygame.Rect(rect) if rect else self.bounds.copy()
+        return self._add(("fill", tuple(color), tuple(rect)), rect, "fill", color, rect)
+
+    def rect(self, color, rect, width=0):
+        rect = pygame.Rect(rect)
+        return self._add(("rect", tuple(color), tuple(rect), width), rect, "rect", color, rect, width)
+
+    def line(self, color, start, end):
+        left, top = min(start[0], end[0]), min(start[1], end[1])
+        rect = pygame.Rect(left, top, abs(end[0] - start[0]) + 1, abs(end[1] - start[1]) + 1)
+        return self._add(("line", tuple(color), tuple(start), tuple(end)), rect, "line", color, start, end)
+
+    def blit(self, source, dest, area=None, key=None, additive=False):
+        area = pygame.Rect(area) if area else None
+        rect = pygame.Rect(dest[:2], area.size if area else source.get_size())
+        signature = None
+        if key is not None:
+            signature = ("blit", key, tuple(rect), tuple(area) if area else None, additive)
+        return self._add(signature, rect, "blit", source, rect.topleft, area, key, additive)
+
+    def text(self, font, string, color, dest, anchor="topleft"):
+        # Rendered only when the area it is in gets redrawn
+        rect = _anchored(font.size(string), dest, anchor)
+        signature = ("text", font, string, tuple(color), tuple(rect))
+        return self._add(signature, rect, "text", font, string, color, rect.topleft)
+
+    def render(self):
+        # Draws the frame, returns the window rects to present or None for all of it
+        ops, self.ops = self.ops, []
+        previous, self.previous = self.previous, ops
+        before = self.previous_signatures
+        after = self.previous_signatures = {op[0] for op in ops}
+        damaged, self.damaged = self.damaged, []
+        self.frames += 1
+        if self.partial and not self.full:
+            rects = self._changes(previous, before, ops, after, damaged)
+            if rects is not None:
+                for rect in rects:
+                    self._redraw(rect, ops)
+                self.presented_area += sum(r.width * r.height for r in rects)
+                return [rect.move(self.offset) for rect in rects]
+
+        self.full = False
+        self.full_frames += 1
+        if self.background is None:
+            self.canvas.fill((0, 0, 0))
+        else:
+            self.canvas.blit(self.background, (0, 0), key=self.background_key)
+        for _, rect, method, args in ops:
+            getattr(self.canvas, method)(*args)
+            self.drawn_area += rect.width * rect.height
+        area = self.bounds.width * self.bounds.height
+        self.drawn_area += area
+        self.presented_area += area
+        return None
+
+    def _changes(self, previous, before, ops, after, damaged):
+        # The areas to redraw, None when a full redraw is cheaper
+        changed = damaged
+        changed += [op[1] for op in previous if op[0] is None or op[0] not in after]
+        changed += [op[1] for op in ops if op[0] is None or op[0] not in before]
+        rects = merge_rects([rect.clip(self.bounds) for rect in changed if rect.colliderect(self.bounds)])
+        total = sum(rect.width * rect.height for rect in rects)
+        if len(rects) > MAX_RECTS or total > FULL_REDRAW_FRACTION * self.bounds.width * self.bounds.height:
+            return None
+        return rects
+
+    def _redraw(self, rect, ops):
+        surface = self.canvas.surface
+        surface.set_clip(rect)
+        if self.background is None:
+            surface.fill((0, 0, 0), rect)
+        else:
+            surface.blit(self.background, rect, rect)
+        self.drawn_area += rect.width * rect.height
+        for _, bounds, method, args in ops:
+            if bounds.colliderect(rect):
+                getattr(self.canvas, method)(*args)
+                clipped = bounds.clip(rect)
+                self.drawn_area += clipped.width * clipped.height
+        surface.set_clip(None)
+
+    def stats(self):
+        frames = max(1, self.frames)
+        area = self.bounds.width * self.bounds.height
+        return {
+            "frames": self.frames,
+            "full_frames": self.full_frames,
+            "drawn_per_frame": self.drawn_area / frames / area,
+            "presented_per_frame": self.presented_area / frames / area,
+        }
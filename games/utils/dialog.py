@@ -0,0 +1,82 @@
+"""Modal message boxes over a dimmed scene, rendered once.
+
+The game over screens used to draw a full screen overlay, a box, its
+border and three or four text lines every frame. A ``Dialog`` renders the
+dimmed background and the box with its text into one surface when the
+content changes, and draws the cached result with a single keyed blit:
+
+    self.game_over_box = Dialog((self.WIDTH, self.HEIGHT), self.font, self.small_font)
+    ...
+    self.game_over_box.draw(self.compositor, "Game Over!", self.RED,
+                            [(f"Final Score: {self.score}", self.WHITE)],
+                            "SPACE - Play again    ESC - Menu")
+
+The box is centered, as wide as its longest line (at least MIN_WIDTH),
+with the title, the lines and then the footer a little further down.
+Lines that are None are skipped, e.g. a personal best there is none of
+yet. Each new content gets a new blit key, so the compositor and the
+Renderer backend's texture cache see an unchanged dialog as unchanged.
+"""
+import itertools
+
+import pygame
+
+from games.utils.text import render_text
+
+MIN_WIDTH = 400
+PADDING = 30
+DIM_ALPHA = 180
+BOX_COLOR = (128, 128, 128)
+BORDER_COLOR = (255, 255, 255)
+
+_serials = itertools.count()  # Tells dialogs apart in blit keys
+
+
+class Dialog:
+    def __init__(self, size, title_font, font, dim=DIM_ALPHA):
+        self.size = size
+        self.title_font = title_font
+        self.font = font
+        self.dim = dim
+        self.serial = next(_serials)
+        self.content = None
+        self.surface = None
+        self.version = 0
+        self.renders = 0
+
+    def draw(self, draw, title, title_color, lines=(), footer=None, footer_color=BORDER_COLOR):
+        # lines are (text, color) pairs, draw a canvas or compositor
+        lines = tuple(line for line in lines if line)
+        content = (title, tuple(title_color), lines, footer, tuple(footer_color))
+        if content != self.content:
+            self.content = content
+            self.surface = self.render(title, title_color, lines, footer, footer_color)
+            self.version += 1
+        draw.blit(self.surface, (0, 0), key=("dialog", self.serial, self.version))
+
+    def render(self, title, title_color, lines, footer, footer_color):
+        self.renders += 1
+        rows = [(render_text(self.title_font, title, title_color), 0)]
+        gap = self.title_font.get_linesize() + 16
+        for text, color in lines:
+            rows.append((render_text(self.font, text, color), gap))
+            gap = self.font.get_linesize() + 10
+        if footer:
+            rows.append((render_text(self.font, footer, footer_color), gap + 10))
+
+        width = max(MIN_WIDTH, max(label.get_width() for label, _ in rows) + 2 * PADDING)
+        height = PADDING + sum(offset for _, offset in rows) + rows[-1][0].get_height() + PADDING
+        box = pygame.Rect(0, 0, width, height)
+        box.center = (self.size[0] // 2, self.size[1] // 2)
+
+        surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface.fill((0, 0, 0, self.dim))
+        surface.fill(BOX_COLOR, box)
+        pygame.draw.rect(surface, BORDER_COLOR, box, 3)
+        y = box.top + PADDING
+        for label, offset in rows:
+            y += offset
+            surface.blit(label, (box.centerx - label.get_width() // 2, y))
+        return surface
@@ -1,6 +1,10 @@
 import pygame
 import random
 import math
+import os
+import time
+
+from games.utils.previews import PREVIEW_SIZE, PreviewSheet, get_preview
 
 class Particle:
     def __init__(self, x, y, speed, angle, color, size, lifetime):
@@ -52,216 +56,117 @@ class Background:
         for particle in self.particles:
             particle.draw(surface)
 
-class Transition:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.progress = 0
-        self.speed = 0.02
-        self.fading_out = True
-        
-    def update(self):
-        if self.fading_out:
-            self.progress = min(1, self.progress + self.speed)
-        else:
-            self.progress = max(0, self.progress - self.speed)
-            
-    def is_done(self):
-        return (self.fading_out and self.progress >= 1) or (not self.fading_out and self.progress <= 0)
-        
-    def draw(self, surface):
-        alpha = int(255 * self.progress)
-        overlay = pygame.Surface((self.width, self.height))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(alpha)
-        surface.blit(overlay, (0, 0))
+# Bloom quality levels: (downsample factor, blur passes). Measured cost of a
+# full 800x600 pass with the software renderer (benchmarks/bench_bloom.py):
+#   low ~1.7 ms, medium ~2.3 ms, high ~4.7 ms per frame
+BLOOM_QUALITY = {
+    "off": None,
+    "low": (8, 1),
+    "medium": (4, 2),
+    "high": (2, 3),
+}
+BLOOM_LEVELS = ["off", "low", "medium", "high"]
+# Set AIO_GAMES_BLOOM=low (or off) to turn the glow down on slow machines
+DEFAULT_BLOOM_QUALITY = os.environ.get("AIO_GAMES_BLOOM", "medium")
+if DEFAULT_BLOOM_QUALITY not in BLOOM_QUALITY:
+    print(f"Ignoring unknown AIO_GAMES_BLOOM={DEFAULT_BLOOM_QUALITY}, "
+          f"use one of {', '.join(BLOOM_LEVELS)}")
+    DEFAULT_BLOOM_QUALITY = "medium"
+
+class Bloom:
+    def __init__(self, width, height, quality=None, threshold=160, boost=1, budget_ms=None):
+        self.size = (width, height)
+        self.threshold = threshold
+        self.boost = boost  # Each step doubles the brightness of the glow
+        self.budget_ms = budget_ms  # Drop a quality level when over budget
+        self.cost_ms = 0.0  # Rolling average of apply()
+        self.last_cost_ms = 0.0
+        self.set_quality(quality or DEFAULT_BLOOM_QUALITY)
+
+    def set_quality(self, quality):
+        if quality not in BLOOM_QUALITY:
+            raise ValueError(f"Unknown bloom quality: {quality}")
+        self.quality = quality
+        self.cost_ms = 0.0
+        settings = BLOOM_QUALITY[quality]
+        if settings is None:
+            self.small = self.tiny = self.glow = None
+            return
+        factor, self.passes = settings
+        width, height = self.size
+        small_size = (max(1, width // factor), max(1, height // factor))
+        tiny_size = (max(1, small_size[0] // 2), max(1, small_size[1] // 2))
+        # Persistent buffers, every pass scales into these in place
+        self.small = pygame.Surface(small_size)
+        self.scratch = pygame.Surface(small_size)
+        self.tiny = pygame.Surface(tiny_size)
+        self.glow = pygame.Surface(self.size)
+
+    def apply(self, surface, pos=(0, 0)):
+        # Glow the bright parts of the area of surface at pos, bloom-sized
+        area = pygame.Rect(pos, self.size).clamp(surface.get_rect())
+        glow = self.render(surface, area.topleft)
+        if glow is not None:
+            surface.blit(glow, area.topleft, special_flags=pygame.BLEND_RGB_ADD)
+
+    def render(self, surface, pos=(0, 0)):
+        # Just the glow for the area of surface at pos, to be added on top
+        # by the caller (e.g. as a texture). None when off or out of bounds.
+        if self.small is None:
+            return None
+        start = time.perf_counter()
+        bounds = surface.get_rect()
+        area = pygame.Rect(pos, self.size).clamp(bounds)
+        if not bounds.contains(area):
+            return None
+        source = surface.subsurface(area)
+
+        # Downsample and keep only what is brighter than the threshold
+        pygame.transform.smoothscale(source, self.small.get_size(), self.small)
+        self.small.fill((self.threshold,) * 3, special_flags=pygame.BLEND_RGB_SUB)
+        for _ in range(self.boost):
+            self.scratch.blit(self.small, (0, 0))
+            self.small.blit(self.scratch, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+        # Blur by bouncing between the small and tiny buffers
+        for _ in range(self.passes):
+            pygame.transform.smoothscale(self.small, self.tiny.get_size(), self.tiny)
+            pygame.transform.smoothscale(self.tiny, self.small.get_size(), self.small)
+
+        pygame.transform.smoothscale(self.small, self.size, self.glow)
+        glow = self.glow
+
+        self.last_cost_ms = (time.perf_counter() - start) * 1000
+        self.cost_ms = self.cost_ms * 0.9 + self.last_cost_ms * 0.1 if self.cost_ms else self.last_cost_ms
+        if self.budget_ms and self.cost_ms > self.budget_ms:
+            level = BLOOM_LEVELS.index(self.quality)
+            if level > 1:
+                self.set_quality(BLOOM_LEVELS[level - 1])
+        return glow
 
 class GamePreview:
-    def __init__(self, width, height):
+    def __init__(self, width, height, cache_dir=None):
         self.WIDTH = width
         self.HEIGHT = height
-        self.preview_size = (120, 120)
-        self.preview_surface = pygame.Surface(self.preview_size)
+        self.preview_size = PREVIEW_SIZE
+        self.cache_dir = cache_dir
+        self.sheets = {}  # Rendered lazily the first time a game is selected
         self.animation_counter = 0
-        
-        # Snake game variables
-        self.snake_dir = (1, 0)
-        self.snake_pos = [(3, 5), (4, 5), (5, 5)]
-        self.food_pos = (7, 5)
-        
-        # Pong game variables
-        self.ball_dx = 1
-        self.ball_dy = 1
-        self.ai_paddle_y = 35
-        self.player_paddle_y = 35
-        
-        # Tetris variables
-        self.current_piece = 0
-        self.piece_y = 0
-        self.fall_counter = 0
-        
-    def draw(self, screen, game_name, position):
-        self.animation_counter = (self.animation_counter + 1) % 60
-        self.preview_surface.fill((0, 0, 0))
-        
-        if game_name == "Snake Game":
-            # Update snake position
-            if self.animation_counter % 10 == 0:
-                # Move snake
-                new_head = (self.snake_pos[-1][0] + self.snake_dir[0],
-                          self.snake_pos[-1][1] + self.snake_dir[1])
-                
-                # Check if snake reached food
-                if new_head == self.food_pos:
-                    self.snake_pos.append(new_head)
-                    self.food_pos = ((self.food_pos[0] + 3) % 10,
-                                   (self.food_pos[1] + 2) % 10)
-                else:
-                    self.snake_pos = self.snake_pos[1:] + [new_head]
-                
-                # Change direction occasionally
-                if self.animation_counter % 30 == 0:
-                    if self.snake_dir == (1, 0):
-                        self.snake_dir = (0, 1)
-                    elif self.snake_dir == (0, 1):
-                        self.snake_dir = (-1, 0)
-                    elif self.snake_dir == (-1, 0):
-                        self.snake_dir = (0, -1)
-                    else:
-                        self.snake_dir = (1, 0)
-            
-            # Draw snake
-            for segment in self.snake_pos:
-                pygame.draw.rect(self.preview_surface, (0, 255, 0),
-                               (segment[0] * 12, segment[1] * 12, 10, 10))
-            
-            # Draw food
-            pygame.draw.rect(self.preview_surface, (255, 0, 0),
-                           (self.food_pos[0] * 12, self.food_pos[1] * 12, 10, 10))
-                           
-        elif game_name == "Hangman":
-            # Animate hangman drawing
-            progress = (self.animation_counter // 10) % 7
-            
-            # Draw gallows
-            pygame.draw.line(self.preview_surface, (255, 255, 255),
-                           (30, 100), (90, 100), 2)  # Base
-            if progress >= 1:
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (60, 100), (60, 20), 2)  # Pole
-            if progress >= 2:
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (60, 20), (80, 20), 2)  # Top
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 20), (80, 30), 2)  # Rope
-            if progress >= 3:
-                pygame.draw.circle(self.preview_surface, (255, 255, 255),
-                                 (80, 40), 10, 2)  # Head
-            if progress >= 4:
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 50), (80, 70), 2)  # Body
-            if progress >= 5:
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 55), (70, 65), 2)  # Left arm
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 55), (90, 65), 2)  # Right arm
-            if progress >= 6:
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 70), (70, 85), 2)  # Left leg
-                pygame.draw.line(self.preview_surface, (255, 255, 255),
-                               (80, 70), (90, 85), 2)  # Right leg
-                               
-        elif game_name == "Pong":
-            # Update ball position
-            ball_x = 60 + int(30 * math.sin(self.animation_counter * 0.1))
-            ball_y = 60 + int(20 * math.cos(self.animation_counter * 0.1))
-            
-            # Update AI paddle to follow ball
-            if self.ai_paddle_y + 15 < ball_y:
-                self.ai_paddle_y += 2
-            elif self.ai_paddle_y + 15 > ball_y:
-                self.ai_paddle_y -= 2
-            
-            # Update player paddle to create interesting gameplay
-            target_y = 60 + int(25 * math.sin(self.animation_counter * 0.05))
-            if self.player_paddle_y + 15 < target_y:
-                self.player_paddle_y += 2
-            elif self.player_paddle_y + 15 > target_y:
-                self.player_paddle_y -= 2
-            
-            # Keep paddles in bounds
-            self.ai_paddle_y = max(0, min(self.ai_paddle_y, 90))
-            self.player_paddle_y = max(0, min(self.player_paddle_y, 90))
-            
-            # Draw paddles
-            pygame.draw.rect(self.preview_surface, (255, 255, 255),
-                           (10, self.player_paddle_y, 5, 30))  # Left paddle
-            pygame.draw.rect(self.preview_surface, (255, 255, 255),
-                           (105, self.ai_paddle_y, 5, 30))  # Right paddle
-            
-            # Draw ball with trail effect
-            for i in range(3):
-                trail_x = 60 + int(30 * math.sin((self.animation_counter - i*2) * 0.1))
-                trail_y = 60 + int(20 * math.cos((self.animation_counter - i*2) * 0.1))
-                alpha = 100 - i * 30
-                trail = pygame.Surface((6, 6))
-                trail.fill((255, 255, 255))
-                trail.set_alpha(alpha)
-                self.preview_surface.blit(trail, (trail_x - 3, trail_y - 3))
-            
-            pygame.draw.rect(self.preview_surface, (255, 255, 255),
-                           (ball_x - 3, ball_y - 3, 6, 6))  # Ball
-            
-            # Draw center line
-            for y in range(0, 120, 10):
-                pygame.draw.rect(self.preview_surface, (128, 128, 128),
-                               (58, y, 4, 4))
-                               
-        elif game_name == "Tetris":
-            # Tetris pieces with their colors
-            pieces = [
-                ([(0, 0), (0, 1), (0, 2), (0, 3)], (0, 255, 255)),  # I
-                ([(0, 0), (1, 0), (0, 1), (1, 1)], (255, 255, 0)),  # O
-                ([(0, 0), (1, 0), (1, 1), (2, 1)], (255, 0, 0)),    # Z
-                ([(0, 0), (0, 1), (0, 2), (1, 2)], (255, 165, 0))   # L
-            ]
-            
-            # Update falling piece
-            self.fall_counter += 1
-            if self.fall_counter >= 20:
-                self.fall_counter = 0
-                self.piece_y += 1
-                if self.piece_y > 8:
-                    self.piece_y = -2
-                    self.current_piece = (self.current_piece + 1) % len(pieces)
-            
-            # Draw game border
-            pygame.draw.rect(self.preview_surface, (128, 128, 128),
-                           (30, 10, 60, 100), 2)
-            
-            # Draw current falling piece
-            piece, color = pieces[self.current_piece]
-            for block in piece:
-                x, y = block
-                pygame.draw.rect(self.preview_surface, color,
-                               (40 + x * 10, 20 + (y + self.piece_y) * 10, 8, 8))
-            
-            # Draw some fixed pieces at the bottom
-            fixed_blocks = [
-                (40, 90, (255, 0, 0)),
-                (50, 90, (255, 0, 0)),
-                (60, 90, (0, 255, 0)),
-                (70, 90, (0, 255, 0)),
-                (40, 80, (0, 255, 255)),
-                (50, 80, (0, 255, 255)),
-                (60, 80, (255, 165, 0))
-            ]
-            for x, y, color in fixed_blocks:
-                pygame.draw.rect(self.preview_surface, color, (x, y, 8, 8))
-        
-        # Draw preview border
-        pygame.draw.rect(self.preview_surface, (128, 128, 128),
-                        (0, 0, self.preview_size[0], self.preview_size[1]), 1)
-        
-        # Draw the preview at the specified position
-        screen.blit(self.preview_surface, position) 
\ No newline at end of file
+
+    def get_sheet(self, game_name):
+        sheet = self.sheets.get(game_name)
+        if sheet is None:
+            generator = get_preview(game_name)
+            if generator is None:
+                return None
+            sheet = PreviewSheet(generator, self.preview_size, self.cache_dir)
+            self.sheets[game_name] = sheet
+        return sheet
+
+    def draw(self, canvas, game_name, position):
+        # One blit from the sheet; on the Renderer backend the sheet is a texture
+        self.animation_counter += 1
+        sheet = self.get_sheet(game_name)
+        if sheet is not None:
+            canvas.blit(sheet.surface, position, sheet.frame_rect(self.animation_counter),
+                        key=("preview", game_name, self.preview_size))
@@ -0,0 +1,434 @@
+"""Snake, Pong and Tetris as reinforcement learning environments.
+
+``GameEnv`` runs one game headless, without a window, sound or stored
+scores, behind the usual reset/step interface:
+
+    env = GameEnv("snake", obs="grid", seed=1)
+    obs = env.reset()
+    obs, reward, done, info = env.step(rng.randrange(env.num_actions))
+
+An action is what the player would press (``env.actions`` names them; in
+Pong it is the paddle key held until the next step), then the game runs
+``frame_skip`` of its fixed updates. The reward is the score gained in the
+step (in Pong the change in the point margin) and ``done`` is game over.
+Observations are uint8: "grid" has one cell per board cell (see the
+adapters below), "pixels" is the RGB frame the game draws, (height, width,
+3), scaled to ``size`` if given. They are numpy arrays when numpy is
+installed and memoryviews of the same shape otherwise, kept in one buffer
+that the next step overwrites.
+
+``VecEnv`` steps n environments in worker processes. Observations,
+actions, rewards and done flags live in one block of shared memory, so a
+step sends each worker a byte and nothing is pickled. Its observations
+are one (n, ...) array with numpy, a list of n memoryviews without. A worker resets its
+environment as soon as an episode ends: the observation it returns is
+then the first of the next episode, and ``episode_returns`` and
+``episode_lengths`` hold the finished one's. benchmarks/bench_env.py
+measures steps per second as workers are added.
+"""
+import copy
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import pygame
+
+from games.registry import get_game
+from games.utils.render import SurfaceCanvas
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OBSERVATIONS = ("grid", "pixels")
+
+
+def headless():
+    # No window, sound or stored scores, here and in the workers started from here
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("AIO_GAMES_AUDIO", "off")
+    os.environ.setdefault("AIO_GAMES_SCORES", "off")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Once per worker otherwise
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="")
+
+
+class SnakeAdapter:
+    # Grid: 1 body, 2 head, 3 food
+    ACTIONS = ("none", "up", "down", "left", "right")
+    KEYS = (None, pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
+
+    def __init__(self):
+        self.events = [key and key_event(key) for key in self.KEYS]
+
+    def start(self, scene):
+        pass
+
+    def act(self, scene, action):
+        if self.events[action]:
+            scene.handle_event(self.events[action])
+
+    def score(self, scene):
+        return scene.score
+
+    def done(self, scene):
+        return scene.game_over
+
+    def grid_shape(self, scene):
+        return (scene.GRID_HEIGHT, scene.GRID_WIDTH)
+
+    def grid(self, scene):
+        width = scene.GRID_WIDTH
+        cells = bytearray(width * scene.GRID_HEIGHT)
+        for x, y in scene.snake:
+            cells[y * width + x] = 1
+        x, y = scene.snake[0]
+        cells[y * width + x] = 2
+        x, y = scene.food
+        cells[y * width + x] = 3
+        return cells
+
+
+class PongAdapter:
+    # Grid of CELL pixel cells: 1 paddles, 2 ball. Played on the default difficulty
+    ACTIONS = ("stay", "up", "down")
+    KEYS = (set(), {pygame.K_w}, {pygame.K_s})
+    CELL = 20
+
+    def start(self, scene):
+        # Straight into a game, past the difficulty menu
+        scene.state = scene.PLAYING
+        scene.held_keys = set()
+        scene.start_round()
+
+    def act(self, scene, action):
+        scene.held_keys = self.KEYS[action]
+
+    def score(self, scene):
+        return scene.margin()
+
+    def done(self, scene):
+        return scene.state == scene.GAME_OVER
+
+    def grid_shape(self, scene):
+        return (scene.HEIGHT // self.CELL, scene.WIDTH // self.CELL)
+
+    def grid(self, scene):
+        rows, columns = self.grid_shape(scene)
+        cells = bytearray(rows * columns)
+        for y, column in ((scene.player_y, 0), (scene.ai_y, columns - 1)):
+            top = int(y) // self.CELL
+            bottom = min(rows - 1, (int(y) + scene.PADDLE_HEIGHT - 1) // self.CELL)
+            for row in range(top, bottom + 1):
+                cells[row * columns + column] = 1
+        # The ball's center, which is briefly off the table before a point
+        row = min(rows - 1, max(0, int(scene.ball_y + scene.BALL_SIZE / 2) // self.CELL))
+        column = min(columns - 1, max(0, int(scene.ball_x + scene.BALL_SIZE / 2) // self.CELL))
+        cells[row * columns + column] = 2
+        return cells
+
+
+class TetrisAdapter:
+    # Grid: 1 locked blocks, 2 the falling piece
+    ACTIONS = ("none", "left", "right", "rotate", "down")
+    KEYS = (None, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+
+    def __init__(self):
+        self.events = [key and key_event(key) for key in self.KEYS]
+
+    def start(self, scene):
+        # A new game takes the last one's next piece, draw it from the seeded generator too
+        vars(scene).pop("next_piece", None)
+
+    def act(self, scene, action):
+        if self.events[action]:
+            scene.handle_event(self.events[action])
+
+    def score(self, scene):
+        return scene.score
+
+    def done(self, scene):
+        return scene.game_over
+
+    def grid_shape(self, scene):
+        return (scene.GRID_HEIGHT, scene.GRID_WIDTH)
+
+    def grid(self, scene):
+        width = scene.GRID_WIDTH
+        cells = bytearray(1 if color else 0 for row in scene.grid for color in row)
+        if not scene.game_over:
+            piece = scene.current_piece
+            for i, row in enumerate(piece['shape']):
+                for j, cell in enumerate(row):
+                    y = piece['y'] + i
+                    if cell and 0 <= y < scene.GRID_HEIGHT:
+                        cells[y * width + piece['x'] + j] = 2
+        return cells
+
+
+ADAPTERS = {"snake": SnakeAdapter, "pong": PongAdapter, "tetris": TetrisAdapter}
+
+
+class GameEnv:
+    def __init__(self, game, obs="grid", seed=None, size=None, frame_skip=1, buffer=None):
+        if obs not in OBSERVATIONS:
+            raise ValueError(f"obs must be one of {', '.join(OBSERVATIONS)}, not {obs!r}")
+        info = get_game(game)
+        if info is None or info.module.split(".")[1] not in ADAPTERS:
+            raise ValueError(f"No environment for {game!r}, one of {', '.join(ADAPTERS)}")
+        headless()
+        self.obs = obs
+        self.frame_skip = frame_skip
+        self.scene = scene = info.load()()
+        self.adapter = ADAPTERS[scene.GAME_ID]()
+        self.actions = self.adapter.ACTIONS
+        self.num_actions = len(self.actions)
+        self.initial = copy.deepcopy(scene.snapshot())  # reset_game() alone misses some fields
+        if seed is not None:
+            scene.random.seed(seed)
+        scene.timestep.alpha = 1.0  # Drawn where the last update left things
+
+        # The scene draws into a surface of its own, as if on screen
+        self.screen = pygame.Surface((scene.WIDTH, scene.HEIGHT))
+        scene.screen = self.screen
+        scene.canvas = SurfaceCanvas(self.screen)
+        scene.compositor.attach(scene.canvas)
+        self.scaled = None
+        if obs == "grid":
+            self.observation_shape = self.adapter.grid_shape(scene)
+        else:
+            width, height = size or self.screen.get_size()
+            if (width, height) != self.screen.get_size():
+                self.scaled = pygame.Surface((width, height))
+            self.observation_shape = (height, width, 3)
+
+        # Observations are kept in buffer, e.g. a slot of shared memory
+        if buffer is None:
+            buffer = bytearray(math.prod(self.observation_shape))
+        self.buffer = memoryview(buffer).cast("B")
+        if numpy is not None:
+            self.observation = numpy.frombuffer(self.buffer, numpy.uint8).reshape(self.observation_shape)
+        else:
+            self.observation = self.buffer.cast("B", self.observation_shape)
+        self.score = 0
+        self.steps = 0
+
+    def reset(self, seed=None):
+        scene = self.scene
+        if seed is not None:
+            scene.random.seed(seed)
+        scene.restore(copy.deepcopy(self.initial))
+        self.adapter.start(scene)
+        scene.reset_game()
+        scene.compositor.invalidate()
+        self.score = self.adapter.score(scene)
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        scene = self.scene
+        self.adapter.act(scene, action)
+        done = False
+        for _ in range(self.frame_skip):
+            scene.update()
+            scene.timestep.steps += 1  # Game time for the round's duration
+            done = self.adapter.done(scene)
+            if done:
+                break
+        score = self.adapter.score(scene)
+        reward = score - self.score
+        self.score = score
+        self.steps += 1
+        return self.observe(), reward, done, {"score": score, "steps": self.steps}
+
+    def observe(self):
+        if self.obs == "grid":
+            self.buffer[:] = self.adapter.grid(self.scene)
+        else:
+            self.scene.draw()
+            self.scene.compositor.render()
+            surface = self.screen
+            if self.scaled is not None:
+                pygame.transform.scale(self.screen, self.scaled.get_size(), self.scaled)
+                surface = self.scaled
+            # One copy of the pixels in row order, with or without numpy
+            self.buffer[:] = pygame.image.tobytes(surface, "RGB")
+        return self.observation
+
+    def close(self):
+        self.observation = None
+        self.buffer.release()
+
+
+class SharedBlock:
+    # The arrays of a VecEnv in one buffer, laid out alike in every process
+    def __init__(self, buffer, n, observation_size):
+        self.views = []
+        self.rewards = self.view(buffer, 0, n * 8, "d")
+        self.returns = self.view(buffer, n * 8, n * 16, "d")
+        self.actions = self.view(buffer, n * 16, n * 20, "i")
+        self.lengths = self.view(buffer, n * 20, n * 24, "i")
+        self.dones = self.view(buffer, n * 24, n * 25, "B")
+        self.observations = self.view(buffer, n * 25, n * 25 + n * observation_size, "B")
+        self.observation_size = observation_size
+
+    @staticmethod
+    def size(n, observation_size):
+        return n * 25 + n * observation_size
+
+    def view(self, buffer, start, end, format):
+        view = buffer[start:end].cast(format)
+        self.views.append(view)
+        return view
+
+    def slot(self, index, shape=None):
+        # One environment's observation, flat or cast to shape
+        size = self.observation_size
+        view = self.view(self.observations, index * size, (index + 1) * size, "B")
+        if shape is not None:
+            view = view.cast("B", shape)
+            self.views.append(view)  # Released before the view it casts
+        return view
+
+    def release(self):
+        # Shared memory can't be closed while views of it exist
+        for view in reversed(self.views):
+            view.release()
+
+
+def _worker(connection, name, n, index, observation_size, game, obs, seed, size, frame_skip):
+    shm = shared_memory.SharedMemory(name=name)
+    block = env = None
+    try:
+        block = SharedBlock(shm.buf, n, observation_size)
+        env = GameEnv(game, obs, seed=seed, size=size, frame_skip=frame_skip, buffer=block.slot(index))
+        env.reset()
+        episode_return = 0.0
+        connection.send_bytes(b".")
+        while True:
+            command = connection.recv_bytes()
+            if command == b"s":
+                _, reward, done, _ = env.step(block.actions[index])
+                episode_return += reward
+                if done:
+                    block.returns[index] = episode_return
+                    block.lengths[index] = env.steps
+                    episode_return = 0.0
+                    env.reset()
+                block.rewards[index] = reward
+                block.dones[index] = done
+            elif command == b"r":
+                env.reset()
+                episode_return = 0.0
+            else:
+                break
+            connection.send_bytes(b".")
+    except KeyboardInterrupt:
+        pass  # The parent closes the environments
+    finally:
+        if env is not None:
+            env.close()
+        if block is not None:
+            block.release()
+        shm.close()
+        connection.close()
+
+
+class VecEnv:
+    def __init__(self, game, n, obs="grid", seed=None, size=None, frame_skip=1):
+        # The shapes and actions come from one environment built here
+        probe = GameEnv(game, obs, size=size, frame_skip=frame_skip)
+        self.n = n
+        self.actions = probe.actions
+        self.num_actions = probe.num_actions
+        self.observation_shape = probe.observation_shape
+        probe.close()
+        observation_size = math.prod(self.observation_shape)
+        self.shm = shared_memory.SharedMemory(create=True, size=SharedBlock.size(n, observation_size))
+        self.block = SharedBlock(self.shm.buf, n, observation_size)
+        if numpy is not None:
+            self.observations = self.array(self.block.observations, (n,) + self.observation_shape)
+        else:
+            # memoryviews can't be indexed along one of several dimensions
+            self.observations = [self.block.slot(index, self.observation_shape) for index in range(n)]
+        self.rewards = self.array(self.block.rewards)
+        self.dones = self.array(self.block.dones)
+        self.episode_returns = self.array(self.block.returns)
+        self.episode_lengths = self.array(self.block.lengths)
+
+        # Spawned, not forked: the children start without this process's pygame state
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        for index in range(n):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker, daemon=True, name=f"env-{index}",
+                args=(child, self.shm.name, n, index, observation_size, game, obs,
+                      None if seed is None else seed + index, size, frame_skip))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.wait()
+
+    def array(self, view, shape=None):
+        # A numpy array over the shared memory, or the memoryview itself
+        if numpy is None:
+            return view
+        array = numpy.frombuffer(view, numpy.dtype(view.format))
+        return array if shape is None else array.reshape(shape)
+
+    def send(self, command):
+        for connection in self.connections:
+            connection.send_bytes(command)
+
+    def wait(self):
+        for connection in self.connections:
+            connection.recv_bytes()
+
+    def reset(self):
+        self.send(b"r")
+        self.wait()
+        return self.observations
+
+    def step(self, actions):
+        # Views of the shared memory, overwritten by the next step
+        for index, action in enumerate(actions):
+            self.block.actions[index] = action
+        self.send(b"s")
+        self.wait()
+        info = {"episode_returns": self.episode_returns, "episode_lengths": self.episode_lengths}
+        return self.observations, self.rewards, self.dones, info
+
+    def close(self):
+        if self.shm is None:
+            return
+        for connection in self.connections:
+            try:
+                connection.send_bytes(b"c")
+            except (BrokenPipeError, OSError):
+                pass  # Already gone
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.observations = self.rewards = self.dones = None
+        self.episode_returns = self.episode_lengths = None
+        self.block.release()
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Arrays handed out still map it, it goes with them
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,199 @@
+"""Streaming chiptune music.
+
+A ``Track`` is a few looping voices written as note strings, e.g.
+``"E5:1 B4:.5 C5:.5 -:1"`` (note name and length in beats, ``-`` for a
+rest). The ``Sequencer`` renders it with the waveforms of synth.py in short
+chunks (50 ms) on a producer thread and hands them to the mixer's music
+channel with ``Channel.queue``. At most three chunks exist at a time (one
+playing, one queued, one rendered ahead), so memory stays constant however
+long the music plays, and the tempo can change between chunks:
+
+    sequencer = Sequencer(track, bpm=140)
+    get_audio().play_music(sequencer)
+    sequencer.set_tempo(160)
+
+``stats()`` reports underruns (the channel ran dry before the next chunk
+was queued) and the render time against the audio time it produced.
+"""
+import threading
+import time
+from array import array
+
+import pygame
+
+from games.utils.synth import concat, numpy, oscillator, silence, to_sound
+
+CHUNK_MS = 50
+ATTACK_MS = 3
+RELEASE_MS = 15  # Gap between repeated notes
+
+NOTE_NAMES = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+
+
+def note_frequency(name):
+    # "A4" -> 440.0, "G#2", "Bb3"
+    semitone = NOTE_NAMES[name[0].upper()]
+    rest = name[1:]
+    if rest[0] == "#":
+        semitone, rest = semitone + 1, rest[1:]
+    elif rest[0] == "b":
+        semitone, rest = semitone - 1, rest[1:]
+    midi = 12 * (int(rest) + 1) + semitone
+    return 440.0 * 2 ** ((midi - 69) / 12)
+
+
+def parse_notes(spec):
+    # "E5:1 -:.5" -> [(659.26, 1.0), (None, 0.5)]
+    notes = []
+    for item in spec.split():
+        name, _, beats = item.partition(":")
+        frequency = None if name == "-" else note_frequency(name)
+        notes.append((frequency, float(beats or 1)))
+    return notes
+
+
+class Voice:
+    def __init__(self, notes, wave="square", amplitude=0.1):
+        self.notes = parse_notes(notes) if isinstance(notes, str) else notes
+        self.wave = wave
+        self.amplitude = amplitude
+
+
+class Track:
+    def __init__(self, voices, bpm=120):
+        self.voices = voices
+        self.bpm = bpm
+
+
+class VoiceState:
+    # Where a voice is in its loop, carried from one chunk to the next
+    def __init__(self, voice):
+        self.voice = voice
+        self.index = -1
+        self.position = 0  # Samples into the current note
+        self.length = 0
+        self.phase = 0.0  # Oscillator phase in cycles
+
+
+class Sequencer:
+    def __init__(self, track, bpm=None, chunk_ms=CHUNK_MS):
+        self.track = track
+        self.bpm = bpm or track.bpm
+        self.chunk_ms = chunk_ms
+        self.channel = None
+        self.thread = None
+        self.running = False
+        self.rate = 0
+        self.states = []
+
+        self.chunks = 0
+        self.underruns = 0
+        self.render_time = 0.0
+        self.max_render_time = 0.0
+
+    def set_tempo(self, bpm):
+        # Takes effect from the next note of each voice
+        self.bpm = bpm
+
+    def start(self, channel):
+        if self.running or not pygame.mixer.get_init():
+            return
+        self.channel = channel
+        self.rate = pygame.mixer.get_init()[0]
+        if not self.states:
+            self.states = [VoiceState(voice) for voice in self.track.voices]
+        self.running = True
+        self.thread = threading.Thread(target=self._produce, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # Pauses the track, start() carries on where it stopped
+        if not self.running:
+            return
+        self.running = False
+        self.thread.join()
+        self.thread = None
+        if pygame.mixer.get_init():
+            self.channel.stop()
+
+    def _produce(self):
+        chunk = int(self.rate * self.chunk_ms / 1000)
+        poll = self.chunk_ms / 4000
+        ahead = self.render(chunk)
+        try:
+            self.channel.play(ahead)
+            ahead = self.render(chunk)
+            while self.running:
+                if self.channel.get_queue() is not None:
+                    time.sleep(poll)
+                    continue
+                if self.channel.get_busy():
+                    self.channel.queue(ahead)
+                else:
+                    # Ran dry, a gap was heard
+                    self.underruns += 1
+                    self.channel.play(ahead)
+                ahead = self.render(chunk)
+        except pygame.error:
+            self.running = False  # The mixer was closed under us
+
+    def render(self, count):
+        start = time.perf_counter()
+        voices = [self._render_voice(state, count) for state in self.states]
+        if numpy is not None:
+            mixed = sum(voices[1:], voices[0])
+        elif len(voices) == 1:
+            mixed = voices[0]
+        else:
+            # Voice amplitudes are kept low enough that the sum never clips
+            mixed = array('h', map(sum, zip(*voices)))
+        sound = to_sound(mixed, self.rate)
+
+        elapsed = time.perf_counter() - start
+        self.chunks += 1
+        self.render_time += elapsed
+        self.max_render_time = max(self.max_render_time, elapsed)
+        return sound
+
+    def _render_voice(self, state, count):
+        voice = state.voice
+        parts = []
+        filled = 0
+        while filled < count:
+            if state.position >= state.length:
+                state.index = (state.index + 1) % len(voice.notes)
+                state.position = 0
+                beats = voice.notes[state.index][1]
+                state.length = max(1, int(beats * 60 / self.bpm * self.rate))
+            frequency = voice.notes[state.index][0]
+            take = min(count - filled, state.length - state.position)
+            if frequency is None:
+                parts.append(silence(take))
+            else:
+                samples = oscillator(frequency, take, voice.amplitude, voice.wave, state.phase, self.rate)
+                self._shape(samples, state.position, state.length)
+                state.phase = (state.phase + frequency * take / self.rate) % 1
+                parts.append(samples)
+            state.position += take
+            filled += take
+        return concat(parts)
+
+    def _shape(self, samples, position, length):
+        # Fade in the start and out the end of a note, only those samples are touched
+        attack = int(self.rate * ATTACK_MS / 1000)
+        release = min(int(self.rate * RELEASE_MS / 1000), length // 2)
+        count = len(samples)
+        for i in range(max(0, min(count, attack - position))):
+            samples[i] = int(samples[i] * (position + i) / attack)
+        for i in range(max(0, length - release - position), count):
+            samples[i] = int(samples[i] * (length - position - i) / release)
+
+    def stats(self):
+        audio_time = self.chunks * self.chunk_ms / 1000
+        return {
+            "chunks": self.chunks,
+            "underruns": self.underruns,
+            "avg_render_ms": self.render_time * 1000 / self.chunks if self.chunks else 0.0,
+            "max_render_ms": self.max_render_time * 1000,
+            "cpu_load": self.render_time / audio_time if audio_time else 0.0,
+        }
@@ -0,0 +1,99 @@
+"""Adaptive frame pacing.
+
+Loops take their events from ``pacer.get_events()``, call
+``pacer.handle_event(event)`` for every event and ``pacer.tick(static)``
+in place of ``clock.tick(fps)``. With pacing on:
+
+- a static scene sleeps in ``pygame.event.wait`` until input arrives or
+  ``idle_fps`` is due, so a menu nobody touches costs almost nothing (the
+  event that woke it comes first from the next ``get_events()``);
+- an unfocused or minimized window runs at ``unfocused_fps``;
+- any input snaps the loop back to the full rate for ``wake_ms``.
+
+Set AIO_GAMES_PACING=0 to always run at the full rate.
+"""
+import os
+import time
+
+import pygame
+
+INPUT_EVENTS = {pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION, pygame.MOUSEWHEEL,
+                pygame.TEXTINPUT}
+PACING_ENABLED = os.environ.get("AIO_GAMES_PACING", "1") != "0"
+
+
+class FramePacer:
+    def __init__(self, clock, fps, idle_fps=4, unfocused_fps=10, wake_ms=500, enabled=None):
+        self.clock = clock
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.unfocused_fps = unfocused_fps
+        self.wake_ms = wake_ms
+        self.enabled = PACING_ENABLED if enabled is None else enabled
+        self.focused = True
+        self.last_input = self.now_ms()
+        self.woken_by = None  # The event wait() returned, not handled yet
+
+        # Wakeups and CPU time over the last completed second
+        self.wakeups_per_second = 0.0
+        self.cpu_percent = 0.0
+        self._window_start = time.perf_counter()
+        self._window_cpu = time.process_time()
+        self._window_wakeups = 0
+
+    def now_ms(self):
+        # pygame.time.get_ticks() stays at 0 unless pygame.init() ran, and
+        # the launcher only initializes the display and font modules
+        return time.perf_counter() * 1000
+
+    def handle_event(self, event):
+        if event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED):
+            self.focused = False
+        elif event.type in (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED):
+            self.focused = True
+            self.last_input = self.now_ms()
+        elif event.type in INPUT_EVENTS:
+            self.last_input = self.now_ms()
+
+    def tick(self, static=False):
+        if not self.enabled:
+            dt = self.clock.tick(self.fps)
+        elif self.now_ms() - self.last_input < self.wake_ms:
+            dt = self.clock.tick(self.fps)
+        elif not self.focused:
+            self.woken_by = self.wait(1000 // self.unfocused_fps)
+            dt = self.clock.tick()
+        elif static:
+            self.woken_by = self.wait(1000 // self.idle_fps)
+            dt = self.clock.tick()
+        else:
+            dt = self.clock.tick(self.fps)
+        self._count_wakeup()
+        return dt
+
+    def wait(self, timeout):
+        # Sleep until an event arrives and return it, None on timeout
+        event = pygame.event.wait(timeout)
+        return event if event.type != pygame.NOEVENT else None
+
+    def get_events(self):
+        # pygame.event.get(), led by the event that ended a wait(). Posting
+        # it back would put it behind anything queued since.
+        events = pygame.event.get()
+        if self.woken_by is not None:
+            events.insert(0, self.woken_by)
+            self.woken_by = None
+        return events
+
+    def _count_wakeup(self):
+        self._window_wakeups += 1
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            cpu = time.process_time()
+            self.wakeups_per_second = self._window_wakeups / elapsed
+            self.cpu_percent = (cpu - self._window_cpu) / elapsed * 100
+            self._window_start = now
+            self._window_cpu = cpu
+            self._window_wakeups = 0
@@ -0,0 +1,28 @@
+import os
+
+# The games package, bundled assets are found relative to it
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def package_path(*parts):
+    # Independent of the working directory main.py is started from
+    return os.path.join(PACKAGE_DIR, *parts)
+
+
+def cache_dir(*parts):
+    # Per-user cache for generated data, override with AIO_GAMES_CACHE
+    base = os.environ.get("AIO_GAMES_CACHE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "aio_games")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_dir(*parts):
+    # Per-user data worth keeping (scores), override with AIO_GAMES_DATA
+    base = os.environ.get("AIO_GAMES_DATA") or os.path.join(
+        os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+        "aio_games")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
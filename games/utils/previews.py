@@ -0,0 +1,96 @@
+"""Pre-rendered menu previews.
+
+Each game registers a generator that draws frame ``n`` of its preview loop
+onto a blank surface. The first time a preview is shown its loop is rendered
+once into a spritesheet (or loaded from the disk cache), after which the
+menu only blits one frame of the sheet per draw.
+"""
+import os
+
+import pygame
+
+from games.registry import get_game
+
+PREVIEW_SIZE = (120, 120)
+SHEET_COLUMNS = 8
+
+PREVIEWS = {}
+
+
+class PreviewGenerator:
+    def __init__(self, name, draw_frame, frames, hold=1, version=1):
+        self.name = name
+        self.draw_frame = draw_frame
+        self.frames = frames
+        self.hold = hold  # Menu frames each sheet frame stays on screen
+        self.version = version  # Bump to invalidate cached sheets
+
+    def cache_name(self, size):
+        slug = "".join(c if c.isalnum() else "_" for c in self.name.lower())
+        return f"{slug}-v{self.version}-{size[0]}x{size[1]}-{self.frames}.png"
+
+
+def register_preview(name, frames, hold=1, version=1):
+    def decorator(draw_frame):
+        PREVIEWS[name] = PreviewGenerator(name, draw_frame, frames, hold, version)
+        return draw_frame
+    return decorator
+
+
+def get_preview(name):
+    if name not in PREVIEWS:
+        # Preview modules register themselves when imported
+        game = get_game(name)
+        if game is not None:
+            game.load_preview()
+    return PREVIEWS.get(name)
+
+
+class PreviewSheet:
+    def __init__(self, generator, size=PREVIEW_SIZE, cache_dir=None):
+        self.generator = generator
+        self.size = size
+        columns = min(SHEET_COLUMNS, generator.frames)
+        rows = (generator.frames + columns - 1) // columns
+        self.rects = [pygame.Rect((i % columns) * size[0], (i // columns) * size[1], *size)
+                      for i in range(generator.frames)]
+        self.loop_length = generator.frames * generator.hold
+
+        path = os.path.join(cache_dir, generator.cache_name(size)) if cache_dir else None
+        self.surface = self.load(path, (columns * size[0], rows * size[1]))
+        if self.surface is None:
+            self.surface = self.render((columns * size[0], rows * size[1]))
+            self.save(path)
+
+    def load(self, path, sheet_size):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            surface = pygame.image.load(path)
+        except pygame.error:
+            return None
+        if surface.get_size() != sheet_size:
+            return None
+        return surface.convert() if pygame.display.get_surface() else surface
+
+    def save(self, path):
+        if not path:
+            return
+        try:
+            pygame.image.save(self.surface, path)
+        except (pygame.error, OSError):
+            pass  # The cache is optional, render again next time
+
+    def render(self, sheet_size):
+        sheet = pygame.Surface(sheet_size)
+        frame = pygame.Surface(self.size)
+        for i, rect in enumerate(self.rects):
+            frame.fill((0, 0, 0))
+            self.generator.draw_frame(frame, i)
+            # Draw preview border
+            pygame.draw.rect(frame, (128, 128, 128), (0, 0, *self.size), 1)
+            sheet.blit(frame, rect)
+        return sheet
+
+    def frame_rect(self, counter):
+        return self.rects[(counter % self.loop_length) // self.generator.hold]
@@ -0,0 +1,73 @@
+import threading
+import time
+
+
+class Prewarmer:
+    # Builds the selected game on a background thread while the menu runs.
+    # One worker builds one game at a time, always the latest selected, so
+    # scrolling through the menu never has several builds in flight.
+    # Scenes never touch the window in __init__, the scene manager hands
+    # them its screen on the main thread when they are pushed.
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.game = None  # GameInfo selected, built or waiting for the worker
+        self.instance = None
+        self.error = None
+        self.ready = False
+        self.thread = None  # The worker, started with the first request
+        self.generation = 0
+        self.build_time = 0.0
+
+    def start(self, game):
+        with self.lock:
+            if self.game is game:
+                return  # Already building or ready
+            self.generation += 1
+            self.game = game
+            self.instance = None
+            self.error = None
+            self.ready = False
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+                self.thread.start()
+            self.lock.notify_all()
+
+    def _run(self):
+        built = 0  # Generation of the last build started
+        while True:
+            with self.lock:
+                while self.game is None or self.generation == built:
+                    self.lock.wait()
+                game, built = self.game, self.generation
+            self._build(game, built)
+
+    def _build(self, game, generation):
+        start = time.perf_counter()
+        instance, error = None, None
+        try:
+            instance = game.load()()
+        except Exception as e:
+            error = e
+        with self.lock:
+            if generation != self.generation:
+                return  # Selection changed meanwhile
+            self.instance = instance
+            self.error = error
+            self.ready = True
+            self.build_time = time.perf_counter() - start
+            self.lock.notify_all()
+
+    def take(self, game):
+        # Hand over the prepared instance, waiting for the build if needed
+        self.start(game)
+        with self.lock:
+            while not self.ready:
+                self.lock.wait()
+            instance, error = self.instance, self.error
+            self.game = None
+            self.instance = None
+            self.error = None
+            self.ready = False
+        if error is not None:
+            raise error
+        return instance
@@ -0,0 +1,158 @@
+"""Frame profiler overlay shared by the launcher and every game loop.
+
+A loop calls ``start_frame()`` first, ``mark(phase)`` after each of the
+event, update, draw and flip phases, and ``draw(screen)`` just before
+flipping. While hidden that costs a few ``perf_counter`` calls and array
+stores per frame; the overlay itself is only drawn when shown with F3.
+F4 writes the captured frame times to a CSV file for bug reports.
+"""
+import os
+import time
+from array import array
+
+import pygame
+
+from games.utils.assets import get_assets
+from games.utils.paths import cache_dir
+
+PHASES = ("events", "update", "draw", "flip")
+PHASE_COLORS = [(0, 150, 255), (0, 255, 0), (255, 200, 0), (255, 0, 255)]
+TOGGLE_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+
+
+class FrameProfiler:
+    def __init__(self, target_fps=60, history=1200):
+        self.budget_ms = 1000 / target_fps
+        self.history = history
+        self.visible = False
+
+        # Ring buffers: frame-to-frame interval and time spent in each phase
+        self.intervals = array('f', [0]) * history
+        self.phases = [array('f', [0]) * history for _ in PHASES]
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self.over_budget = 0
+
+        self._frame_start = None
+        self._last_mark = 0.0
+        self._current = [0.0] * len(PHASES)
+        self._phase_index = {name: i for i, name in enumerate(PHASES)}
+
+        # Overlay resources, created when first shown
+        self.panel = None
+        self.font = None
+        self.labels = []
+
+    def start_frame(self):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._record((now - self._frame_start) * 1000)
+        self._frame_start = now
+        self._last_mark = now
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self._current[self._phase_index[phase]] += (now - self._last_mark) * 1000
+        self._last_mark = now
+
+    def _record(self, interval):
+        i = self.index
+        self.intervals[i] = interval
+        work = 0.0
+        for phase, value in enumerate(self._current):
+            self.phases[phase][i] = value
+            work += value
+            self._current[phase] = 0.0
+        if work > self.budget_ms:
+            self.over_budget += 1
+        self.frames += 1
+        self.index = (i + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+
+    def handle_event(self, event):
+        # Returns True when the event was a profiler hotkey
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == TOGGLE_KEY:
+            self.visible = not self.visible
+            return True
+        if event.key == DUMP_KEY:
+            print(f"Frame times written to {self.dump_csv()}")
+            return True
+        return False
+
+    def ordered(self, values):
+        # Oldest to newest
+        if self.count < self.history:
+            return values[:self.count]
+        return values[self.index:] + values[:self.index]
+
+    def low_fps(self, fraction):
+        # Average FPS over the slowest fraction of captured frames
+        if not self.count:
+            return 0.0
+        worst = sorted(self.ordered(self.intervals), reverse=True)
+        worst = worst[:max(1, int(len(worst) * fraction))]
+        average = sum(worst) / len(worst)
+        return 1000 / average if average else 0.0
+
+    def dump_csv(self, path=None):
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(cache_dir("profiles"), f"frames-{stamp}.csv")
+        columns = [self.ordered(self.intervals)] + [self.ordered(p) for p in self.phases]
+        with open(path, "w") as f:
+            f.write("frame,interval_ms," + ",".join(f"{p}_ms" for p in PHASES) + "\n")
+            first = self.frames - self.count
+            for row, values in enumerate(zip(*columns)):
+                f.write(f"{first + row}," + ",".join(f"{v:.3f}" for v in values) + "\n")
+        return path
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        if self.panel is None:
+            self.panel = pygame.Surface((260, 184))
+            self.panel.set_alpha(200)
+            self.font = get_assets().font(None, 20)
+
+        # Refresh the text a few times per second, not every frame
+        if self.frames % 15 == 0 or not self.labels:
+            self.labels = [self.font.render(text, True, color) for text, color in self.summary()]
+
+        self.panel.fill((0, 0, 0))
+        for i, label in enumerate(self.labels):
+            self.panel.blit(label, (8, 6 + i * 16))
+        self.draw_graph(pygame.Rect(8, 122, 244, 54))
+        return surface.blit(self.panel, (surface.get_width() - 270, 10))
+
+    def summary(self):
+        last = (self.index - 1) % self.history
+        white = (255, 255, 255)
+        lines = [(f"frame {self.intervals[last]:5.1f} ms   budget {self.budget_ms:.1f} ms", white)]
+        for phase, name in enumerate(PHASES):
+            lines.append((f"{name:<7} {self.phases[phase][last]:5.2f} ms", PHASE_COLORS[phase]))
+        lines.append((f"1% low {self.low_fps(0.01):.1f} fps   0.1% low {self.low_fps(0.001):.1f} fps", white))
+        over = (255, 80, 80) if self.over_budget else white
+        lines.append((f"frames over budget: {self.over_budget}", over))
+        return lines
+
+    def draw_graph(self, rect):
+        # One stacked column per recent frame, scaled so the budget is half height
+        pygame.draw.rect(self.panel, (40, 40, 40), rect)
+        scale = rect.height / (self.budget_ms * 2)
+        budget_y = rect.bottom - int(self.budget_ms * scale)
+        pygame.draw.line(self.panel, (255, 80, 80), (rect.left, budget_y), (rect.right - 1, budget_y))
+        columns = min(rect.width, self.count)
+        for x in range(columns):
+            i = (self.index - columns + x) % self.history
+            y = rect.bottom
+            for phase in range(len(PHASES)):
+                height = int(self.phases[phase][i] * scale)
+                if height:
+                    top = max(rect.top, y - height)
+                    pygame.draw.line(self.panel, PHASE_COLORS[phase],
+                                     (rect.left + x, y - 1), (rect.left + x, top))
+                    y = top
@@ -0,0 +1,385 @@
+"""Rendering backends.
+
+The default backend is the classic one: ``set_mode`` and ``display.flip``,
+with scenes drawing onto the window surface. The opt-in ``sdl2`` backend
+draws with ``pygame._sdl2.video.Renderer`` instead. It asks for an
+accelerated renderer and falls back to SDL's software renderer, which also
+works headless; ``sdl2-software`` skips the accelerated attempt.
+
+Scenes that set ``USES_CANVAS`` draw through ``self.canvas``: fills, rects,
+lines, text and blits. On the Renderer backend, blits with a ``key``
+(sprites, preview sheets) and text are uploaded once as textures and then
+only copied. Other scenes keep drawing onto ``self.screen``, an offscreen
+surface uploaded as one texture per frame.
+
+A canvas accepts the ``blit``/``get_size`` calls that transitions and the
+frame profiler make on a surface, so they draw on either backend.
+Select the backend with AIO_GAMES_RENDERER or ``--renderer``.
+
+Scenes always draw at their logical size (800x600, Tetris 500x600 centered
+in it). With a scale mode the window can be resized or made fullscreen
+(F11), and the frame is scaled to fit it with black bars around: ``sdl``
+opens the window with ``pygame.SCALED`` and leaves the scaling to SDL,
+``software`` draws into an offscreen surface that ``transform.scale``
+copies into a persistent subsurface of the window every frame. Scaled
+edges don't line up with dirty rectangles, so ``software`` presents whole
+frames. The Renderer backend scales with the renderer's logical size
+whichever mode is asked for. Select with AIO_GAMES_SCALE or ``--scale``.
+"""
+import os
+from collections import OrderedDict
+
+import pygame
+
+from games.utils.text import render_text
+
+DEFAULT_RENDERER = os.environ.get("AIO_GAMES_RENDERER", "surface")
+RENDERERS = ("surface", "sdl2", "sdl2-software")
+DEFAULT_SCALE = os.environ.get("AIO_GAMES_SCALE", "none")
+SCALE_MODES = ("none", "sdl", "software")
+MAX_TEXTURES = 512
+
+BLENDMODE_NONE = 0
+BLENDMODE_BLEND = 1
+BLENDMODE_ADD = 2
+
+
+def _anchored(size, dest, anchor):
+    rect = pygame.Rect((0, 0), size)
+    setattr(rect, anchor, dest)
+    return rect
+
+
+class SurfaceCanvas:
+    # Draws straight onto a surface, keys are not needed
+    def __init__(self, surface):
+        self.surface = surface
+
+    def get_size(self):
+        return self.surface.get_size()
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    def fill(self, color, rect=None):
+        self.surface.fill(color, rect)
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.surface, color, rect, width)
+
+    def line(self, color, start, end):
+        pygame.draw.line(self.surface, color, start, end)
+
+    def blit(self, source, dest, area=None, key=None, additive=False):
+        flags = pygame.BLEND_RGB_ADD if additive else 0
+        return self.surface.blit(source, dest, area, flags)
+
+    def text(self, font, string, color, dest, anchor="topleft"):
+        label = render_text(font, string, color)
+        rect = _anchored(label.get_size(), dest, anchor)
+        self.surface.blit(label, rect)
+        return rect
+
+    def draw_surface(self, surface):
+        # Show a whole-scene surface, which here is usually the target itself
+        if surface is not self.surface:
+            self.surface.blit(surface, (0, 0))
+
+
+class TextureCanvas:
+    # Draws with the Renderer at an offset into the window
+    def __init__(self, backend, rect):
+        self.backend = backend
+        self.renderer = backend.renderer
+        self.offset = rect.topleft
+        self.size = rect.size
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def _move(self, rect):
+        return pygame.Rect(rect).move(self.offset)
+
+    def _color(self, color):
+        color = pygame.Color(color)
+        self.renderer.draw_blend_mode = BLENDMODE_BLEND if color.a < 255 else BLENDMODE_NONE
+        self.renderer.draw_color = color
+
+    def fill(self, color, rect=None):
+        self._color(color)
+        self.renderer.fill_rect(self._move(rect or ((0, 0), self.size)))
+
+    def rect(self, color, rect, width=0):
+        self._color(color)
+        rect = self._move(rect)
+        if width <= 0:
+            self.renderer.fill_rect(rect)
+            return
+        for _ in range(width):
+            self.renderer.draw_rect(rect)
+            rect.inflate_ip(-2, -2)
+
+    def line(self, color, start, end):
+        self._color(color)
+        ox, oy = self.offset
+        self.renderer.draw_line((start[0] + ox, start[1] + oy), (end[0] + ox, end[1] + oy))
+
+    def blit(self, source, dest, area=None, key=None, additive=False):
+        if key is not None:
+            texture = self.backend.texture(key, source)
+        else:
+            # Changes every frame, upload it as it is now
+            texture = self.backend.upload(source)
+        alpha = source.get_alpha()
+        if additive:
+            texture.blend_mode = BLENDMODE_ADD
+        elif alpha is not None or source.get_colorkey() or source.get_flags() & pygame.SRCALPHA:
+            texture.blend_mode = BLENDMODE_BLEND
+        else:
+            # Opaque copies are much cheaper for the software renderer
+            texture.blend_mode = BLENDMODE_NONE
+        texture.alpha = 255 if alpha is None else alpha
+        area = pygame.Rect(area) if area else pygame.Rect((0, 0), source.get_size())
+        if len(dest) == 2:
+            dest = (dest[0], dest[1], area.width, area.height)
+        rect = self._move(dest)
+        texture.draw(srcrect=area, dstrect=rect)
+        return rect
+
+    def text(self, font, string, color, dest, anchor="topleft"):
+        texture, size = self.backend.text(font, string, color)
+        rect = _anchored(size, dest, anchor)
+        texture.draw(dstrect=self._move(rect))
+        return rect
+
+    def draw_surface(self, surface):
+        self.blit(surface, (0, 0))
+
+
+def fit(size, area):
+    # The largest rect of size's aspect ratio centered in area
+    factor = min(area[0] / size[0], area[1] / size[1])
+    rect = pygame.Rect(0, 0, max(1, int(size[0] * factor)), max(1, int(size[1] * factor)))
+    rect.center = (area[0] // 2, area[1] // 2)
+    return rect
+
+
+class SurfaceBackend:
+    name = "surface"
+
+    def __init__(self, size, scale="none", window=None, fullscreen=False):
+        self.size = size
+        self.scale = scale
+        self.window_size = window or size  # Restored when leaving fullscreen
+        self.fullscreen = False
+        self.viewport = pygame.Rect((0, 0), size)  # The frame's place in the window
+        self.target = None  # Window subsurface the frame is scaled into
+        self.target_window = None  # Window size the target was made for
+        if scale == "sdl":
+            self.screen = pygame.display.set_mode(size, pygame.SCALED | pygame.RESIZABLE)
+        elif scale == "software":
+            self.open_window()
+            self.screen = pygame.Surface(size).convert()
+        else:
+            self.screen = pygame.display.set_mode(size)
+        if fullscreen:
+            self.toggle_fullscreen()
+        self.canvas = SurfaceCanvas(self.screen)
+
+    def open_window(self):
+        if self.fullscreen:
+            pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+        self.target = None
+
+    def toggle_fullscreen(self):
+        # False when the window can't be scaled
+        if self.scale == "none":
+            return False
+        if self.scale == "sdl":
+            try:
+                pygame.display.toggle_fullscreen()
+            except pygame.error:
+                return False  # Not every video driver can, e.g. headless
+            self.fullscreen = not self.fullscreen
+        else:
+            self.fullscreen = not self.fullscreen
+            self.open_window()
+        return True
+
+    def logical_pos(self, pos):
+        # Window coordinates to the frame's, for mouse events
+        if self.scale != "software":
+            return pos  # SDL maps them itself with SCALED
+        x = (pos[0] - self.viewport.x) * self.size[0] // self.viewport.width
+        y = (pos[1] - self.viewport.y) * self.size[1] // self.viewport.height
+        return (x, y)
+
+    def surface_for(self, rect):
+        if rect.size == self.screen.get_size():
+            return self.screen
+        return self.screen.subsurface(rect)
+
+    def canvas_for(self, rect, surface):
+        if surface is self.screen:
+            return self.canvas
+        return SurfaceCanvas(surface)
+
+    def set_caption(self, caption):
+        pygame.display.set_caption(caption)
+
+    def begin_frame(self):
+        pass
+
+    def scale_to_window(self):
+        window = pygame.display.get_surface()
+        if self.target is None or window.get_size() != self.target_window:
+            # Resized: a new viewport and subsurface, the bars cleared once
+            self.target_window = window.get_size()
+            if not self.fullscreen:
+                self.window_size = self.target_window
+            self.viewport = fit(self.size, self.target_window)
+            window.fill((0, 0, 0))
+            self.target = window.subsurface(self.viewport)
+        pygame.transform.scale(self.screen, self.viewport.size, self.target)
+
+    def present(self, rects=None):
+        # Just the rects that changed when the scene knows them, see compositor.py
+        if self.scale == "software":
+            self.scale_to_window()
+            pygame.display.flip()
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def capture(self):
+        # The frame on screen, e.g. for a transition
+        return self.screen
+
+
+class RendererBackend:
+    def __init__(self, size, accelerated=True, scale="none", window=None, fullscreen=False):
+        from pygame._sdl2 import error as SDLError
+        from pygame._sdl2.video import Renderer, Texture, Window
+
+        self.Texture = Texture
+        self.scaled = scale != "none"
+        self.fullscreen = False
+        self.window = Window("Python Arcade Collection", size=(window or size) if self.scaled else size,
+                             resizable=self.scaled)
+        self.renderer = None
+        self.name = "sdl2"
+        if accelerated:
+            try:
+                self.renderer = Renderer(self.window, accelerated=1, vsync=False)
+            except SDLError:
+                pass  # No GPU driver, e.g. headless CI
+        if self.renderer is None:
+            self.renderer = Renderer(self.window, accelerated=0, vsync=False)
+            self.name = "sdl2-software"
+        if self.scaled:
+            # SDL scales, letterboxes and maps mouse positions back
+            self.renderer.logical_size = size
+        # Scenes without a canvas draw here, it is uploaded once per frame
+        self.screen = pygame.Surface(size)
+        self.canvas = TextureCanvas(self, self.screen.get_rect())
+        self.textures = OrderedDict()  # Static uploads, least recently used first
+        self.uploads = 0
+        if fullscreen:
+            self.toggle_fullscreen()
+
+    def surface_for(self, rect):
+        if rect.size == self.screen.get_size():
+            return self.screen
+        return self.screen.subsurface(rect)
+
+    def canvas_for(self, rect, surface):
+        return TextureCanvas(self, rect)
+
+    def set_caption(self, caption):
+        self.window.title = caption
+
+    def toggle_fullscreen(self):
+        if not self.scaled:
+            return False
+        self.fullscreen = not self.fullscreen
+        if self.fullscreen:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+        return True
+
+    def logical_pos(self, pos):
+        return pos
+
+    def texture(self, key, surface):
+        texture = self.textures.get(key)
+        if texture is None:
+            texture = self.upload(surface)
+            self.textures[key] = texture
+            if len(self.textures) > MAX_TEXTURES:
+                self.textures.popitem(last=False)
+        else:
+            self.textures.move_to_end(key)
+        return texture
+
+    def text(self, font, string, color, antialias=True):
+        key = ("text", font, string, tuple(color))  # The font itself, an id can be reused
+        texture = self.textures.get(key)
+        if texture is None:
+            texture = self.texture(key, render_text(font, string, color, antialias))
+        else:
+            self.textures.move_to_end(key)
+        return texture, (texture.width, texture.height)
+
+    def upload(self, surface):
+        self.uploads += 1
+        return self.Texture.from_surface(self.renderer, surface)
+
+    def begin_frame(self):
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+
+    def present(self, rects=None):
+        # The renderer was cleared, the whole frame goes out
+        self.renderer.present()
+
+    def capture(self):
+        # Reads the frame back from the renderer, for transitions and video.
+        # Video reads it before present(), which leaves the backbuffer undefined.
+        if not self.scaled:
+            return self.renderer.to_surface()
+        # to_surface() crashes with a logical size set: read the whole
+        # window and scale the frame back down to the logical size
+        viewport = self.renderer.get_viewport()
+        scale_x, scale_y = self.renderer.scale
+        self.renderer.logical_size = (0, 0)
+        output = self.renderer.to_surface()
+        self.renderer.logical_size = self.screen.get_size()
+        area = pygame.Rect(round(viewport.x * scale_x), round(viewport.y * scale_y),
+                           round(viewport.width * scale_x), round(viewport.height * scale_y))
+        area = area.clip(output.get_rect())
+        return pygame.transform.smoothscale(output.subsurface(area), self.screen.get_size())
+
+
+def create_backend(name, size, scale=None, window=None, fullscreen=False):
+    name = name or DEFAULT_RENDERER
+    scale = scale or DEFAULT_SCALE
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {name}")
+    if scale not in SCALE_MODES:
+        raise ValueError(f"Unknown scale mode: {scale}")
+    if name == "surface":
+        return SurfaceBackend(size, scale, window, fullscreen)
+    return RendererBackend(size, name == "sdl2", scale, window, fullscreen)
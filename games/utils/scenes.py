@@ -0,0 +1,357 @@
+"""One window, one event pump, a stack of scenes.
+
+The launcher and every game are scenes. The top scene receives events and
+is updated and drawn each frame; pushing a game on top of the menu and
+popping it again never recreates the window. Scenes smaller than the
+window (Tetris) draw into a centered subsurface.
+
+Game logic reads its randomness from ``self.random``, seeded per scene, and
+its time from ``manager.ticks``, the milliseconds at the start of the
+frame, so a recorded session replays exactly (see replay.py). Games set
+``UPDATE_RATE`` to be updated at a fixed rate whatever the frame rate (see
+timestep.py); other scenes are updated once per frame. Scenes that set
+``self.compositor`` are presented a changed rectangle at a time rather
+than flipped (see compositor.py). Games with a ``GAME_ID`` call
+``start_round()`` and ``finish_round()`` around each round to store its
+score and session stats (see scores.py). Scenes draw at their own size whatever
+the window's, a scaled window (see render.py) maps mouse positions back to
+scene coordinates before they see them; F11 toggles fullscreen there.
+With ``video`` set, presented frames are also recorded (see capture.py).
+"""
+import random
+import time
+
+import pygame
+
+from games.utils.assets import get_assets
+from games.utils.pacing import FramePacer
+from games.utils.profiler import FrameProfiler
+from games.utils.render import SurfaceCanvas, create_backend
+from games.utils.scores import get_scores
+from games.utils.timestep import FixedTimestep
+
+
+class Scene:
+    WIDTH = 800
+    HEIGHT = 600
+    FPS = 60  # Frames drawn per second
+    UPDATE_RATE = None  # Fixed updates per second, None for one per frame
+    CAPTION = "Python Arcade Collection"
+    # Attributes that make up the game state, see snapshot()
+    SNAPSHOT_FIELDS = ()
+    # Draws through self.canvas rather than onto self.screen, see render.py
+    USES_CANVAS = False
+    GAME_ID = None  # Scores and session stats are stored under it
+
+    def __init__(self):
+        # Scenes load their fonts up front, possibly before any window exists
+        pygame.font.init()
+        self.manager = None
+        self.screen = None
+        self.canvas = None
+        self.first_frame_time = None
+        self.error = None  # Set when the scene crashed and was popped
+        # Per-session random numbers, drawn from the global generator so
+        # random.seed() still makes a whole run repeatable
+        self.seed = random.randrange(2 ** 32)
+        self.random = random.Random(self.seed)
+        self.timestep = FixedTimestep(self.UPDATE_RATE) if self.UPDATE_RATE else None
+        self.compositor = None  # Draws only what changed, see compositor.py
+        self.round_steps = 0
+        self.previous_best = None  # From before the last round, for game over screens
+        if self.GAME_ID:
+            get_scores().prefetch(self.GAME_ID)
+
+    def load_font(self, path, size):
+        # Shared with other scenes, held while this one exists (see assets.py)
+        return get_assets().font(path, size, owner=self)
+
+    def start_round(self):
+        # A new round begins, its duration counts fixed updates from here
+        self.round_steps = self.timestep.steps if self.timestep else 0
+
+    def finish_round(self, score, mode="", outcome=""):
+        # Game over: the score and session go to the store off-thread
+        scores = get_scores()
+        self.previous_best = scores.best(self.GAME_ID, mode)
+        if self.manager is not None and self.manager.replay is not None:
+            return  # Already stored when it was played
+        duration = 0.0
+        if self.timestep:
+            duration = (self.timestep.steps - self.round_steps) * self.timestep.step_ms / 1000
+        scores.add(self.GAME_ID, mode, score, duration, outcome)
+
+    def best_label(self, score, fmt="{}"):
+        # (text, beaten) for a game over screen, None before any best
+        previous = self.previous_best
+        if score > 0 and (previous is None or score > previous):
+            return "New personal best!", True
+        if previous is None:
+            return None
+        return "Personal best: " + fmt.format(previous), False
+
+    def enter(self, manager):
+        # Pushed onto the stack
+        self.manager = manager
+        self.screen, self.canvas = manager.targets_for(self.WIDTH, self.HEIGHT)
+        if self.timestep:
+            self.timestep.reset(manager.ticks)
+        if self.compositor:
+            self.compositor.attach(self.canvas)
+
+    def exit(self):
+        # Popped off the stack
+        pass
+
+    def pause(self):
+        # Another scene was pushed on top
+        pass
+
+    def resume(self):
+        # The scene on top was popped
+        self.screen, self.canvas = self.manager.targets_for(self.WIDTH, self.HEIGHT)
+        if self.timestep:
+            self.timestep.reset(self.manager.ticks)
+        if self.compositor:
+            self.compositor.attach(self.canvas)
+
+    @property
+    def alpha(self):
+        # How far this frame is between the last update and the next one
+        return self.timestep.alpha if self.timestep else 1.0
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self):
+        pass
+
+    def is_static(self):
+        # Static scenes let the pacer sleep until input arrives
+        return False
+
+    def snapshot(self):
+        # Plain data only (no surfaces or sounds) so it pickles small
+        return {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+
+    def restore(self, state):
+        # Fields an older snapshot lacks keep their fresh values
+        for name in self.SNAPSHOT_FIELDS:
+            if name in state:
+                setattr(self, name, state[name])
+
+    def run(self):
+        # Run this scene on its own, in a window of its size
+        manager = SceneManager(self.WIDTH, self.HEIGHT)
+        manager.push(self)
+        manager.run()
+
+
+class SceneManager:
+    def __init__(self, width=800, height=600, uncapped=False, renderer=None, fps=None, frame_ms=None,
+                 scale=None, window=None, fullscreen=False):
+        pygame.display.init()
+        pygame.font.init()
+        self.backend = create_backend(renderer, (width, height), scale, window, fullscreen)
+        self.screen = self.backend.screen
+        self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler()
+        # Uncapped runs as fast as possible, for profiling and benchmarks
+        self.uncapped = uncapped
+        self.fps = fps  # Overrides the scenes' frame rates
+        self.pacer = FramePacer(self.clock, 60, enabled=False if uncapped else None)
+        self.stack = []
+        self.running = False
+        self.frame = 0
+        self.start_time = time.perf_counter()
+        self.ticks = 0  # Milliseconds at the start of the frame
+        # Game time per frame instead of the wall clock, so uncapped runs
+        # (benchmarks, profiling) play the same game however fast they go
+        self.frame_ms = frame_ms
+        self.elapsed_ms = 0.0
+        self.recorder = None  # Records game input, see replay.py
+        self.replay = None  # Feeds recorded input instead of the keyboard
+        self.video = None  # Copies presented frames to an encoder, see capture.py
+        self.offscreen = None  # Reused by draw_offscreen()
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def targets_for(self, width, height):
+        # Surface and canvas for a scene, smaller scenes centered in the window
+        rect = pygame.Rect(0, 0, width, height)
+        rect.center = self.screen.get_rect().center
+        rect = rect.clip(self.screen.get_rect())
+        surface = self.backend.surface_for(rect)
+        return surface, self.backend.canvas_for(rect, surface)
+
+    def capture(self):
+        # The last presented frame
+        return self.backend.capture()
+
+    def draw_offscreen(self, scene):
+        # A frame of a scene not pushed yet, e.g. a transition's incoming
+        # screen. Its targets are handed back; enter() sets the real ones.
+        if self.offscreen is None or self.offscreen.get_size() != self.screen.get_size():
+            self.offscreen = pygame.Surface(self.screen.get_size())
+        self.offscreen.fill((0, 0, 0))
+        rect = pygame.Rect(0, 0, scene.WIDTH, scene.HEIGHT)
+        rect.center = self.offscreen.get_rect().center
+        rect = rect.clip(self.offscreen.get_rect())
+        screen, canvas = scene.screen, scene.canvas
+        scene.manager = self
+        scene.screen = self.offscreen.subsurface(rect)
+        scene.canvas = SurfaceCanvas(scene.screen)
+        if scene.compositor:
+            scene.compositor.attach(scene.canvas)
+        scene.draw()
+        if scene.compositor:
+            scene.compositor.render()
+        scene.screen, scene.canvas = screen, canvas
+        return self.offscreen
+
+    def mouse_pos(self):
+        # pygame.mouse.get_pos() in scene coordinates
+        return self.backend.logical_pos(pygame.mouse.get_pos())
+
+    def push(self, scene):
+        if self.stack:
+            self.stack[-1].pause()
+        self.stack.append(scene)
+        self.screen.fill((0, 0, 0))
+        scene.first_frame_time = None
+        if self.recorder is not None:
+            self.recorder.start(scene, self)
+        scene.enter(self)
+        self.activate(scene)
+
+    def pop(self):
+        scene = self.stack.pop()
+        if self.recorder is not None:
+            self.recorder.stop(scene)
+        scene.exit()
+        if self.stack:
+            # The popped scene's last frame is still on screen while resuming
+            self.stack[-1].resume()
+            self.screen.fill((0, 0, 0))
+            self.activate(self.stack[-1])
+        return scene
+
+    def activate(self, scene):
+        self.backend.set_caption(scene.CAPTION)
+        self.pacer.fps = 0 if self.uncapped else self.fps or scene.FPS
+        self.profiler.budget_ms = 1000 / (self.fps or scene.FPS)
+
+    def quit(self):
+        self.running = False
+
+    def toggle_fullscreen(self, event):
+        # F11, where the window can be scaled
+        if event.type != pygame.KEYDOWN or event.key != pygame.K_F11:
+            return False
+        return self.backend.toggle_fullscreen()
+
+    def fail(self, scene, error):
+        # A crashing game drops back to the scene below instead of taking
+        # the whole collection down
+        if len(self.stack) < 2 or scene is not self.top:
+            raise error
+        print(f"{scene.CAPTION} error: {error}")
+        scene.error = error
+        self.pop()
+
+    def run(self, max_frames=None, script=None):
+        # Stops after max_frames frames if given. script maps a frame number
+        # to events posted at the start of that frame, for scripted input.
+        self.running = True
+        self.frame = 0
+        while self.running and self.stack:
+            if max_frames is not None and self.frame >= max_frames:
+                break
+            self.frame += 1
+            if script:
+                for event in script.get(self.frame, ()):
+                    pygame.event.post(event)
+            self.profiler.start_frame()
+            events = self.pacer.get_events()
+            for event in events:
+                if hasattr(event, "pos"):
+                    event.pos = self.backend.logical_pos(event.pos)
+            if self.replay is not None:
+                frame = self.replay.next_frame()
+                if frame is None:
+                    self.frame -= 1
+                    break  # Played to the end
+                # Closing the window still works, input comes from the recording
+                self.ticks, replayed = frame
+                events = [e for e in events if e.type == pygame.QUIT] + replayed
+            elif self.frame_ms:
+                self.ticks = int(self.elapsed_ms)
+                self.elapsed_ms += self.frame_ms
+            else:
+                self.ticks = int((time.perf_counter() - self.start_time) * 1000)
+            if self.recorder is not None:
+                self.recorder.record(self.ticks, events)
+            for event in events:
+                if self.profiler.handle_event(event) or self.toggle_fullscreen(event):
+                    # The overlay or the window changed, also over the letterbox
+                    self.screen.fill((0, 0, 0))
+                    if self.top and self.top.compositor:
+                        self.top.compositor.invalidate()
+                    continue
+                self.pacer.handle_event(event)
+                if event.type == pygame.QUIT:
+                    self.quit()
+                elif self.stack:
+                    # Events keep going to whichever scene is on top
+                    scene = self.stack[-1]
+                    try:
+                        scene.handle_event(event)
+                    except Exception as e:
+                        self.fail(scene, e)
+            self.profiler.mark("events")
+            if not self.running or not self.stack:
+                break
+
+            scene = self.stack[-1]
+            try:
+                if scene.timestep is None:
+                    scene.update()
+                else:
+                    for _ in range(scene.timestep.advance(self.ticks)):
+                        scene.update()
+                        if scene is not self.top:
+                            break
+                self.profiler.mark("update")
+                if scene is not self.top:
+                    continue  # The scene switched itself during update
+                self.backend.begin_frame()
+                scene.draw()
+                rects = scene.compositor.render() if scene.compositor else None
+                if not scene.USES_CANVAS:
+                    scene.canvas.draw_surface(scene.screen)
+            except Exception as e:
+                self.fail(scene, e)
+                continue
+            self.profiler.mark("draw")
+            overlay = self.profiler.draw(self.backend.canvas)
+            if overlay and rects is not None:
+                rects.append(overlay)
+                scene.compositor.damage(overlay)
+            if self.video is not None:
+                # Before present(): the Renderer's backbuffer is undefined after it.
+                # In simulated time the game waits for the encoder, nothing is dropped
+                self.video.add(self.capture, self.ticks, wait=self.frame_ms is not None)
+            self.backend.present(rects)
+            self.profiler.mark("flip")
+            if scene.first_frame_time is None:
+                scene.first_frame_time = time.perf_counter()
+
+            static = scene.is_static()
+            if static and scene.timestep:
+                scene.timestep.hold()
+            self.pacer.tick(static)
@@ -0,0 +1,292 @@
+"""High scores and session stats, in SQLite.
+
+Games report a finished round with ``Scene.finish_round(score, mode)``;
+the score store keeps every score and a row of session stats (mode,
+duration, outcome) per round, per game. The database is in WAL mode and
+only a background writer thread touches the disk for writes: ``add()``
+just puts the row on a queue, and the writer inserts whatever has queued
+up within FLUSH_SECONDS in one transaction, at most BATCH_SIZE rows at a
+time. A round ending never waits for the disk.
+
+Personal bests are kept in memory. ``prefetch(game)`` has the writer read
+a game's bests once (the scenes do it when they are built), later scores
+update them as they are added, and ``best()`` only looks them up.
+
+Queries for tools and benchmarks run on the caller's thread: ``top()``
+reads the (game, mode, score) index, while ``percentile()``, ``score_at()``
+and ``session_stats()`` read count and total tables that the writer keeps
+up to date, so they cost as much as there are distinct scores or modes,
+not rows (benchmarks/bench_scores.py has the numbers for a million).
+
+The database is AIO_GAMES_SCORES, by default scores.db in the data
+directory (see paths.py); AIO_GAMES_SCORES=off keeps nothing, e.g. for
+benchmarks. ``flush()`` waits for the queued writes.
+"""
+import atexit
+import getpass
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from games.utils.paths import data_dir
+
+BATCH_SIZE = 1000
+FLUSH_SECONDS = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_rank ON scores (game, mode, score DESC);
+CREATE INDEX IF NOT EXISTS scores_player ON scores (game, player, mode, score DESC);
+CREATE TABLE IF NOT EXISTS score_counts (
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (game, mode, score)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    player TEXT NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    score INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_game ON sessions (game, mode, started);
+CREATE TABLE IF NOT EXISTS session_totals (
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    score_total INTEGER NOT NULL,
+    PRIMARY KEY (game, mode)
+) WITHOUT ROWID;
+"""
+
+
+def default_path():
+    path = os.environ.get("AIO_GAMES_SCORES")
+    if path == "off":
+        return None
+    return path or os.path.join(data_dir(), "scores.db")
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "player"  # No login name, e.g. in a container
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL makes NORMAL safe against corruption, only the last commits can be lost
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ScoreStore:
+    def __init__(self, path=None, player=None):
+        self.path = path  # None stores nothing
+        self.player = player or default_player()
+        self.lock = threading.Lock()
+        self.bests = {}  # (game, mode) -> best score of the player
+        self.loaded = set()  # Games whose bests were read
+        self.local = threading.local()  # Reader connection per thread
+        self.queue = queue.Queue()
+        self.thread = None
+        self.written = 0
+        self.batches = 0
+        self.write_ms = 0.0
+        if path is not None:
+            connection = connect(path)
+            connection.executescript(SCHEMA)
+            connection.close()
+            self.thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+            self.thread.start()
+
+    def add(self, game, mode, score, duration=0.0, outcome=""):
+        # A finished round: its score and session stats, written off-thread
+        now = time.time()
+        with self.lock:
+            key = (game, mode)
+            if key not in self.bests or score > self.bests[key]:
+                self.bests[key] = score
+        if self.thread is not None:
+            self.queue.put(("round", (game, mode, self.player, score, now, duration, outcome)))
+
+    def best(self, game, mode=""):
+        # The player's best, None before any score (or before the prefetch)
+        with self.lock:
+            return self.bests.get((game, mode))
+
+    def prefetch(self, game):
+        # Reads the game's bests on the writer thread
+        with self.lock:
+            if game in self.loaded:
+                return
+            self.loaded.add(game)
+        if self.thread is not None:
+            self.queue.put(("call", lambda connection: self._load_bests(connection, game)))
+
+    def _load_bests(self, connection, game):
+        # One index lookup per mode, GROUP BY would read every score
+        modes = connection.execute("SELECT mode FROM session_totals WHERE game = ?", (game,)).fetchall()
+        for (mode,) in modes:
+            score = connection.execute(
+                "SELECT MAX(score) FROM scores WHERE game = ? AND player = ? AND mode = ?",
+                (game, self.player, mode)).fetchone()[0]
+            with self.lock:
+                key = (game, mode)
+                if score is not None and (key not in self.bests or score > self.bests[key]):
+                    self.bests[key] = score
+
+    def _run(self):
+        connection = connect(self.path)
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            # Whatever else arrives meanwhile goes into the same transaction
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while len(batch) < BATCH_SIZE and batch[-1][0] != "stop":
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(connection, batch)
+            except sqlite3.Error as e:
+                print(f"Scores not saved: {e}")
+            running = batch[-1][0] != "stop"
+            for _ in batch:
+                self.queue.task_done()
+        connection.close()
+
+    def _write(self, connection, batch):
+        start = time.perf_counter()
+        rounds = [item[1] for item in batch if item[0] == "round"]
+        if rounds:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO scores (game, mode, player, score, created) VALUES (?, ?, ?, ?, ?)",
+                    [row[:5] for row in rounds])
+                connection.executemany(
+                    "INSERT INTO score_counts (game, mode, score, count) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT (game, mode, score) DO UPDATE SET count = count + 1",
+                    [row[:2] + row[3:4] for row in rounds])
+                connection.executemany(
+                    "INSERT INTO sessions (game, mode, player, score, started, duration, outcome) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [row[:4] + (row[4] - row[5],) + row[5:] for row in rounds])
+                connection.executemany(
+                    "INSERT INTO session_totals (game, mode, rounds, duration, score_total) "
+                    "VALUES (?, ?, 1, ?, ?) ON CONFLICT (game, mode) DO UPDATE SET "
+                    "rounds = rounds + 1, duration = duration + excluded.duration, "
+                    "score_total = score_total + excluded.score_total",
+                    [row[:2] + (row[5], row[3]) for row in rounds])
+            self.written += len(rounds)
+            self.batches += 1
+        for item in batch:
+            if item[0] == "call":
+                item[1](connection)
+        self.write_ms += (time.perf_counter() - start) * 1000
+
+    def flush(self):
+        # Waits until everything queued so far is on disk
+        self.queue.join()
+
+    def close(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(("stop", None))
+            self.thread.join()
+
+    def _reader(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = connect(self.path)
+        return connection
+
+    def top(self, game, mode="", n=10):
+        # [(score, player, created)], best first
+        if self.path is None:
+            return []
+        return self._reader().execute(
+            "SELECT score, player, created FROM scores WHERE game = ? AND mode = ? "
+            "ORDER BY score DESC LIMIT ?", (game, mode, n)).fetchall()
+
+    def percentile(self, game, mode, score):
+        # Share of the stored scores below score, 0.0 to 1.0
+        if self.path is None:
+            return 0.0
+        below, total = self._reader().execute(
+            "SELECT TOTAL(CASE WHEN score < ? THEN count END), TOTAL(count) FROM score_counts "
+            "WHERE game = ? AND mode = ?", (score, game, mode)).fetchone()
+        return below / total if total else 0.0
+
+    def score_at(self, game, mode, fraction):
+        # The lowest score that fraction of the stored scores are at or below, e.g. 0.5 for the median
+        if self.path is None:
+            return None
+        rows = self._reader().execute(
+            "SELECT score, count FROM score_counts WHERE game = ? AND mode = ? ORDER BY score",
+            (game, mode)).fetchall()
+        total = sum(count for _, count in rows)
+        seen = 0
+        for score, count in rows:
+            seen += count
+            if seen >= fraction * total:
+                return score
+        return None
+
+    def session_stats(self, game, mode=None):
+        # Rounds played, total and average duration in seconds, average score
+        if self.path is None:
+            return {"rounds": 0, "duration": 0.0, "avg_duration": 0.0, "avg_score": 0.0}
+        query = "SELECT TOTAL(rounds), TOTAL(duration), TOTAL(score_total) FROM session_totals WHERE game = ?"
+        args = (game,)
+        if mode is not None:
+            query += " AND mode = ?"
+            args += (mode,)
+        rounds, duration, score_total = self._reader().execute(query, args).fetchone()
+        rounds = int(rounds)
+        return {"rounds": rounds, "duration": duration,
+                "avg_duration": duration / rounds if rounds else 0.0,
+                "avg_score": score_total / rounds if rounds else 0.0}
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch": self.written / self.batches if self.batches else 0.0,
+            "write_ms": self.write_ms,
+            "queued": self.queue.qsize(),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()  # Scenes are also built on the prewarm thread
+
+
+def get_scores():
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ScoreStore(default_path())
+            except (sqlite3.Error, OSError) as e:
+                print(f"Scores won't be saved: {e}")
+                _store = ScoreStore(None)
+            atexit.register(_store.close)  # Queued scores still reach the disk
+    return _store
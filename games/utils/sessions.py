@@ -0,0 +1,144 @@
+"""Suspended game sessions.
+
+Leaving a game with ESC suspends it instead of throwing it away. The
+launcher keeps the most recently played sessions in memory, so picking the
+game again resumes the exact same instance at once. The cache is bounded
+by a session count and a rough memory cap (surfaces and sounds owned by
+the scene); the least recently used session is evicted first.
+
+An evicted session is not lost: its ``snapshot()`` is pickled and
+compressed to disk, and the next time the game is picked a fresh instance
+is built and ``restore()``d from it. Set AIO_GAMES_SESSION_MB to change the
+memory cap.
+"""
+import os
+import pickle
+import zlib
+from collections import OrderedDict
+
+import pygame
+
+MAX_SESSIONS = 3
+MAX_BYTES = int(float(os.environ.get("AIO_GAMES_SESSION_MB", "48")) * 1024 * 1024)
+
+
+def estimate_size(obj, depth=2, seen=None):
+    # Bytes held by the surfaces and sounds an object owns, a few levels deep
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pygame.Surface):
+        if obj.get_parent() is not None:
+            return 0  # A view into the window, owned by the scene manager
+        return obj.get_width() * obj.get_height() * obj.get_bytesize()
+    if isinstance(obj, pygame.mixer.Sound):
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, size, channels = mixer
+        return int(obj.get_length() * frequency * channels * abs(size) // 8)
+    if depth == 0:
+        return 0
+    if isinstance(obj, dict):
+        values = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        values = obj
+    elif hasattr(obj, "__dict__"):
+        values = vars(obj).values()
+    else:
+        return 0
+    return sum(estimate_size(value, depth - 1, seen) for value in values)
+
+
+class SessionCache:
+    def __init__(self, cache_dir=None, max_sessions=MAX_SESSIONS, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sessions = OrderedDict()  # name -> (scene, size), oldest first
+        self.bytes = 0
+        self.evictions = 0
+
+    def __contains__(self, name):
+        return name in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def has_saved(self, name):
+        # In memory or on disk
+        return name in self.sessions or os.path.exists(self.path(name) or "")
+
+    def path(self, name):
+        if not self.cache_dir:
+            return None
+        slug = "".join(c if c.isalnum() else "_" for c in name.lower())
+        return os.path.join(self.cache_dir, f"{slug}.session")
+
+    def put(self, name, scene):
+        self.discard(name)
+        size = estimate_size(scene)
+        self.sessions[name] = (scene, size)
+        self.bytes += size
+        # Always keep the session just suspended, even if it alone is over the cap
+        while len(self.sessions) > 1 and (len(self.sessions) > self.max_sessions
+                                          or self.bytes > self.max_bytes):
+            self.evict()
+
+    def take(self, name):
+        # Hand back a suspended scene, or None
+        if name not in self.sessions:
+            return None
+        scene, size = self.sessions.pop(name)
+        self.bytes -= size
+        return scene
+
+    def evict(self, name=None):
+        # Move a session (the least recently used by default) from memory to disk
+        if not self.sessions:
+            return
+        if name is None:
+            name = next(iter(self.sessions))
+        scene = self.take(name)
+        if scene is None:
+            return
+        self.evictions += 1
+        self.save(name, scene.snapshot())
+
+    def clear(self):
+        # Evict everything, e.g. when the launcher quits
+        while self.sessions:
+            self.evict()
+
+    def discard(self, name):
+        # Forget a session entirely so the game starts fresh
+        self.take(name)
+        path = self.path(name)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def save(self, name, state):
+        path = self.path(name)
+        if path is None:
+            return
+        data = zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Could not save {name} session: {e}")
+
+    def load(self, name):
+        # Saved state of an evicted session, or None. The file is consumed.
+        path = self.path(name)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.loads(zlib.decompress(f.read()))
+        except Exception as e:
+            print(f"Ignoring unreadable {name} session: {e}")
+            state = None
+        os.remove(path)
+        return state
@@ -0,0 +1,232 @@
+"""Procedural sound synthesis.
+
+Sound effects are generated in memory instead of being loaded from WAV
+files: each note is computed in one go into an int16 buffer (with NumPy
+when it is installed, else with ``array``) and handed to
+``pygame.mixer.Sound(buffer=...)`` in the mixer's own format. Finished
+sounds are kept by the asset manager per mixer format (see assets.py), so
+a game built again (a new session, a prewarm) reuses them.
+
+    beep = tone(880, 0.05, envelope=Envelope(release=0.02))
+    jingle = sequence([(440, 0.1), (554, 0.1), (659, 0.1)])
+    sound = get_sound("tetris.move", lambda rate: tone(880, 0.05, rate=rate))
+
+``oscillator`` renders a steady note from a given phase, for music that is
+streamed in short buffers (see music.py). ``save_wav`` writes samples to a
+WAV file for offline use.
+"""
+import io
+import math
+import wave
+from array import array
+
+import pygame
+
+from games.utils.assets import get_assets
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SAMPLE_RATE = 44100
+WAVES = ("sine", "square", "triangle")
+
+
+class Envelope:
+    # Linear attack, decay to the sustain level, and release, in seconds
+    def __init__(self, attack=0.0, decay=0.0, sustain=1.0, release=0.0):
+        self.attack = attack
+        self.decay = decay
+        self.sustain = sustain
+        self.release = release
+
+    def gain(self, t, duration):
+        if t < self.attack:
+            level = t / self.attack
+        elif t < self.attack + self.decay:
+            level = 1 - (1 - self.sustain) * (t - self.attack) / self.decay
+        else:
+            level = self.sustain
+        remaining = duration - t
+        if remaining < self.release:
+            level *= remaining / self.release
+        return level
+
+    def apply(self, samples, rate):
+        # Scale samples (floats with NumPy, else int16) in place
+        n = len(samples)
+        duration = n / rate
+        if numpy is not None:
+            t = numpy.arange(n) / rate
+            level = numpy.full(n, float(self.sustain))
+            if self.decay:
+                decaying = (t >= self.attack) & (t < self.attack + self.decay)
+                level = numpy.where(decaying, 1 - (1 - self.sustain) * (t - self.attack) / self.decay, level)
+            if self.attack:
+                level = numpy.where(t < self.attack, t / self.attack, level)
+            if self.release:
+                remaining = duration - t
+                level = numpy.where(remaining < self.release, level * remaining / self.release, level)
+            samples *= level
+            return samples
+
+        # Only the attack, decay and release need a per-sample gain
+        shaped = min(n, int((self.attack + self.decay) * rate))
+        release_start = max(shaped, n - int(self.release * rate))
+        gain = self.gain
+        for i in range(shaped):
+            samples[i] = int(samples[i] * gain(i / rate, duration))
+        if self.sustain != 1:
+            sustain = self.sustain
+            samples[shaped:release_start] = array('h', [int(s * sustain) for s in samples[shaped:release_start]])
+        for i in range(release_start, n):
+            samples[i] = int(samples[i] * gain(i / rate, duration))
+        return samples
+
+
+def tone(frequency, duration, amplitude=0.5, end_frequency=None, envelope=None, wave="sine",
+         rate=SAMPLE_RATE):
+    # One note as int16 samples, optionally sweeping to end_frequency
+    if wave not in WAVES:
+        raise ValueError(f"Unknown wave: {wave}")
+    n = int(rate * duration)
+    f0 = frequency
+    # Phase of a linear sweep: 2*pi * (f0*t + (f1 - f0) * t^2 / (2 * duration))
+    slope = ((end_frequency or frequency) - f0) / (2 * duration) if duration else 0.0
+    # Full scale times amplitude, never clipping
+    peak = min(amplitude, 1.0) * 32767
+
+    if numpy is not None:
+        t = numpy.arange(n) / rate
+        cycles = f0 * t + slope * t * t
+        if wave == "sine":
+            samples = numpy.sin(2 * math.pi * cycles)
+        elif wave == "square":
+            samples = numpy.where(cycles % 1 < 0.5, 1.0, -1.0)
+        else:
+            samples = 4 * numpy.abs(cycles % 1 - 0.5) - 1
+        samples *= peak
+        if envelope is not None:
+            envelope.apply(samples, rate)
+        return samples.astype(numpy.int16)
+
+    # Per-sample phase steps, so each sample is one multiply-add
+    w1 = f0 / rate
+    w2 = slope / (rate * rate)
+    if wave == "sine":
+        sin, k1, k2 = math.sin, 2 * math.pi * w1, 2 * math.pi * w2
+        if k2:
+            samples = array('h', [int(peak * sin(k1 * i + k2 * i * i)) for i in range(n)])
+        else:
+            samples = array('h', [int(peak * sin(k1 * i)) for i in range(n)])
+    elif wave == "square":
+        high, low = int(peak), -int(peak)
+        samples = array('h', [high if (w1 * i + w2 * i * i) % 1 < 0.5 else low for i in range(n)])
+    else:
+        samples = array('h', [int(peak * (4 * abs((w1 * i + w2 * i * i) % 1 - 0.5) - 1))
+                              for i in range(n)])
+    if envelope is not None:
+        envelope.apply(samples, rate)
+    return samples
+
+
+def oscillator(frequency, count, amplitude=0.5, wave="sine", phase=0.0, rate=SAMPLE_RATE):
+    # count samples of a steady note starting `phase` cycles in, so a
+    # streamed note continues smoothly from one buffer into the next
+    if wave not in WAVES:
+        raise ValueError(f"Unknown wave: {wave}")
+    peak = min(amplitude, 1.0) * 32767
+    step = frequency / rate
+    if numpy is not None:
+        cycles = phase + step * numpy.arange(count)
+        if wave == "sine":
+            samples = numpy.sin(2 * math.pi * cycles)
+        elif wave == "square":
+            samples = numpy.where(cycles % 1 < 0.5, 1.0, -1.0)
+        else:
+            samples = 4 * numpy.abs(cycles % 1 - 0.5) - 1
+        return (samples * peak).astype(numpy.int16)
+
+    if wave == "sine":
+        sin, k, offset = math.sin, 2 * math.pi * step, 2 * math.pi * phase
+        return array('h', [int(peak * sin(k * i + offset)) for i in range(count)])
+    if wave == "square":
+        high, low = int(peak), -int(peak)
+        return array('h', [high if (phase + step * i) % 1 < 0.5 else low for i in range(count)])
+    return array('h', [int(peak * (4 * abs((phase + step * i) % 1 - 0.5) - 1)) for i in range(count)])
+
+
+def silence(count):
+    if numpy is not None:
+        return numpy.zeros(count, numpy.int16)
+    return array('h', bytes(2 * count))
+
+
+def sequence(notes, rate=SAMPLE_RATE, **defaults):
+    # Notes one after another: (frequency, duration) pairs or tone() kwargs
+    parts = []
+    for note in notes:
+        kwargs = dict(defaults)
+        if isinstance(note, dict):
+            kwargs.update(note)
+        else:
+            kwargs["frequency"], kwargs["duration"] = note
+        parts.append(tone(rate=rate, **kwargs))
+    return concat(parts)
+
+
+def concat(parts):
+    if numpy is not None:
+        return numpy.concatenate(parts) if parts else numpy.zeros(0, numpy.int16)
+    samples = array('h')
+    for part in parts:
+        samples.extend(part)
+    return samples
+
+
+def interleave(samples, channels=1):
+    # The mono signal copied into each channel
+    if channels == 1:
+        return samples
+    if numpy is not None:
+        return numpy.repeat(samples, channels)
+    interleaved = array('h', bytes(2 * len(samples) * channels))
+    for channel in range(channels):
+        interleaved[channel::channels] = samples
+    return interleaved
+
+
+def wav_bytes(samples, rate=SAMPLE_RATE, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wave_file:
+        wave_file.setnchannels(channels)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(rate)
+        wave_file.writeframes(interleave(samples, channels).tobytes())
+    return buffer.getvalue()
+
+
+def save_wav(path, samples, rate=SAMPLE_RATE):
+    with open(path, 'wb') as f:
+        f.write(wav_bytes(samples, rate))
+
+
+def to_sound(samples, rate=SAMPLE_RATE):
+    # Straight from memory when the buffer matches the mixer, else via an
+    # in-memory WAV that SDL converts
+    frequency, size, channels = pygame.mixer.get_init()
+    if frequency == rate and size == -16:
+        return pygame.mixer.Sound(buffer=interleave(samples, channels).tobytes())
+    return pygame.mixer.Sound(file=io.BytesIO(wav_bytes(samples, rate)))
+
+
+def get_sound(name, recipe):
+    # Cached Sound for recipe(rate) -> samples, built at the mixer's rate
+    mixer = pygame.mixer.get_init()
+    rate = mixer[0]
+    return get_assets().get(("synth", name, mixer), lambda: to_sound(recipe(rate), rate))
+
+
+def clear_cache():
+    get_assets().discard("synth")
@@ -0,0 +1,78 @@
+"""Shared cache of rendered text.
+
+Rendering a string with ``font.render`` rasterizes every glyph again, yet
+most text on screen (titles, menu entries, labels, scores) stays the same
+for many frames. Every game renders its text through ``render_text``,
+which keeps the surfaces in one least-recently-used cache for the whole
+collection, keyed by (font, text, antialias, color, alpha):
+
+    label = render_text(self.font, "Score:", (255, 255, 255))
+
+In steady state that is close to no ``font.render`` calls per frame. The
+cache holds at most MAX_TEXTS surfaces; text that changes every frame just
+cycles through the oldest entries. The surfaces are shared, so callers
+must not draw on them or change their alpha (pass ``alpha`` instead).
+``stats()`` reports hits, misses and evictions.
+"""
+import threading
+from collections import OrderedDict
+
+MAX_TEXTS = 512
+
+
+class TextCache:
+    def __init__(self, capacity=MAX_TEXTS):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()  # Least recently used first
+        # Scenes render their static text on the prewarm thread too
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, string, color, antialias=True, alpha=None):
+        key = (font, string, antialias, tuple(color), alpha)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                self.surfaces.move_to_end(key)
+                return surface
+            self.misses += 1
+            surface = font.render(string, antialias, color)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+                self.evictions += 1
+            return surface
+
+    def clear(self):
+        with self.lock:
+            self.surfaces.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.surfaces),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+
+
+def get_text_cache():
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+
+def render_text(font, string, color, antialias=True, alpha=None):
+    return get_text_cache().render(font, string, color, antialias, alpha)
@@ -0,0 +1,56 @@
+"""Fixed-rate game updates under a variable frame rate.
+
+A scene with ``UPDATE_RATE`` set has its ``update()`` called that many
+times per second of ``manager.ticks``, however fast frames are drawn: the
+time since the last frame goes into an accumulator and every whole step in
+it runs one update. What is left over is ``alpha``, how far the frame is
+into the next step, for drawing moving things in between their last two
+positions.
+
+A long stall (a slow frame, the window being dragged) would otherwise ask
+for a burst of catch-up updates that make the next frame slower still, so
+at most MAX_FRAME_MS of elapsed time is simulated per frame; the rest is
+dropped and the game just runs slow for that moment.
+"""
+MAX_FRAME_MS = 250
+
+
+def lerp(start, end, alpha):
+    return start + (end - start) * alpha
+
+
+class FixedTimestep:
+    def __init__(self, rate):
+        self.rate = rate
+        self.step_ms = 1000 / rate
+        self.accumulator = 0.0
+        self.last_ticks = None
+        self.alpha = 0.0
+        self.steps = 0
+        self.dropped_ms = 0  # Elapsed time given up by the clamp
+
+    def reset(self, ticks):
+        # Count from ticks on, e.g. when the scene comes (back) on screen
+        self.last_ticks = ticks
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def hold(self):
+        # The scene is idle until input arrives, the wait is not game time
+        self.last_ticks = None
+
+    def advance(self, ticks):
+        # The number of updates due at ticks
+        if self.last_ticks is None:
+            self.last_ticks = ticks
+        elapsed = ticks - self.last_ticks
+        self.last_ticks = ticks
+        if elapsed > MAX_FRAME_MS:
+            self.dropped_ms += elapsed - MAX_FRAME_MS
+            elapsed = MAX_FRAME_MS
+        self.accumulator += elapsed
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        self.alpha = self.accumulator / self.step_ms
+        self.steps += steps
+        return steps
@@ -0,0 +1,160 @@
+"""Screen transitions used by the launcher.
+
+A transition covers the live screen with a "cover" image whose coverage
+follows ``progress`` (0 = live screen only, 1 = fully covered). The cover is
+black for a plain fade, or a snapshot of the game side of the switch taken
+with ``capture()``: when leaving the menu the live screen is the outgoing
+scene and the snapshot the incoming one, its first frame drawn offscreen
+before it is shown (``SceneManager.draw_offscreen()``); when coming back it
+is the other way around, the snapshot is the game's last frame. The plain
+fade has no use for a snapshot (``USES_SNAPSHOT``).
+
+Progress advances on elapsed seconds, so a transition lasts ``duration``
+seconds at any frame rate. All buffers are allocated once per screen size
+and shared between instances, so running a transition never creates a
+Surface.
+
+Per-frame cost at 800x600 with the software renderer:
+    fade        one full-screen alpha blit
+    crossfade   one full-screen alpha blit of the snapshot
+    wipe        one opaque blit of the covered strip only
+    dissolve    one blit per tile that changed this frame plus one
+                full-screen colorkey blit
+"""
+import random
+from abc import ABC, abstractmethod
+
+import pygame
+
+# Colour used for the see-through parts of the dissolve buffer
+DISSOLVE_KEY = (255, 0, 255)
+DISSOLVE_TILE = 20
+
+_buffers = {}
+_tile_orders = {}
+
+
+def get_buffer(name, size):
+    # Buffers are shared by name and size so transitions never reallocate
+    key = (name, size)
+    buffer = _buffers.get(key)
+    if buffer is None:
+        buffer = pygame.Surface(size)
+        _buffers[key] = buffer
+    return buffer
+
+
+def _tile_order(size, tile):
+    key = (size, tile)
+    order = _tile_orders.get(key)
+    if order is None:
+        width, height = size
+        order = [pygame.Rect(x, y, tile, tile)
+                 for y in range(0, height, tile)
+                 for x in range(0, width, tile)]
+        # Fixed seed so the pattern is the same every time
+        random.Random(0).shuffle(order)
+        _tile_orders[key] = order
+    return order
+
+
+class Transition(ABC):
+    USES_SNAPSHOT = True  # Draws the cover, so the launcher captures one
+
+    def __init__(self, width, height, duration=0.8):
+        self.width = width
+        self.height = height
+        self.size = (width, height)
+        self.duration = duration
+        self.progress = 0
+        self.fading_out = True
+        self.cover = get_buffer("cover", self.size)
+        self.cover.set_alpha(None)
+        self.cover.fill((0, 0, 0))
+
+    def capture(self, surface):
+        # Snapshot the game side of the switch into the cover buffer
+        self.cover.fill((0, 0, 0))
+        self.cover.blit(surface, (0, 0))
+
+    def update(self, dt):
+        step = dt / self.duration if self.duration > 0 else 1
+        if self.fading_out:
+            self.progress = min(1, self.progress + step)
+        else:
+            self.progress = max(0, self.progress - step)
+
+    def is_done(self):
+        return (self.fading_out and self.progress >= 1) or (not self.fading_out and self.progress <= 0)
+
+    @abstractmethod
+    def draw(self, surface):
+        pass
+
+
+class FadeTransition(Transition):
+    USES_SNAPSHOT = False
+
+    def __init__(self, width, height, duration=0.8):
+        super().__init__(width, height, duration)
+        self.overlay = get_buffer("black", self.size)
+        self.overlay.fill((0, 0, 0))
+
+    def draw(self, surface):
+        self.overlay.set_alpha(int(255 * self.progress))
+        surface.blit(self.overlay, (0, 0))
+
+
+class CrossFadeTransition(Transition):
+    def draw(self, surface):
+        self.cover.set_alpha(int(255 * self.progress))
+        surface.blit(self.cover, (0, 0))
+
+
+class WipeTransition(Transition):
+    def draw(self, surface):
+        covered = int(self.width * self.progress)
+        if covered > 0:
+            surface.blit(self.cover, (0, 0), (0, 0, covered, self.height))
+
+
+class DissolveTransition(Transition):
+    def __init__(self, width, height, duration=0.8, tile=DISSOLVE_TILE):
+        super().__init__(width, height, duration)
+        self.tiles = _tile_order(self.size, tile)
+        self.overlay = get_buffer("dissolve", self.size)
+        self.overlay.set_colorkey(DISSOLVE_KEY)
+        self.overlay.fill(DISSOLVE_KEY)
+        self.shown = 0
+
+    def capture(self, surface):
+        super().capture(surface)
+        # Tiles already copied show the old cover, rebuild them on next draw
+        self.overlay.fill(DISSOLVE_KEY)
+        self.shown = 0
+
+    def draw(self, surface):
+        target = int(len(self.tiles) * self.progress)
+        while self.shown < target:
+            tile = self.tiles[self.shown]
+            self.overlay.blit(self.cover, tile, tile)
+            self.shown += 1
+        while self.shown > target:
+            self.shown -= 1
+            self.overlay.fill(DISSOLVE_KEY, self.tiles[self.shown])
+        if self.shown:
+            surface.blit(self.overlay, (0, 0))
+
+
+TRANSITIONS = {
+    "fade": FadeTransition,
+    "crossfade": CrossFadeTransition,
+    "wipe": WipeTransition,
+    "dissolve": DissolveTransition,
+}
+
+
+def create_transition(effect, width, height, **kwargs):
+    if effect not in TRANSITIONS:
+        raise ValueError(f"Unknown transition effect: {effect}")
+    return TRANSITIONS[effect](width, height, **kwargs)
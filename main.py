@@ -1,128 +1,392 @@
+import argparse
+import cProfile
+import os
+import pstats
+import random
 import pygame
 import sys
-from games import SnakeGame, HangmanGame, PongGame, TetrisGame
-from games.utils.effects import Background, Transition, GamePreview
+import time
+from games.registry import GAMES, get_game
+from games.utils.assets import get_assets
+from games.utils.audio import get_audio
+from games.utils.capture import CAPTURE_FPS, VideoCapture
+from games.utils.effects import Background, Bloom, GamePreview
+from games.utils.paths import cache_dir
+from games.utils.prewarm import Prewarmer
+from games.utils.render import DEFAULT_RENDERER, DEFAULT_SCALE, RENDERERS, SCALE_MODES
+from games.utils.replay import Player, Recorder, Recording
+from games.utils.scenes import Scene, SceneManager
+from games.utils.sessions import SessionCache
+from games.utils.text import get_text_cache
+from games.utils.transitions import create_transition
+
+class GameLauncher(Scene):
+    USES_CANVAS = True
 
-class GameLauncher:
     def __init__(self):
-        pygame.init()
+        super().__init__()
         self.WIDTH = 800
         self.HEIGHT = 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Python Arcade Collection")
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 36)
-        self.tiny_font = pygame.font.Font(None, 24)
-        self.clock = pygame.time.Clock()
+        self.font = self.load_font(None, 48)
+        self.small_font = self.load_font(None, 36)
+        self.tiny_font = self.load_font(None, 24)
         
         # Initialize effects
         self.background = Background(self.WIDTH, self.HEIGHT)
+        self.bloom = Bloom(self.WIDTH, self.HEIGHT, threshold=100, budget_ms=4)
         self.transition = None
-        self.preview = GamePreview(self.WIDTH, self.HEIGHT)
+        self.transition_effect = "fade"  # fade, crossfade, wipe or dissolve
+        self.preview = GamePreview(self.WIDTH, self.HEIGHT, cache_dir=cache_dir("previews"))
         self.current_game = None
+        self.game = None  # Scene running on top of the menu
+        self.fade_end = 0.0
+        self.resumed = False
+        self.prewarmer = Prewarmer()
+        # Games left with ESC, resumed when picked again
+        self.sessions = SessionCache(cache_dir("sessions"))
         self.selected_index = 0
-        self.games = [
-            ("Snake Game", SnakeGame),
-            ("Hangman", HangmanGame),
-            ("Pong", PongGame),
-            ("Tetris", TetrisGame)
-        ]
+        self.games = GAMES
+        self.refresh_saved()
 
     def draw_menu(self):
+        canvas = self.canvas
+        # Draw animated background, the only part drawn in software
         self.screen.fill((0, 0, 0))
-        
-        # Draw animated background
         self.background.update()
         self.background.draw(self.screen)
+        self.bloom.apply(self.screen)
+        canvas.draw_surface(self.screen)
         
         # Title
-        title = self.font.render("Python Arcade Collection", True, (255, 255, 255))
-        self.screen.blit(title, (self.WIDTH//2 - title.get_width()//2, 100))
+        canvas.text(self.font, "Python Arcade Collection", (255, 255, 255), (self.WIDTH//2, 100), "midtop")
         
         # Game options
         start_y = 250
         spacing = 60
-        for i, (text, game) in enumerate(self.games):
+        for i, game in enumerate(self.games):
+            text = game.name
             color = (255, 255, 255) if i == self.selected_index else (128, 128, 128)
-            game_text = self.small_font.render(text, True, color)
-            text_pos = (self.WIDTH//2 - game_text.get_width()//2, start_y + i * spacing)
-            self.screen.blit(game_text, text_pos)
+            text_rect = canvas.text(self.small_font, text, color, (self.WIDTH//2, start_y + i * spacing), "midtop")
+            if text in self.saved:
+                canvas.text(self.tiny_font, "paused", (128, 128, 128), (text_rect.right + 10, text_rect.top + 6))
             
             # Draw preview for selected game
             if i == self.selected_index:
                 preview_pos = (self.WIDTH//2 + 150, start_y + i * spacing - 50)
-                self.preview.draw(self.screen, text, preview_pos)
+                self.preview.draw(canvas, text, preview_pos)
         
         # Draw quit text in bottom right corner
-        quit_text = self.tiny_font.render("Ctrl+Q to Quit", True, (128, 128, 128))
-        self.screen.blit(quit_text, (self.WIDTH - quit_text.get_width() - 20, self.HEIGHT - 30))
+        canvas.text(self.tiny_font, "Ctrl+Q to Quit", (128, 128, 128), (self.WIDTH - 20, self.HEIGHT - 30), "topright")
         
         # Draw navigation hint with arrow symbols
-        nav_text = self.tiny_font.render("Use arrow key UP-DOWN to navigate", True, (128, 128, 128))
-        self.screen.blit(nav_text, (20, self.HEIGHT - 30))
+        canvas.text(self.tiny_font, "Use arrow key UP-DOWN to navigate", (128, 128, 128), (20, self.HEIGHT - 30))
+        
+        if self.games[self.selected_index].name in self.saved:
+            canvas.text(self.tiny_font, "DEL for a new game", (128, 128, 128), (self.WIDTH//2, self.HEIGHT - 30), "midtop")
         
         # Draw transition effect if active
         if self.transition:
-            self.transition.draw(self.screen)
-        
-        pygame.display.flip()
-
-    def start_transition(self, game_class):
-        self.transition = Transition(self.WIDTH, self.HEIGHT)
-        self.current_game = game_class
-
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    # Handle Ctrl+Q for quitting only in main menu
-                    if event.key == pygame.K_q and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if self.transition is None:  # Only quit if not in transition
-                            running = False
-                    elif not self.transition:  # Only handle input when not transitioning
-                        if event.key == pygame.K_UP:
-                            self.selected_index = (self.selected_index - 1) % len(self.games)
-                        elif event.key == pygame.K_DOWN:
-                            self.selected_index = (self.selected_index + 1) % len(self.games)
-                        elif event.key == pygame.K_RETURN:
-                            _, game_class = self.games[self.selected_index]
-                            self.start_transition(game_class)
-            
-            # Update and handle transition
-            if self.transition:
-                self.transition.update()
-                if self.transition.is_done():
-                    if self.transition.fading_out:
-                        # Start game
-                        game = self.current_game()
-                        self.transition.fading_out = False
-                        try:
-                            game.run()
-                        except Exception as e:
-                            print(f"Game error: {e}")
-                        finally:
-                            pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-                    else:
-                        # Return to menu
-                        self.transition = None
-                        self.current_game = None
-            
-            try:
-                self.draw_menu()
-            except pygame.error:
-                # Reinitialize display if it was quit
-                self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-                pygame.display.set_caption("Python Arcade Collection")
-                continue
-                
-            self.clock.tick(60)
+            self.transition.draw(canvas)
+
+    def draw(self):
+        self.draw_menu()
+
+    def refresh_saved(self):
+        # Names of games with a suspended session, shown in the menu
+        self.saved = {game.name for game in self.games if self.sessions.has_saved(game.name)}
+
+    def prepare(self, game):
+        # Build the game in the background unless a suspended instance is waiting
+        if game.name not in self.sessions:
+            self.prewarmer.start(game)
+
+    def open_game(self, game):
+        # Resume from memory, then from disk, else start fresh
+        scene = self.sessions.take(game.name)
+        self.resumed = scene is not None
+        if scene is None:
+            scene = self.prewarmer.take(game)
+            state = self.sessions.load(game.name)
+            if state is not None:
+                scene.restore(state)
+        return scene
+
+    def start_transition(self, game, effect=None):
+        self.transition = create_transition(effect or self.transition_effect,
+                                            self.WIDTH, self.HEIGHT)
+        self.current_game = game
+        if not self.transition.USES_SNAPSHOT:
+            # Build the game while the fade runs
+            self.prepare(game)
+            return
+        # The effect runs between the menu and the game's first frame, so
+        # the game is needed now (usually prewarmed while it was selected)
+        try:
+            self.game = self.open_game(game)
+            self.transition.capture(self.manager.draw_offscreen(self.game))
+        except Exception as e:
+            print(f"Game error: {e}")
+            self.transition = None
+            self.current_game = None
+            self.game = None
+
+    def report_first_frame(self):
+        # Only while the profiler overlay is shown (F3)
+        if self.manager.profiler.visible and self.game.first_frame_time is not None:
+            delay = self.game.first_frame_time - self.fade_end
+            origin = "resumed" if self.resumed else f"built in {self.prewarmer.build_time * 1000:.1f} ms"
+            print(f"{self.current_game.name}: first frame {delay * 1000:.1f} ms after the fade ({origin})")
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            # Handle Ctrl+Q for quitting only in main menu
+            if event.key == pygame.K_q and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                if self.transition is None:  # Only quit if not in transition
+                    self.manager.quit()
+            elif not self.transition:  # Only handle input when not transitioning
+                if event.key == pygame.K_UP:
+                    self.selected_index = (self.selected_index - 1) % len(self.games)
+                    self.prepare(self.games[self.selected_index])
+                elif event.key == pygame.K_DOWN:
+                    self.selected_index = (self.selected_index + 1) % len(self.games)
+                    self.prepare(self.games[self.selected_index])
+                elif event.key == pygame.K_RETURN:
+                    self.start_transition(self.games[self.selected_index])
+                elif event.key in (pygame.K_DELETE, pygame.K_BACKSPACE):
+                    # Drop the suspended session, the next start is a new game
+                    game = self.games[self.selected_index]
+                    self.sessions.discard(game.name)
+                    self.refresh_saved()
+                    self.prepare(game)
 
+    def update(self):
+        if self.transition:
+            # Cap the step so a hitch doesn't skip the whole transition
+            self.transition.update(min(self.manager.clock.get_time(), 100) / 1000)
+            if self.transition.is_done():
+                if self.transition.fading_out:
+                    # Start game on top of the menu
+                    self.fade_end = time.perf_counter()
+                    self.transition.fading_out = False
+                    try:
+                        if self.game is None:
+                            self.game = self.open_game(self.current_game)
+                        self.manager.push(self.game)
+                    except Exception as e:
+                        self.game = None
+                        print(f"Game error: {e}")
+                else:
+                    # Return to menu
+                    self.transition = None
+                    self.current_game = None
+
+    def resume(self):
+        # Keep the game's last frame for the way back
+        self.transition.capture(self.manager.capture())
+        super().resume()
+        self.report_first_frame()
+        if self.game.error is None:
+            self.sessions.put(self.current_game.name, self.game)
+        else:
+            # Don't bring back a session that crashed
+            self.sessions.discard(self.current_game.name)
+        self.refresh_saved()
+        self.game = None
+
+    def run(self, renderer=None, record=None, scale=None, window=None, fullscreen=False, video=None):
+        manager = SceneManager(self.WIDTH, self.HEIGHT, renderer=renderer,
+                               scale=scale, window=window, fullscreen=fullscreen)
+        if record:
+            # One replay file per game session
+            os.makedirs(record, exist_ok=True)
+            manager.recorder = Recorder(record)
+        manager.video = video
+        manager.push(self)
+        manager.run()
+        if manager.recorder is not None:
+            manager.recorder.close()
+            for path in manager.recorder.saved:
+                print(f"Replay written to {path}")
+        if video is not None:
+            report_video(video)
+        # Whatever is still suspended is picked up again next launch
+        if self.game is not None:
+            self.sessions.put(self.current_game.name, self.game)
+        self.sessions.clear()
         pygame.quit()
         sys.exit()
 
+def parse_keys(spec):
+    # "30:return,45:left" -> [(30, "return"), (45, "left")]
+    keys = []
+    for item in filter(None, spec.split(",")):
+        frame, _, name = item.partition(":")
+        if not frame.strip().isdigit() or not name.strip():
+            raise argparse.ArgumentTypeError(f"bad key press {item!r}, expected FRAME:KEY")
+        keys.append((int(frame), name.strip()))
+    return keys
+
+def parse_size(spec):
+    # "1600x1200" -> (1600, 1200)
+    width, _, height = spec.lower().partition("x")
+    if not width.isdigit() or not height.isdigit() or not int(width) or not int(height):
+        raise argparse.ArgumentTypeError(f"bad window size {spec!r}, expected WIDTHxHEIGHT")
+    return int(width), int(height)
+
+def open_video(args):
+    # The --capture target, checked before any window opens
+    if not args.capture:
+        return None
+    try:
+        return VideoCapture(args.capture, args.capture_fps)
+    except (ValueError, OSError) as e:
+        sys.exit(f"can't capture: {e}")
+
+def report_video(video):
+    video.close()
+    stats = video.stats()
+    print(f"Capture: {stats['written']} frames at {video.fps} fps written to {video.path}, "
+          f"{stats['copied']} copied, {stats['dropped']} dropped, {stats['waited']} waited for, "
+          f"{stats['avg_copy_ms']:.2f} ms per frame on the game loop ({stats['max_copy_ms']:.2f} ms max), "
+          f"{stats['avg_encode_ms']:.1f} ms encoding, {stats['peak_backlog']}/{video.ring} ring peak, "
+          f"{stats['setup_ms']:.1f} ms to set up")
+    if stats["error"]:
+        print(f"Capture stopped early: {stats['error']}")
+
+def key_script(keys):
+    # Key names resolve only once the display is up
+    script = {}
+    for frame, name in keys:
+        try:
+            key = pygame.key.key_code(name)
+        except ValueError:
+            sys.exit(f"unknown key name {name!r}")
+        unicode = name if len(name) == 1 else ""
+        script.setdefault(frame, []).append(
+            pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=unicode))
+    return script
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Python Arcade Collection")
+    parser.add_argument("--game", help="skip the menu and start this game (snake, hangman, pong, tetris)")
+    parser.add_argument("--frames", type=int, help="exit after this many frames")
+    parser.add_argument("--seed", type=int, help="seed the random number generator")
+    parser.add_argument("--keys", type=parse_keys, default=[],
+                        help="scripted key presses as FRAME:KEY pairs, e.g. 1:return,30:left")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the game loop with cProfile and write the stats to FILE")
+    parser.add_argument("--fps-uncapped", action="store_true",
+                        help="run as fast as possible, each frame still a frame of game time")
+    parser.add_argument("--fps", type=int,
+                        help="draw at this frame rate, the games still update at their own rate")
+    parser.add_argument("--renderer", choices=RENDERERS,
+                        help="surface (default), sdl2 or sdl2-software, see games/utils/render.py")
+    parser.add_argument("--scale", choices=SCALE_MODES,
+                        help="scale the games to a resizable window: sdl or software (default none)")
+    parser.add_argument("--window", type=parse_size, metavar="WxH",
+                        help="initial window size when scaling, e.g. 1600x1200 (not with --scale sdl)")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="start fullscreen when scaling, F11 toggles it")
+    parser.add_argument("--headless", action="store_true", help="no window, for benchmarks and CI")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the game input to a replay file (with --game) or to a directory")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play a recorded session back, at full speed with --fps-uncapped")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record video: a directory of PNGs, .y4m, .rgb, or .mp4 and others with ffmpeg")
+    parser.add_argument("--capture-fps", type=int, default=CAPTURE_FPS,
+                        help=f"video frame rate in game time (default {CAPTURE_FPS})")
+    args = parser.parse_args(argv)
+    if args.game and get_game(args.game) is None:
+        parser.error(f"unknown game {args.game!r}")
+    if args.replay and (args.game or args.record or args.keys):
+        parser.error("--replay can't be combined with --game, --record or --keys")
+    if args.window and (args.scale or DEFAULT_SCALE) == "sdl" and (args.renderer or DEFAULT_RENDERER) == "surface":
+        # pygame.SCALED picks the window size itself, and resizing the
+        # window after set_mode segfaulted in SDL 2.28
+        parser.error("--window doesn't work with --scale sdl, use --scale software or --renderer sdl2")
+    if not (args.game or args.replay):
+        # The launcher has no use for them, say so rather than ignore them
+        direct = [flag for flag, value in (("--frames", args.frames), ("--seed", args.seed),
+                                           ("--profile", args.profile), ("--keys", args.keys))
+                  if value not in (None, [])]
+        if direct:
+            parser.error(f"{', '.join(direct)} need --game or --replay")
+    return args
+
+def run_direct(args):
+    # Straight into one game, with start-up kept out of the profile
+    if args.seed is not None:
+        random.seed(args.seed)
+    recording = Recording.load(args.replay) if args.replay else None
+    scene = recording.build() if recording else get_game(args.game).load()()
+    # Uncapped, a frame still plays one frame's worth of game time
+    frame_ms = 1000 / (args.fps or scene.FPS) if args.fps_uncapped else None
+    manager = SceneManager(scene.WIDTH, scene.HEIGHT, uncapped=args.fps_uncapped,
+                           renderer=args.renderer, fps=args.fps, frame_ms=frame_ms,
+                           scale=args.scale, window=args.window, fullscreen=args.fullscreen)
+    if recording:
+        # The game sees the recorded clock and input
+        manager.ticks = recording.start_ticks
+        manager.replay = Player(recording)
+    elif args.record:
+        manager.recorder = Recorder(args.record)
+    manager.video = open_video(args)
+    manager.push(scene)
+    script = key_script(args.keys)
+
+    profile = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profile:
+        profile.enable()
+    manager.run(max_frames=args.frames, script=script)
+    if profile:
+        profile.disable()
+    elapsed = time.perf_counter() - start
+    if manager.recorder is not None:
+        manager.recorder.close()
+        for path in manager.recorder.saved:
+            print(f"Replay written to {path}")
+    if manager.video is not None:
+        report_video(manager.video)
+
+    frames = manager.frame
+    print(f"{scene.CAPTION}: {frames} frames in {elapsed:.2f} s, {frames / elapsed:.1f} fps average, "
+          f"{manager.profiler.low_fps(0.01):.1f} fps 1% low")
+    text = get_text_cache().stats()
+    print(f"Text: {text['misses']} rendered, {text['hits']} from cache ({text['hit_rate']:.1%}), "
+          f"{text['evictions']} evicted")
+    assets = get_assets().stats()
+    print(f"Assets: {assets['loads']} loaded in {assets['load_ms']:.1f} ms, {assets['hits']} shared, "
+          f"{assets['resident_bytes'] / 1024:.0f} KB resident, {assets['evictions']} evicted")
+    audio = get_audio().stats()
+    if audio["played"] or audio["coalesced"] or audio["dropped"]:
+        print(f"Audio: {audio['played']} played, {audio['coalesced']} coalesced, {audio['stolen']} stolen, "
+              f"{audio['dropped']} dropped, {audio['peak_voices']} peak voices, "
+              f"{audio['avg_play_ms']:.3f} ms average play call, {audio['buffer_ms']:.1f} ms buffer")
+    music = audio["music"]
+    if music:
+        print(f"Music: {music['chunks']} chunks, {music['underruns']} underruns, "
+              f"{music['avg_render_ms']:.2f} ms average render, {music['max_render_ms']:.2f} ms max, "
+              f"{music['cpu_load']:.1%} CPU")
+    if profile:
+        profile.dump_stats(args.profile)
+        print(f"Profile written to {args.profile}")
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(15)
+    pygame.quit()
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    # Low-latency mixer, set up before any game asks for it
+    get_audio().init()
+    if args.game or args.replay:
+        run_direct(args)
+    else:
+        GameLauncher().run(args.renderer, args.record, args.scale, args.window, args.fullscreen,
+                           open_video(args))
+
 if __name__ == "__main__":
-    launcher = GameLauncher()
-    launcher.run() 
\ No newline at end of file
+    main()